@@ -0,0 +1,332 @@
+"""Re-run detection over recorded footage.
+
+After a model or zone change, archived video can be reprocessed into the
+history database. Recordings sit in one directory per camera, named after
+the camera (or its file-system form) and by the time they start:
+
+    rekaman/Kamera-01-Pintu-Masuk-Utama/20261018_070000.mp4
+
+Every recording is split into time chunks that a process pool runs through
+the dashboard's pipeline: motion gate, detector, people in no-parking zones,
+and violations that start and end with that track. A recording's results
+replace whatever the database held for its camera and time span, so a
+backfill can be interrupted and run again.
+
+    python -m backfill rekaman --db data/detections.db --workers 4 --chunk-min 10
+"""
+import argparse
+import concurrent.futures
+import dataclasses
+import datetime
+import os
+import time
+from pathlib import Path
+
+import cameras
+import data_store
+import detector
+import history_db
+import motion
+import retention
+import tracking
+import video_source
+
+VIDEO_SUFFIXES = (".mp4", ".mkv", ".avi", ".mov")
+START_FORMAT = "%Y%m%d_%H%M%S"
+DEFAULT_CHUNK_MIN = 10.0
+
+
+@dataclasses.dataclass(frozen=True)
+class Recording:
+    camera: str
+    path: str
+    start: datetime.datetime
+    duration_s: float
+
+    @property
+    def end(self):
+        return self.start + datetime.timedelta(seconds=self.duration_s)
+
+
+@dataclasses.dataclass(frozen=True)
+class Chunk:
+    recording: Recording
+    index: int
+    start_s: float
+    end_s: float
+
+
+# A violation within one chunk, in seconds into the recording. open_start:
+# already going at the chunk's first frame; open_end: still going at its last.
+@dataclasses.dataclass
+class Segment:
+    start_s: float
+    end_s: float
+    confidence: float
+    prioritas: str
+    open_start: bool = False
+    open_end: bool = False
+
+
+@dataclasses.dataclass
+class ChunkResult:
+    chunk: Chunk
+    segments: list
+    frames: int = 0
+    inferred: int = 0
+    error: str = None
+
+
+# Recordings under `root` for the configured cameras, and the files that
+# were passed over with the reason why
+def find_recordings(root, camera_list):
+    by_dir = {}
+    for camera in camera_list:
+        by_dir[camera.name] = by_dir[cameras.slug(camera.name)] = camera
+
+    recordings, skipped = [], []
+    for directory in sorted(p for p in Path(root).iterdir() if p.is_dir()):
+        camera = by_dir.get(directory.name)
+        for path in sorted(directory.iterdir()):
+            if path.suffix.lower() not in VIDEO_SUFFIXES:
+                continue
+            if camera is None:
+                skipped.append((path, "kamera tidak dikenal"))
+                continue
+            try:
+                start = datetime.datetime.strptime(path.stem, START_FORMAT)
+            except ValueError:
+                skipped.append((path, "nama file bukan waktu mulai (YYYYmmdd_HHMMSS)"))
+                continue
+            try:
+                duration_s, _ = video_source.probe(path)
+            except IOError as exc:
+                skipped.append((path, str(exc)))
+                continue
+            recordings.append(Recording(camera.name, str(path), start, duration_s))
+    return recordings, skipped
+
+
+def split_chunks(recording, chunk_s):
+    starts = range(0, max(int(-(-recording.duration_s // chunk_s)), 1))
+    return [
+        Chunk(recording, index, index * chunk_s, min((index + 1) * chunk_s, recording.duration_s))
+        for index in starts
+    ]
+
+
+# Per worker process: the detector and the camera configs, loaded once
+_worker = {}
+
+
+def _init_worker(camera_list, model_path, variant, threads):
+    _worker["cameras"] = {camera.name: camera for camera in camera_list}
+    _worker["detector"] = detector.load_detector(model_path, variant, threads)
+
+
+# Run one chunk through the pipeline. Like the dashboard, the detector only
+# runs when the motion gate lets a frame through, and a violation ends on
+# the first frame without a person in a zone. Whatever goes wrong (an
+# unreadable file, a decoder or model error) fails only this chunk.
+def process_chunk(chunk):
+    camera = _worker["cameras"][chunk.recording.camera]
+    model = _worker["detector"]
+    gate = motion.MotionGate(camera.name, camera.motion)
+    result = ChunkResult(chunk, [])
+    candidates, current = None, None
+    try:
+        for position, pixels in video_source.read_frames(
+            chunk.recording.path, camera.fps, chunk.start_s, chunk.end_s
+        ):
+            infer = gate.should_infer(pixels, track_active=current is not None, now=position)
+            if infer or candidates is None:
+                candidates = model.predict(pixels, imgsz=camera.imgsz)
+                result.inferred += 1
+            people, ids = tracking.people_in_zones(camera, candidates, pixels.shape)
+            if len(people) and current is None:
+                confidence, priority = tracking.violation_start(camera, people, ids, pixels.shape)
+                current = Segment(position, position, confidence, priority, open_start=result.frames == 0)
+                result.segments.append(current)
+            elif current is not None:
+                current.end_s = position
+                if not len(people):
+                    current = None
+            result.frames += 1
+    except Exception as exc:
+        result.error = _describe(exc)
+    if current is not None:
+        current.end_s = chunk.end_s
+        current.open_end = True
+    # Only the first chunk of a recording starts fresh
+    if chunk.index == 0:
+        for segment in result.segments:
+            segment.open_start = False
+    return result
+
+
+# A recording's violations from its chunks' segments, in chunk order: one
+# still going at the end of a chunk carries on into the next chunk's
+# opening segment
+def merge_segments(results):
+    merged = []
+    for result in results:
+        for segment in result.segments:
+            if segment.open_start and merged and merged[-1].open_end:
+                merged[-1].end_s = segment.end_s
+                merged[-1].open_end = segment.open_end
+            else:
+                merged.append(dataclasses.replace(segment))
+    return merged
+
+
+# history_db.INSERT_SQL rows; footage is archived, so every violation is over
+def violation_rows(recording, segments):
+    return [
+        (
+            history_db.to_seconds(recording.start + datetime.timedelta(seconds=segment.start_s)),
+            recording.camera,
+            round(segment.confidence, 4),
+            tracking.duration_minutes(segment.end_s - segment.start_s),
+            "Selesai",
+            segment.prioritas,
+            0
+        )
+        for segment in segments
+    ]
+
+
+def _describe(exc):
+    return f"{type(exc).__name__}: {exc}" if str(exc) else type(exc).__name__
+
+
+def _clock(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}:{seconds:02d}"
+
+
+# Failed recordings keep their old rows and are reported at the end;
+# fail_fast stops at the first failed chunk instead, raising RuntimeError
+# after the recordings already finished have been written
+def backfill(root, db_path, camera_list, model_path, variant="fp32", workers=None, chunk_s=DEFAULT_CHUNK_MIN * 60,
+             cutoff=None, fail_fast=False):
+    workers = workers or os.cpu_count() or 1
+    recordings, skipped = find_recordings(root, camera_list)
+    if cutoff is not None:
+        # Rows before the cutoff would be rolled up a second time
+        skipped += [(Path(r.path), f"sebelum batas retensi {cutoff:%d/%m/%Y}") for r in recordings
+                    if r.start.date() < cutoff]
+        recordings = [r for r in recordings if r.start.date() >= cutoff]
+    for path, reason in skipped:
+        print(f"Dilewati {path}: {reason}")
+
+    chunks = {recording.path: split_chunks(recording, chunk_s) for recording in recordings}
+    total_chunks = sum(len(parts) for parts in chunks.values())
+    total_video_s = sum(recording.duration_s for recording in recordings)
+    print(f"{len(recordings)} rekaman, {total_video_s / 3600:.2f} jam video, {total_chunks} potongan, "
+          f"{workers} proses")
+
+    history = history_db.SqliteHistory(db_path)
+    results = {path: [] for path in chunks}
+    report = {"recordings": 0, "failed": 0, "violations": 0, "replaced": 0, "frames": 0, "inferred": 0}
+    done_chunks, done_video_s = 0, 0.0
+    started = time.monotonic()
+
+    threads = max((os.cpu_count() or 1) // workers, 1)
+    with concurrent.futures.ProcessPoolExecutor(
+        workers, initializer=_init_worker, initargs=(camera_list, model_path, variant, threads)
+    ) as pool:
+        futures = {pool.submit(process_chunk, chunk): chunk for parts in chunks.values() for chunk in parts}
+        for future in concurrent.futures.as_completed(futures):
+            try:
+                result = future.result()
+            except Exception as exc:
+                # The worker process died or its result could not be sent back
+                result = ChunkResult(futures[future], [], error=_describe(exc))
+            recording = result.chunk.recording
+            if result.error:
+                print(f"Galat di {recording.path} (potongan {result.chunk.index + 1}): {result.error}", flush=True)
+                if fail_fast:
+                    pool.shutdown(cancel_futures=True)
+                    raise RuntimeError(f"Backfill dihentikan setelah {report['recordings']} rekaman: "
+                                       f"{recording.path}: {result.error}")
+            results[recording.path].append(result)
+            report["frames"] += result.frames
+            report["inferred"] += result.inferred
+            done_chunks += 1
+            done_video_s += result.chunk.end_s - result.chunk.start_s
+
+            # A recording is written once all its chunks are in, and only
+            # when none of them failed, leaving its old rows otherwise
+            parts = results[recording.path]
+            if len(parts) == len(chunks[recording.path]):
+                errors = [part.error for part in parts if part.error]
+                if errors:
+                    report["failed"] += 1
+                    print(f"Gagal {recording.path}: {errors[0]}")
+                else:
+                    rows = violation_rows(recording, merge_segments(sorted(parts, key=lambda r: r.chunk.index)))
+                    report["replaced"] += history.replace(
+                        recording.camera, history_db.to_seconds(recording.start),
+                        history_db.to_seconds(recording.end), rows
+                    )
+                    report["recordings"] += 1
+                    report["violations"] += len(rows)
+                del results[recording.path]
+
+            elapsed = time.monotonic() - started
+            rate = done_video_s / elapsed if elapsed else 0.0
+            remaining = (total_video_s - done_video_s) / rate if rate else 0.0
+            print(f"[{done_chunks:>{len(str(total_chunks))}}/{total_chunks}] "
+                  f"{done_video_s / max(total_video_s, 1e-9):6.1%} | "
+                  f"{done_video_s / 3600:.2f}/{total_video_s / 3600:.2f} jam video | "
+                  f"{rate:.1f} jam video per jam | sisa ~{_clock(remaining)}", flush=True)
+
+    elapsed = time.monotonic() - started
+    report.update(
+        video_hours=total_video_s / 3600,
+        wall_s=elapsed,
+        video_hours_per_hour=total_video_s / elapsed if elapsed else 0.0
+    )
+    return report
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Reprocess recorded footage into the history database")
+    parser.add_argument("recordings", help="directory with one subdirectory of recordings per camera")
+    parser.add_argument("--db", default=data_store.configured_data_path(), help="history database (.db)")
+    parser.add_argument("--model", default=os.environ.get(detector.MODEL_ENV), help="YOLO11 ONNX model")
+    parser.add_argument("--variant", default=os.environ.get(detector.MODEL_VARIANT_ENV, "fp32"),
+                        choices=detector.VARIANTS)
+    parser.add_argument("--cameras", default=os.environ.get(cameras.CAMERAS_ENV), help="camera config JSON")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-min", type=float, default=DEFAULT_CHUNK_MIN, help="minutes of video per task")
+    parser.add_argument("--fail-fast", action="store_true", help="stop at the first recording that fails")
+    args = parser.parse_args(argv)
+
+    if not args.db or not data_store.is_sqlite(args.db):
+        parser.error("--db harus berupa database SQLite (.db/.sqlite)")
+    # The simulated detector sees nothing in real video and would wipe the
+    # history of every recording it touched
+    if not args.model:
+        parser.error(f"--model (atau {detector.MODEL_ENV}) wajib diisi")
+
+    camera_list = cameras.load_cameras(args.cameras) if args.cameras else cameras.default_cameras()
+    config = retention.configured_retention()
+    cutoff = config.cutoff(datetime.datetime.now()) if config.enabled else None
+    try:
+        report = backfill(
+            args.recordings, args.db, camera_list, args.model, args.variant,
+            workers=args.workers, chunk_s=args.chunk_min * 60, cutoff=cutoff, fail_fast=args.fail_fast
+        )
+    except RuntimeError as exc:
+        parser.exit(1, f"{exc}\n")
+    print(f"Selesai: {report['recordings']} rekaman, {report['violations']} pelanggaran ditulis "
+          f"({report['replaced']} baris lama diganti), {report['failed']} gagal")
+    print(f"{report['video_hours']:.2f} jam video dalam {_clock(report['wall_s'])} = "
+          f"{report['video_hours_per_hour']:.1f} jam video per jam "
+          f"({report['inferred']} dari {report['frames']} frame dideteksi)")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+"""Distributed mode benchmark: throughput per worker count and failover time.
+
+Starts a broker and N worker processes on this machine for a set of
+synthetic cameras, subscribes like the dashboard does, and counts the
+frames delivered per second once every camera has an owner. After the
+largest run one worker is killed without a goodbye, and the time until
+every one of its cameras delivers frames from another worker is measured.
+
+Worker processes compete for this machine's cores; to measure scale-out
+across nodes, run the workers elsewhere and point them at the broker.
+
+    python -m benchmarks.bench_cluster --workers 1 2 4 --cameras 16 --out benchmarks/results/cluster.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import bus  # noqa: E402
+import cameras  # noqa: E402
+import cluster  # noqa: E402
+from benchmarks.common import git_revision  # noqa: E402
+
+DEFAULT_WORKERS = [1, 2, 4]
+DEFAULT_CAMERAS = 16
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _camera_config(path, count):
+    entries = [
+        {
+            "name": f"Kamera-{index:02d}: Area {index}",
+            "simulate_violation": index % 3 == 0,
+            "zones": [{"name": "Trotoar", "priority": "Sedang", "polygon": [list(p) for p in cameras.SIDEWALK]}]
+        }
+        for index in range(count)
+    ]
+    with open(path, "w") as f:
+        json.dump({"cameras": entries}, f)
+    return [entry["name"] for entry in entries]
+
+
+# Dashboard-side view of the bus: frames per camera and who sent them
+class _Probe:
+    def __init__(self, message_bus, names, timeout_s):
+        self.view = cluster.ClusterView(names, timeout_s)
+        self.frames = 0
+        self.bytes = 0
+        self.senders = {}
+        self._lock = threading.Lock()
+        message_bus.subscribe(cluster.HEARTBEAT_TOPIC, self.view.membership.update)
+        message_bus.subscribe(cluster.FRAME_TOPIC, self._on_frame)
+
+    def _on_frame(self, message):
+        remote = self.view.update_frame(message)
+        with self._lock:
+            self.frames += 1
+            self.bytes += len(message.blob)
+            if remote is not None:
+                self.senders[remote.location] = (remote.worker, time.monotonic())
+
+    def counts(self):
+        with self._lock:
+            return self.frames, self.bytes
+
+    # Whether every camera sent a frame since `since` from a worker in `workers`
+    def covered(self, workers, since):
+        with self._lock:
+            return len(self.senders) == len(self.view.camera_names) and all(
+                worker in workers and at >= since for worker, at in self.senders.values()
+            )
+
+
+def _start_workers(count, address, env):
+    return {
+        f"bench-{index + 1}": subprocess.Popen(
+            [sys.executable, "-m", "worker", "--bus", address, "--id", f"bench-{index + 1}", "--interval", "0"],
+            cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        for index in range(count)
+    }
+
+
+def _wait(condition, timeout_s):
+    deadline = time.monotonic() + timeout_s
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def bench_workers(count, address, env, probe, seconds, kill=False):
+    processes = _start_workers(count, address, env)
+    try:
+        names = set(processes)
+        if not _wait(lambda: probe.covered(names, time.monotonic() - 1.0), 60):
+            raise RuntimeError(f"{count} worker tidak mengirim frame untuk semua kamera")
+        frames_before, bytes_before = probe.counts()
+        started = time.monotonic()
+        time.sleep(seconds)
+        elapsed = time.monotonic() - started
+        frames_after, bytes_after = probe.counts()
+        row = {
+            "workers": count,
+            "frames_per_s": (frames_after - frames_before) / elapsed,
+            "megabytes_per_s": (bytes_after - bytes_before) / elapsed / 1e6,
+            "owned": {worker: len(cams) for worker, cams in _owned(probe).items()}
+        }
+        print(f"{count} worker | {row['frames_per_s']:7.1f} frame/detik | "
+              f"{row['megabytes_per_s']:5.2f} MB/detik di bus | kamera per worker {sorted(row['owned'].values())}")
+
+        if kill and count > 1:
+            victim = sorted(processes)[0]
+            processes[victim].kill()
+            processes[victim].wait()
+            killed_at = time.monotonic()
+            survivors = names - {victim}
+            if not _wait(lambda: probe.covered(survivors, killed_at), 60):
+                raise RuntimeError("kamera worker yang mati tidak diambil alih")
+            row["failover_s"] = time.monotonic() - killed_at
+            print(f"  {victim} dimatikan: semua kameranya kembali mengirim frame setelah {row['failover_s']:.1f} detik "
+                  f"(batas heartbeat {probe.view.membership.timeout_s:.1f} detik)")
+        return row
+    finally:
+        for process in processes.values():
+            process.terminate()
+        for process in processes.values():
+            process.wait()
+        # Let the others' heartbeats expire before the next run
+        _wait(lambda: not probe.view.membership.live(), 30)
+
+
+def _owned(probe):
+    owned = {}
+    for name, worker in probe.view.owners().items():
+        owned.setdefault(worker, []).append(name)
+    return owned
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark distributed capture workers")
+    parser.add_argument("--workers", type=int, nargs="+", default=DEFAULT_WORKERS)
+    parser.add_argument("--cameras", type=int, default=DEFAULT_CAMERAS)
+    parser.add_argument("--seconds", type=float, default=10.0, help="measuring window per worker count")
+    parser.add_argument("--timeout", type=float, default=3.0, help="heartbeat timeout in seconds")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    port = _free_port()
+    server = bus.BusServer(("127.0.0.1", port)).start()
+    address = f"127.0.0.1:{port}"
+    with tempfile.TemporaryDirectory() as tmp:
+        config = os.path.join(tmp, "kamera.json")
+        names = _camera_config(config, args.cameras)
+        env = dict(
+            os.environ,
+            PARKIR_CAMERAS=config,
+            PARKIR_WORKER_TIMEOUT_S=str(args.timeout),
+            PARKIR_METRICS_PORT="0",
+            # Every camera at its configured rate, whatever the worker count
+            PARKIR_INFERENCE_BUDGET=str(args.cameras * cameras.DEFAULT_INFERENCE_FPS)
+        )
+        client = bus.connect(address)
+        client.wait_connected(10)
+        probe = _Probe(client, names, args.timeout)
+        results = [
+            bench_workers(count, address, env, probe, args.seconds, kill=count == max(args.workers))
+            for count in args.workers
+        ]
+        client.close()
+    server.shutdown()
+
+    report = {
+        "benchmark": "cluster",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "cameras": args.cameras,
+        "heartbeat_timeout_s": args.timeout,
+        "results": results
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
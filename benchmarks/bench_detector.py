@@ -0,0 +1,174 @@
+"""Detector variant benchmark.
+
+Runs every model variant (fp32, int8) at every input size over a sample
+image set and reports load and warm-up time, per-image latency,
+throughput, and accuracy. Accuracy is F1 at IoU 0.5 against the FP32
+model at the largest size (the accuracy delta of each variant) and, when
+the set has a labels.json, against ground truth.
+
+    PARKIR_MODEL=yolo11n.onnx python -m benchmarks.bench_detector
+    python -m benchmarks.bench_detector --images rekaman/stills --sizes 320 640
+
+Without a model the simulated detector is measured, which only exercises
+the harness. The default synthetic scenes (benchmarks/samples, written by
+make_samples on the first run) are drawn shapes that a COCO model will not
+recognise; use stills from real footage for meaningful accuracy numbers.
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np  # noqa: E402
+
+import detector  # noqa: E402
+import postprocess  # noqa: E402
+from benchmarks.common import git_revision  # noqa: E402
+from benchmarks.make_samples import LABELS_FILE, SAMPLES_DIR, ensure_samples  # noqa: E402
+
+CONFIDENCE = 0.5
+MATCH_IOU = 0.5
+
+
+def load_labels(directory):
+    path = Path(directory) / LABELS_FILE
+    if not path.exists():
+        return None
+    with open(path) as f:
+        raw = json.load(f)
+    return {
+        name: (np.array(entry["boxes"], dtype=np.float32).reshape(-1, 4), np.array(entry["classes"], dtype=np.int16))
+        for name, entry in raw.items()
+    }
+
+
+# Greedy one-to-one matching of same-class boxes, best score first
+def match_counts(detections, reference_boxes, reference_classes):
+    matched = np.zeros(len(reference_boxes), dtype=bool)
+    true_positives = 0
+    for box, cls in zip(detections.boxes, detections.classes):
+        candidates = np.flatnonzero(~matched & (reference_classes == cls))
+        if len(candidates) == 0:
+            continue
+        iou = postprocess.paired_iou(np.repeat(box[None], len(candidates), axis=0), reference_boxes[candidates])
+        best = int(iou.argmax())
+        if iou[best] >= MATCH_IOU:
+            matched[candidates[best]] = True
+            true_positives += 1
+    return true_positives, len(detections), len(reference_boxes)
+
+
+def f1_score(counts):
+    true_positives = sum(c[0] for c in counts)
+    predicted = sum(c[1] for c in counts)
+    expected = sum(c[2] for c in counts)
+    if predicted == 0 and expected == 0:
+        return 1.0
+    return 2 * true_positives / (predicted + expected) if predicted + expected else 0.0
+
+
+def run_variant(args, images, labels, variant, imgsz):
+    started = time.perf_counter()
+    model = detector.load_detector(args.model, variant)
+    load_s = time.perf_counter() - started
+    if not model.supports(imgsz):
+        return None
+    warmup_ms = model.warmup((imgsz,)).get(imgsz)
+
+    latencies, outputs = [], {}
+    for _ in range(args.repeat):
+        for name, frame in images:
+            truth = labels.get(name) if labels and args.model is None else None
+            started = time.perf_counter()
+            candidates = model.predict(frame, truth, imgsz=imgsz)
+            latencies.append(time.perf_counter() - started)
+            outputs[name] = postprocess.postprocess([candidates], CONFIDENCE)[0]
+
+    latencies.sort()
+    return {
+        "variant": variant,
+        "imgsz": imgsz,
+        "load_s": load_s,
+        "warmup_ms": warmup_ms,
+        "latency_median_ms": statistics.median(latencies) * 1000,
+        "latency_p95_ms": latencies[int(0.95 * (len(latencies) - 1))] * 1000,
+        "throughput_ips": len(latencies) / sum(latencies),
+        "outputs": outputs
+    }
+
+
+def main(argv=None):
+    model_path, _ = detector.configured_model()
+    parser = argparse.ArgumentParser(description="Benchmark detector variants and input sizes")
+    parser.add_argument("--model", default=model_path, help="ONNX model (default: PARKIR_MODEL)")
+    parser.add_argument("--variants", nargs="+", choices=detector.VARIANTS, default=list(detector.VARIANTS))
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(detector.INPUT_SIZES))
+    parser.add_argument("--images", default=str(SAMPLES_DIR))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    if args.model is None:
+        print("PARKIR_MODEL belum diatur: mengukur detektor simulasi (hanya menguji harness)")
+        args.variants = ["fp32"]
+    if args.images == str(SAMPLES_DIR):
+        ensure_samples()
+    images = detector.load_images(args.images)
+    labels = load_labels(args.images)
+
+    rows = []
+    for variant in args.variants:
+        for imgsz in sorted(args.sizes, reverse=True):
+            try:
+                row = run_variant(args, images, labels, variant, imgsz)
+            except FileNotFoundError as exc:
+                print(f"{variant:>5} | dilewati: {exc}")
+                break
+            if row is not None:
+                rows.append(row)
+
+    # The FP32 model at the largest size is the accuracy reference
+    reference = rows[0]["outputs"] if rows and rows[0]["variant"] == "fp32" else None
+    for row in rows:
+        outputs = row.pop("outputs")
+        if reference is not None:
+            row["f1_vs_reference"] = f1_score([
+                match_counts(outputs[name], reference[name].boxes, reference[name].classes) for name in outputs
+            ])
+        if labels:
+            row["f1_vs_labels"] = f1_score([
+                match_counts(outputs[name], *labels[name]) for name in outputs if name in labels
+            ])
+        print(f"{row['variant']:>5} {row['imgsz']:>4}px | warm-up {row['warmup_ms'] or 0:7.1f} ms | "
+              f"median {row['latency_median_ms']:7.2f} ms | p95 {row['latency_p95_ms']:7.2f} ms | "
+              f"{row['throughput_ips']:7.1f} gambar/s | F1 ref {row.get('f1_vs_reference', float('nan')):.3f} | "
+              f"F1 label {row.get('f1_vs_labels', float('nan')):.3f}")
+
+    report = {
+        "benchmark": "detector",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "model": args.model,
+        "images": args.images,
+        "image_count": len(images),
+        "confidence": CONFIDENCE,
+        "results": rows
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Video ingestion benchmark.
+
+Decodes the same recording once per inference rate with VideoSource (frame
+skipping, resize into a reused buffer) and once the naive way (read and
+resize every frame), reporting wall time, CPU time and frames decoded vs.
+skipped. Without --video a synthetic 1280x720 recording is generated.
+
+    python -m benchmarks.bench_ingest --fps 1 2 5 --seconds 20
+    python -m benchmarks.bench_ingest --video rekaman/pintu.mp4
+"""
+import argparse
+import datetime
+import json
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import video_source  # noqa: E402
+from benchmarks.common import git_revision, write_sample_video  # noqa: E402
+
+DEFAULT_FPS = [1.0, 2.0, 5.0]
+
+
+# Every frame decoded, converted and resized into a fresh array
+def decode_all(path, size):
+    import cv2
+
+    capture = cv2.VideoCapture(str(path))
+    frames = 0
+    try:
+        while True:
+            ok, frame = capture.read()
+            if not ok:
+                break
+            resized = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+            cv2.cvtColor(resized, cv2.COLOR_BGR2RGB)
+            frames += 1
+    finally:
+        capture.release()
+    return {"decoded": frames, "skipped": 0}
+
+
+def decode_with_source(path, fps, size):
+    source = video_source.VideoSource("bench", str(path), fps, loop=False, size=size, realtime=False)
+    source.start()
+    source._thread.join()
+    if source.error:
+        raise RuntimeError(source.error)
+    return {"decoded": source.decoded, "skipped": source.skipped}
+
+
+def measure(label, func, *args):
+    wall, cpu = time.perf_counter(), time.process_time()
+    counts = func(*args)
+    row = dict(
+        mode=label,
+        wall_s=time.perf_counter() - wall,
+        cpu_s=time.process_time() - cpu,
+        **counts
+    )
+    print(f"{label:>14} | wall {row['wall_s']:6.2f} s | CPU {row['cpu_s']:6.2f} s | "
+          f"dikonversi {row['decoded']:>5} | dilewati {row['skipped']:>5}")
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark video decoding with frame skipping")
+    parser.add_argument("--video", help="recording to decode; generated when omitted")
+    parser.add_argument("--seconds", type=float, default=20, help="length of the generated recording")
+    parser.add_argument("--fps", type=float, nargs="+", default=DEFAULT_FPS, help="inference rates to test")
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    size = video_source.FRAME_SIZE
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.video
+        if path is None:
+            path = Path(tmp) / "sample.mp4"
+            write_sample_video(path, seconds=args.seconds)
+
+        rows = [measure("semua frame", decode_all, path, size)]
+        for fps in args.fps:
+            rows.append(measure(f"{fps:g} fps", decode_with_source, path, fps, size))
+
+    report = {
+        "benchmark": "ingest",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "video": args.video,
+        "frame_size": size,
+        "results": rows
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Detection table memory benchmark.
+
+Generates a seeded workload, then reports the in-memory size of the
+detection table per column and per million rows: as generated (object
+strings, float64/int64) and in the compact layout the dashboard keeps
+(categoricals, float32/int16, DatetimeIndex). Also times loading it back
+from Parquet both ways.
+
+    python -m benchmarks.bench_memory --rows 1000000 --out benchmarks/results/memory.json
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+import data_store  # noqa: E402
+import workload  # noqa: E402
+from benchmarks.common import git_revision  # noqa: E402
+
+PER_ROWS = 1_000_000
+
+
+# Bytes per column (and the index) scaled to PER_ROWS rows. A DatetimeIndex
+# built from the waktu column shares its buffer and costs nothing extra.
+def column_bytes(df):
+    usage = df.memory_usage(deep=True, index=True)
+    if np.shares_memory(df.index.to_numpy(), df["waktu"].to_numpy()):
+        usage["Index"] = 0
+    scale = PER_ROWS / max(len(df), 1)
+    return {name: int(size * scale) for name, size in usage.items()}
+
+
+def _timed(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - started)
+    return result, min(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark detection table memory")
+    parser.add_argument("--rows", type=int, default=PER_ROWS)
+    parser.add_argument("--cameras", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    config = workload.WorkloadConfig(
+        cameras=args.cameras, days=args.days, seed=args.seed, end=datetime.datetime.now()
+    ).scaled_to(args.rows)
+    raw = workload.generate_detections(config)
+    compact = data_store.compact_detections(raw)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, "detections.parquet")
+        data_store.save_detections(raw, path)
+        _, raw_load_s = _timed(lambda: pd.read_parquet(path, columns=data_store.DETECTION_COLUMNS), args.repeat)
+        _, compact_load_s = _timed(lambda: data_store.load_detections(path), args.repeat)
+
+    layouts = {"asli": column_bytes(raw), "ringkas": column_bytes(compact)}
+    totals = {name: sum(columns.values()) for name, columns in layouts.items()}
+
+    print(f"{len(raw)} baris, ukuran per {PER_ROWS:,} baris:")
+    print(f"{'kolom':<22}{'asli':>12}{'ringkas':>12}")
+    for column in layouts["asli"]:
+        before, after = layouts["asli"][column], layouts["ringkas"].get(column, 0)
+        print(f"{column:<22}{before / 1e6:>10.1f}MB{after / 1e6:>10.1f}MB")
+    print(f"{'total':<22}{totals['asli'] / 1e6:>10.1f}MB{totals['ringkas'] / 1e6:>10.1f}MB "
+          f"({totals['asli'] / max(totals['ringkas'], 1):.1f}x lebih kecil)")
+    print(f"Muat Parquet: {raw_load_s:.3f}s asli, {compact_load_s:.3f}s ringkas")
+
+    report = {
+        "benchmark": "memory",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "pandas": pd.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "rows": len(raw),
+        "per_rows": PER_ROWS,
+        "bytes": layouts,
+        "total_bytes": totals,
+        "dtypes": {column: str(dtype) for column, dtype in compact.dtypes.items()},
+        "load_s": {"asli": raw_load_s, "ringkas": compact_load_s}
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
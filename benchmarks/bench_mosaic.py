@@ -0,0 +1,101 @@
+"""Camera wall benchmark: per-camera grid vs. one composited mosaic.
+
+For each camera count, captures one frame per synthetic camera and then
+times only the rendering: the grid draws and encodes a full-size JPEG per
+camera (one st.image each), the mosaic draws every camera into one canvas
+and encodes it once. Reports milliseconds per refresh and bytes sent.
+
+    python -m benchmarks.bench_mosaic --cameras 4 16 36 --out benchmarks/results/mosaic.json
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import cameras  # noqa: E402
+import shared_state  # noqa: E402
+import video_source  # noqa: E402
+from benchmarks.common import git_revision  # noqa: E402
+
+DEFAULT_CAMERAS = [4, 16, 36]
+THRESHOLD = 0.75
+
+
+def _backend(count):
+    zones = cameras.default_cameras()[0].zones
+    configs = [
+        cameras.CameraConfig(name=f"Kamera-{index:02d}: Area {index}", zones=zones, simulate_violation=index % 3 == 0)
+        for index in range(count)
+    ]
+    # Frames are captured once and never refreshed, so only rendering is timed
+    return shared_state.SharedBackend(
+        data_refresh_s=0, frame_interval_s=float("inf"), sources=video_source.SourcePool(configs)
+    )
+
+
+def bench_count(count, repeat):
+    backend = _backend(count)
+    names = backend.camera_names()
+    backend.camera_views(names, THRESHOLD)
+    backend.camera_mosaic(names, THRESHOLD)
+    camera_frames = [backend.camera_frame(name) for name in names]
+
+    grid, tiled = [], []
+    for _ in range(repeat):
+        for frame in camera_frames:
+            frame.views.clear()
+        started = time.perf_counter()
+        views = backend.camera_views(names, THRESHOLD)
+        grid.append(time.perf_counter() - started)
+
+        backend._mosaics.clear()
+        started = time.perf_counter()
+        mosaic_view = backend.camera_mosaic(names, THRESHOLD)
+        tiled.append(time.perf_counter() - started)
+
+    row = {
+        "cameras": count,
+        "grid": {"ms": statistics.median(grid) * 1000, "images": len(views),
+                 "bytes": sum(len(view.image) for view in views)},
+        "mosaic": {"ms": statistics.median(tiled) * 1000, "images": 1,
+                   "bytes": len(mosaic_view.image), "size": list(mosaic_view.size)}
+    }
+    print(f"{count:>3} kamera | grid {row['grid']['ms']:6.1f} ms, {row['grid']['bytes'] / 1e3:7.0f} KB "
+          f"dalam {count} gambar | mosaik {row['mosaic']['ms']:6.1f} ms, {row['mosaic']['bytes'] / 1e3:6.0f} KB")
+    return row
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the camera grid against the mosaic")
+    parser.add_argument("--cameras", type=int, nargs="+", default=DEFAULT_CAMERAS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    results = [bench_count(count, args.repeat) for count in args.cameras]
+    report = {
+        "benchmark": "mosaic",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
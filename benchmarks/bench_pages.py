@@ -0,0 +1,141 @@
+"""Headless page benchmark.
+
+Generates seeded workloads at several sizes, renders every dashboard page
+through Streamlit's AppTest and writes a JSON report that can be compared
+across releases.
+
+    python -m benchmarks.bench_pages --sizes 1000 100000 1000000 \\
+        --out benchmarks/results/pages.json
+
+--store sqlite runs the same workloads from an SQLite database instead of
+a Parquet file.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import streamlit as st  # noqa: E402
+
+import data_store  # noqa: E402
+import workload  # noqa: E402
+from benchmarks.common import APP_PATH, git_revision, share_script_cache  # noqa: E402
+
+PAGES = ["📹 Monitoring Real-time", "📊 Statistik Pelanggaran", "📋 Riwayat Deteksi"]
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+STORE_SUFFIXES = {"parquet": "parquet", "sqlite": "db"}
+
+
+# Time a single rerun of `page`, returning seconds and any exception messages
+def _time_page(page, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    at.run()
+    started = time.perf_counter()
+    at.sidebar.radio[0].set_value(page).run()
+    elapsed = time.perf_counter() - started
+    return elapsed, [str(e.value) for e in at.exception]
+
+
+def bench_size(rows, args, workdir):
+    config = workload.WorkloadConfig(
+        cameras=args.cameras, days=args.days, seed=args.seed,
+        end=datetime.datetime.now()
+    ).scaled_to(rows)
+
+    path = os.path.join(workdir, f"detections_{rows}.{STORE_SUFFIXES[args.store]}")
+    started = time.perf_counter()
+    generated = workload.write_workload(config, path)
+    generate_s = time.perf_counter() - started
+
+    # The shared backend is cached per data path; time the cold first render
+    # (data load + summaries) separately from the per-page reruns
+    os.environ[data_store.DATA_PATH_ENV] = path
+    st.cache_resource.clear()
+    from streamlit.testing.v1 import AppTest
+    started = time.perf_counter()
+    AppTest.from_file(APP_PATH, default_timeout=args.timeout).run()
+    cold_s = time.perf_counter() - started
+
+    pages = {}
+    for page in PAGES:
+        timings, errors = [], []
+        for _ in range(args.repeat):
+            elapsed, exceptions = _time_page(page, args.timeout)
+            timings.append(elapsed)
+            errors.extend(exceptions)
+        pages[page.split(" ", 1)[1]] = {
+            "median_s": statistics.median(timings),
+            "min_s": min(timings),
+            "max_s": max(timings),
+            "errors": sorted(set(errors))
+        }
+        print(f"{generated:>9} baris | {page}: {statistics.median(timings):.3f}s")
+    return {
+        "target_rows": rows,
+        "rows": generated,
+        "cameras": config.cameras,
+        "days": config.days,
+        "generate_s": generate_s,
+        "cold_render_s": cold_s,
+        "pages": pages
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dashboard pages with AppTest")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--cameras", type=int, default=50)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--store", choices=sorted(STORE_SUFFIXES), default="parquet")
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    import streamlit
+
+    share_script_cache()
+    previous = os.environ.get(data_store.DATA_PATH_ENV)
+    with tempfile.TemporaryDirectory() as workdir:
+        try:
+            results = [bench_size(rows, args, workdir) for rows in args.sizes]
+        finally:
+            if previous is None:
+                os.environ.pop(data_store.DATA_PATH_ENV, None)
+            else:
+                os.environ[data_store.DATA_PATH_ENV] = previous
+
+    report = {
+        "benchmark": "pages",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "streamlit": streamlit.__version__,
+        "machine": platform.machine(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "store": args.store,
+        "results": results
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+"""Multi-session CPU load test.
+
+Simulates N operators watching the dashboard: every tick reruns each of N
+AppTest sessions once, after the shared frame/data intervals have elapsed,
+and measures process CPU time. A minimal script gives the fixed
+Streamlit/AppTest cost per rerun for reference. Compares the shared backend against
+per-session state (PARKIR_SHARED_STATE=0).
+
+    python -m benchmarks.bench_sessions --sessions 1 2 5 10 --ticks 5
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import streamlit as st  # noqa: E402
+
+import pipeline  # noqa: E402
+import shared_state  # noqa: E402
+from benchmarks.common import APP_PATH, git_revision, share_script_cache  # noqa: E402
+
+DEFAULT_SESSIONS = [1, 2, 5, 10]
+MODES = {"shared": "1", "isolated": "0"}
+
+
+# Minimal script used to measure the fixed per-rerun cost of Streamlit + AppTest
+BASELINE_SCRIPT = """
+import streamlit as st
+st.write("baseline")
+"""
+
+
+# Average CPU seconds per tick for `n` concurrent sessions
+def cpu_per_tick(n, args, script=None):
+    from streamlit.testing.v1 import AppTest
+
+    st.cache_resource.clear()
+    if script is None:
+        sessions = [AppTest.from_file(APP_PATH, default_timeout=args.timeout) for _ in range(n)]
+    else:
+        sessions = [AppTest.from_string(script, default_timeout=args.timeout) for _ in range(n)]
+    for at in sessions:
+        at.run()
+
+    cpu = []
+    for _ in range(args.ticks):
+        # Let frames and data go stale, as they would between refreshes
+        time.sleep(args.interval * 1.05)
+        started = time.process_time()
+        for at in sessions:
+            at.run()
+        cpu.append(time.process_time() - started)
+        errors = [str(e.value) for at in sessions for e in at.exception]
+        if errors:
+            raise RuntimeError(errors[0])
+    return sum(cpu) / len(cpu)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure CPU cost per extra dashboard session")
+    parser.add_argument("--sessions", type=int, nargs="+", default=DEFAULT_SESSIONS)
+    parser.add_argument("--ticks", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=0.5,
+                        help="frame and data refresh interval used during the test (s)")
+    parser.add_argument("--modes", nargs="+", choices=list(MODES), default=list(MODES))
+    parser.add_argument("--timeout", type=float, default=120)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    saved = {name: os.environ.get(name) for name in (
+        shared_state.SHARED_STATE_ENV, shared_state.DATA_REFRESH_ENV, pipeline.FRAME_INTERVAL_ENV
+    )}
+    os.environ[shared_state.DATA_REFRESH_ENV] = str(args.interval)
+    os.environ[pipeline.FRAME_INTERVAL_ENV] = str(args.interval)
+
+    share_script_cache()
+
+    # Framework cost per session rerun that no amount of sharing removes
+    baseline = cpu_per_tick(1, args, script=BASELINE_SCRIPT)
+    print(f"baseline | skrip minimal: {baseline * 1000:.1f} ms CPU per rerun")
+
+    results = {}
+    try:
+        for mode in args.modes:
+            os.environ[shared_state.SHARED_STATE_ENV] = MODES[mode]
+            rows = []
+            for n in args.sessions:
+                tick_cpu = cpu_per_tick(n, args)
+                rows.append({"sessions": n, "cpu_per_tick_s": tick_cpu, "cpu_per_session_s": tick_cpu / n})
+                print(f"{mode:>8} | {n:>3} sesi | CPU/tick {tick_cpu * 1000:8.1f} ms | "
+                      f"per sesi {tick_cpu / n * 1000:7.1f} ms")
+            # Marginal cost of each session beyond the first
+            if len(rows) > 1 and rows[-1]["sessions"] > rows[0]["sessions"]:
+                extra = (rows[-1]["cpu_per_tick_s"] - rows[0]["cpu_per_tick_s"]) / \
+                    (rows[-1]["sessions"] - rows[0]["sessions"])
+                print(f"{mode:>8} | biaya CPU per sesi tambahan: {extra * 1000:.1f} ms")
+            else:
+                extra = None
+            results[mode] = {"runs": rows, "marginal_cpu_per_session_s": extra}
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    report = {
+        "benchmark": "sessions",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "ticks": args.ticks,
+        "interval_s": args.interval,
+        "baseline_cpu_per_rerun_s": baseline,
+        "results": results
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""Cold-start benchmark.
+
+Starts a fresh interpreter per sample under ``python -X importtime``,
+renders "Monitoring Real-time" once through AppTest and reports the
+time to first render, the import cost per top-level package and whether
+page-specific dependencies (Plotly Express, the statistics page) stayed
+unloaded. Exits non-zero when the median time to first render exceeds
+the budget.
+
+    python -m benchmarks.bench_startup --repeat 5 --budget-ms 1500
+"""
+import argparse
+import datetime
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from benchmarks.common import APP_PATH, git_revision  # noqa: E402
+
+# Modules that should only be loaded by the pages that need them
+WATCHED_MODULES = ["plotly.express", "charts", "views.statistics", "views.history", "PIL", "pandas"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.run()
+rendered = time.perf_counter()
+print(json.dumps({{
+    "import_streamlit_s": imported - started,
+    "first_render_s": rendered - imported,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": {{name: name in sys.modules for name in {watched!r}}}
+}}))
+"""
+
+
+# Sum `-X importtime` self times per top-level package, in seconds
+def parse_importtime(stderr):
+    per_package = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        fields = line[len("import time:"):].split("|")
+        # Skip the header row ("self [us] | cumulative | imported package")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        package = fields[2].strip().split(".")[0]
+        per_package[package] = per_package.get(package, 0.0) + int(fields[0]) / 1e6
+    return per_package
+
+
+def run_probe(timeout):
+    code = PROBE.format(app=APP_PATH, watched=WATCHED_MODULES)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=REPO_ROOT, capture_output=True, text=True, timeout=timeout
+    )
+    wall_s = time.perf_counter() - started
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr[-2000:])
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["process_wall_s"] = wall_s
+    result["imports"] = parse_importtime(proc.stderr)
+    return result
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold start of the dashboard")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500,
+                        help="budget for the median time to first render")
+    parser.add_argument("--top", type=int, default=12, help="packages to list by import time")
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--out", help="write the JSON report here")
+    args = parser.parse_args(argv)
+
+    samples = [run_probe(args.timeout) for _ in range(args.repeat)]
+    first_render = statistics.median(s["first_render_s"] for s in samples)
+    process_wall = statistics.median(s["process_wall_s"] for s in samples)
+
+    packages = sorted({name for s in samples for name in s["imports"]})
+    imports = {
+        name: statistics.median(s["imports"].get(name, 0.0) for s in samples)
+        for name in packages
+    }
+    top = sorted(imports.items(), key=lambda item: item[1], reverse=True)[:args.top]
+
+    print(f"Waktu render pertama (median): {first_render * 1000:.0f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+    print(f"Proses total (median): {process_wall * 1000:.0f} ms")
+    print("Import terberat (self time):")
+    for name, seconds in top:
+        print(f"  {name:<24} {seconds * 1000:8.1f} ms")
+    print("Modul yang termuat setelah render pertama:")
+    for name, loaded in samples[-1]["loaded"].items():
+        print(f"  {name:<24} {'ya' if loaded else 'tidak'}")
+
+    errors = sorted({e for s in samples for e in s["errors"]})
+    for error in errors:
+        print(f"Error: {error}")
+
+    within_budget = first_render * 1000 <= args.budget_ms and not errors
+    report = {
+        "benchmark": "startup",
+        "created": datetime.datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "budget_ms": args.budget_ms,
+        "first_render_ms": first_render * 1000,
+        "process_wall_ms": process_wall * 1000,
+        "import_self_ms": {name: seconds * 1000 for name, seconds in top},
+        "loaded": samples[-1]["loaded"],
+        "errors": errors,
+        "within_budget": within_budget
+    }
+    if args.out:
+        Path(args.out).parent.mkdir(parents=True, exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Laporan ditulis ke {args.out}")
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+import subprocess
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+APP_PATH = str(REPO_ROOT / "app.py")
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# The Streamlit server compiles the script once and shares the bytecode across
+# sessions and reruns; AppTest builds a fresh ScriptCache on every run. Share
+# one so timings reflect the server rather than repeated compilation.
+def share_script_cache():
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import local_script_runner
+
+    cache = ScriptCache()
+    local_script_runner.ScriptCache = lambda: cache
+
+
+# Write a synthetic recording (a box crossing a dark scene) for source and
+# backfill benchmarks; needs OpenCV
+def write_sample_video(path, seconds=10, fps=25, size=(1280, 720)):
+    import cv2
+    import numpy as np
+
+    width, height = size
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"mp4v"), fps, size)
+    if not writer.isOpened():
+        raise RuntimeError(f"Tidak bisa menulis video ke {path}")
+    rng = np.random.default_rng(0)
+    background = rng.integers(25, 45, size=(height, width, 3), dtype=np.uint8)
+    frame = np.empty_like(background)
+    total = int(seconds * fps)
+    try:
+        for idx in range(total):
+            np.copyto(frame, background)
+            x = int((width - 120) * idx / max(total - 1, 1))
+            frame[height // 2:height // 2 + 160, x:x + 120] = (60, 60, 160)
+            writer.write(frame)
+    finally:
+        writer.release()
+    return total
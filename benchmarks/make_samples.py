@@ -0,0 +1,65 @@
+"""Write the synthetic detector sample set.
+
+Writes synthetic CCTV scenes to benchmarks/samples/ together with their
+ground truth boxes in labels.json. Scene layout is seeded; only the burned-in
+timestamps change between runs. The set is not kept in the repository:
+bench_detector writes it on its first run, or regenerate it with
+
+    python -m benchmarks.make_samples --count 12
+"""
+import argparse
+import json
+import random
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+import numpy as np  # noqa: E402
+
+import cameras  # noqa: E402
+import frames  # noqa: E402
+
+SAMPLES_DIR = REPO_ROOT / "benchmarks" / "samples"
+LABELS_FILE = "labels.json"
+DEFAULT_COUNT = 12
+
+
+def write_samples(out, count=DEFAULT_COUNT, seed=0):
+    out = Path(out)
+    out.mkdir(parents=True, exist_ok=True)
+    labels = {}
+    for idx in range(count):
+        random.seed(seed + idx)
+        np.random.seed(seed + idx)
+        location = cameras.DEFAULT_LOCATIONS[idx % len(cameras.DEFAULT_LOCATIONS)]
+        # Two of every three scenes contain a parking attendant
+        img, (boxes, classes) = frames.create_cctv_frame(location, has_violation=idx % 3 != 2)
+        name = f"sample-{idx:02d}.jpg"
+        img.save(out / name, format="JPEG", quality=80)
+        labels[name] = {"boxes": boxes.round(1).tolist(), "classes": classes.tolist()}
+
+    with open(out / LABELS_FILE, "w") as f:
+        json.dump(labels, f, indent=1)
+    print(f"{count} gambar ditulis ke {out}")
+
+
+# The default sample set, written the first time a benchmark needs it
+def ensure_samples(directory=SAMPLES_DIR):
+    if not (Path(directory) / LABELS_FILE).exists():
+        write_samples(directory)
+    return directory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write the synthetic detector sample set")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default=str(SAMPLES_DIR))
+    args = parser.parse_args(argv)
+    write_samples(args.out, args.count, args.seed)
+
+
+if __name__ == "__main__":
+    main()
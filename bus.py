@@ -0,0 +1,307 @@
+"""Message bus between capture workers and the dashboard.
+
+Workers publish detections, frame thumbnails, heartbeats and metrics; the
+dashboard subscribes to them (see cluster.py). A message is a topic, a few
+JSON fields and an optional binary blob. Subscriptions match topic
+prefixes.
+
+PARKIR_BUS selects the bus: "host:port" connects to a broker, "local" is
+an in-process bus for running workers inside the dashboard process (tests,
+demos). Run the broker on one node with:
+
+    python -m bus --port 7070
+
+The broker keeps nothing: a subscriber that falls behind loses its oldest
+messages, which only ever costs it a frame or a heartbeat that a newer one
+replaces.
+"""
+import argparse
+import collections
+import dataclasses
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+
+BUS_ENV = "PARKIR_BUS"
+DEFAULT_PORT = 7070
+LOCAL = "local"
+
+# Backoff before a client reconnects to the broker
+RECONNECT_DELAY_S = 2.0
+
+# Messages queued per subscriber connection before the oldest are dropped
+SEND_QUEUE_SIZE = 256
+
+# Header length, blob length; then the JSON header and the blob
+_FRAME = struct.Struct("!II")
+
+
+@dataclasses.dataclass(frozen=True)
+class Message:
+    topic: str
+    fields: dict
+    blob: bytes = b""
+
+
+def _encode(op, topic, fields=None, blob=b""):
+    header = json.dumps({"op": op, "topic": topic, "fields": fields or {}}, separators=(",", ":")).encode("utf-8")
+    return _FRAME.pack(len(header), len(blob)) + header + blob
+
+
+def _read_exact(stream, size):
+    data = stream.read(size)
+    if len(data) < size:
+        raise EOFError("koneksi bus tertutup")
+    return data
+
+
+# (op, Message) of the next frame on a binary stream
+def _decode(stream):
+    header_size, blob_size = _FRAME.unpack(_read_exact(stream, _FRAME.size))
+    header = json.loads(_read_exact(stream, header_size))
+    blob = _read_exact(stream, blob_size) if blob_size else b""
+    return header["op"], Message(header["topic"], header["fields"], blob)
+
+
+# In-process bus: publish() calls every matching subscriber directly, in the
+# publishing thread
+class LocalBus:
+    def __init__(self):
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, prefix, callback):
+        with self._lock:
+            self._subscriptions.append((prefix, callback))
+
+    def publish(self, topic, fields=None, blob=b""):
+        message = Message(topic, fields or {}, blob)
+        with self._lock:
+            callbacks = [callback for prefix, callback in self._subscriptions if topic.startswith(prefix)]
+        for callback in callbacks:
+            callback(message)
+        return True
+
+    def close(self):
+        with self._lock:
+            self._subscriptions.clear()
+
+
+# Client of a BusServer. Callbacks run on the client's receive thread. The
+# connection is re-established (and subscriptions re-sent) whenever it
+# drops; messages published while it is down are dropped.
+class TcpBus:
+    def __init__(self, host, port=DEFAULT_PORT):
+        self.address = (host, port)
+        self.error = None
+        self._subscriptions = []
+        self._socket = None
+        self._send_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._connected = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="parkir-bus", daemon=True)
+        self._thread.start()
+
+    @property
+    def connected(self):
+        return self._connected.is_set()
+
+    def wait_connected(self, timeout=None):
+        return self._connected.wait(timeout)
+
+    def subscribe(self, prefix, callback):
+        with self._send_lock:
+            self._subscriptions.append((prefix, callback))
+        self._send(_encode("sub", prefix))
+
+    def publish(self, topic, fields=None, blob=b""):
+        return self._send(_encode("pub", topic, fields, blob))
+
+    def _send(self, data):
+        with self._send_lock:
+            if self._socket is None:
+                return False
+            try:
+                self._socket.sendall(data)
+                return True
+            except OSError as exc:
+                self.error = str(exc)
+                self._socket.close()
+                return False
+
+    def close(self):
+        self._stop.set()
+        with self._send_lock:
+            if self._socket is not None:
+                self._socket.close()
+        self._thread.join(RECONNECT_DELAY_S)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                sock = socket.create_connection(self.address, timeout=RECONNECT_DELAY_S)
+            except OSError as exc:
+                self.error = f"Broker {self.address[0]}:{self.address[1]} tidak terjangkau: {exc}"
+                self._stop.wait(RECONNECT_DELAY_S)
+                continue
+            sock.settimeout(None)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            with self._send_lock:
+                self._socket = sock
+                for prefix, _ in self._subscriptions:
+                    sock.sendall(_encode("sub", prefix))
+            self.error = None
+            self._connected.set()
+            try:
+                self._receive(sock.makefile("rb"))
+            except (OSError, EOFError, ValueError) as exc:
+                if not self._stop.is_set():
+                    self.error = f"Koneksi ke broker terputus: {exc}"
+            finally:
+                self._connected.clear()
+                with self._send_lock:
+                    self._socket = None
+                sock.close()
+            self._stop.wait(RECONNECT_DELAY_S)
+
+    def _receive(self, stream):
+        while not self._stop.is_set():
+            _, message = _decode(stream)
+            with self._send_lock:
+                callbacks = [callback for prefix, callback in self._subscriptions
+                             if message.topic.startswith(prefix)]
+            for callback in callbacks:
+                callback(message)
+
+
+# One subscriber connection on the broker: its prefixes and a bounded queue
+# drained by its own sender thread, so one slow reader never holds up the rest
+class _Peer:
+    def __init__(self, sock):
+        self.socket = sock
+        self.prefixes = []
+        self.dropped = 0
+        self._queue = collections.deque(maxlen=SEND_QUEUE_SIZE)
+        self._ready = threading.Condition()
+        self._closed = False
+        threading.Thread(target=self._send_loop, name="parkir-bus-peer", daemon=True).start()
+
+    def wants(self, topic):
+        return any(topic.startswith(prefix) for prefix in self.prefixes)
+
+    def offer(self, data):
+        with self._ready:
+            if len(self._queue) == self._queue.maxlen:
+                self.dropped += 1
+            self._queue.append(data)
+            self._ready.notify()
+
+    def close(self):
+        with self._ready:
+            self._closed = True
+            self._ready.notify()
+
+    def _send_loop(self):
+        while True:
+            with self._ready:
+                while not self._queue and not self._closed:
+                    self._ready.wait()
+                if self._closed:
+                    return
+                data = self._queue.popleft()
+            try:
+                self.socket.sendall(data)
+            except OSError:
+                return
+
+
+class _BrokerHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        peer = _Peer(self.request)
+        self.server.add_peer(peer)
+        try:
+            while True:
+                op, message = _decode(self.rfile)
+                if op == "sub":
+                    peer.prefixes.append(message.topic)
+                elif op == "pub":
+                    # Forwarded as received, encoded once for every subscriber
+                    self.server.forward(message.topic, _encode("pub", message.topic, message.fields, message.blob))
+        except (OSError, EOFError, ValueError):
+            pass
+        finally:
+            self.server.remove_peer(peer)
+            peer.close()
+
+
+# Fan-out broker: every published message goes to each connection that
+# subscribed to a matching prefix, the publisher included
+class BusServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address):
+        super().__init__(address, _BrokerHandler)
+        self._peers = []
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def add_peer(self, peer):
+        with self._lock:
+            self._peers.append(peer)
+
+    def remove_peer(self, peer):
+        with self._lock:
+            self._peers.remove(peer)
+            self.dropped += peer.dropped
+
+    def forward(self, topic, data):
+        with self._lock:
+            peers = [peer for peer in self._peers if peer.wants(topic)]
+        for peer in peers:
+            peer.offer(data)
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, name="parkir-bus-broker", daemon=True).start()
+        return self
+
+
+# "host:port" (or just "host") of a broker
+def parse_address(spec):
+    host, _, port = spec.strip().rpartition(":")
+    if not host:
+        return port, DEFAULT_PORT
+    return host, int(port)
+
+
+def configured_bus_spec():
+    return os.environ.get(BUS_ENV, "").strip() or None
+
+
+def connect(spec):
+    if spec == LOCAL:
+        return LocalBus()
+    return TcpBus(*parse_address(spec))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the message broker for capture workers and dashboards")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    args = parser.parse_args(argv)
+
+    server = BusServer((args.host, args.port))
+    print(f"Broker berjalan di {args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import dataclasses
+import json
+import os
+import re
+
+import zones
+from motion import MotionConfig
+
+# Point this at a JSON file to configure cameras and their video sources:
+#
+#   {"cameras": [
+#       {"name": "Kamera-01: Pintu Masuk Utama", "source": "rekaman/pintu.mp4", "fps": 2},
+#       {"name": "Kamera-05: Parkir Timur", "source": "rtsp://10.0.0.5/stream1",
+#        "motion": {"threshold": 18, "min_area": 0.01}, "imgsz": 480,
+#        "zones": [{"name": "Bahu jalan", "priority": "Tinggi",
+#                   "polygon": [[0, 0.6], [1, 0.6], [1, 1], [0, 1]]}]}
+#   ]}
+#
+# Relative file paths are resolved against the config file. Cameras without a
+# source show the synthetic scene. "motion" tunes the camera's motion gate
+# (see motion.MotionConfig); "imgsz" is the detector input size (320, 480 or
+# 640). "zones" are the no-parking areas: only people standing inside one are
+# violations, and the zone sets the priority.
+CAMERAS_ENV = "PARKIR_CAMERAS"
+
+# Frames per second handed to detection; the decoder skips everything else
+DEFAULT_INFERENCE_FPS = 2.0
+
+DEFAULT_LOCATIONS = [
+    "Kamera-01: Pintu Masuk Utama",
+    "Kamera-02: Jalur Pejalan Kaki",
+    "Kamera-03: Area Drop-off",
+    "Kamera-04: Pintu Keluar Belakang"
+]
+
+# The sidewalk at the bottom of the synthetic scene
+SIDEWALK = ((0.08, 0.79), (0.92, 0.79), (0.92, 1.0), (0.08, 1.0))
+
+DEFAULT_ZONE_PRIORITIES = {
+    "Kamera-01: Pintu Masuk Utama": "Tinggi",
+    "Kamera-02: Jalur Pejalan Kaki": "Sedang",
+    "Kamera-03: Area Drop-off": "Rendah",
+    "Kamera-04: Pintu Keluar Belakang": "Rendah"
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class CameraConfig:
+    name: str
+    # Video file path or stream URL (rtsp://, http://); None is synthetic
+    source: str = None
+    fps: float = DEFAULT_INFERENCE_FPS
+    # Restart video files at the end instead of stopping
+    loop: bool = True
+    # Initial state of the camera's checkbox in the sidebar
+    enabled: bool = True
+    motion: MotionConfig = MotionConfig()
+    zones: tuple = ()
+    # Synthetic scenes only: draw a parking attendant in the frame
+    simulate_violation: bool = False
+    # Detector input size, one of detector.INPUT_SIZES
+    imgsz: int = 640
+
+    def __post_init__(self):
+        if self.imgsz % 32:
+            raise ValueError(f"imgsz kamera {self.name} harus kelipatan 32: {self.imgsz}")
+
+    def zone_map(self, size):
+        return zones.zone_map(self.zones, size)
+
+    # Most severe priority any violation on this camera can get
+    def base_priority(self):
+        if not self.zones:
+            return zones.PRIORITIES[-1]
+        return min((zone.priority for zone in self.zones), key=zones.PRIORITY_RANK.get)
+
+
+# File-system friendly form of a camera name: "Kamera-01: Pintu Masuk Utama"
+# becomes "Kamera-01-Pintu-Masuk-Utama"
+def slug(name):
+    return re.sub(r"[^0-9A-Za-z]+", "-", str(name)).strip("-") or "kamera"
+
+
+def default_cameras():
+    return [
+        CameraConfig(
+            name=name,
+            enabled=name != "Kamera-04: Pintu Keluar Belakang",
+            zones=(zones.Zone("Trotoar", SIDEWALK, DEFAULT_ZONE_PRIORITIES[name]),),
+            # Let's simulate Kamera-01 and Kamera-04 having violations
+            simulate_violation=name in ("Kamera-01: Pintu Masuk Utama", "Kamera-04: Pintu Keluar Belakang")
+        )
+        for name in DEFAULT_LOCATIONS
+    ]
+
+
+def _resolve_source(source, base_dir):
+    if not source or "://" in source or os.path.isabs(source):
+        return source or None
+    return os.path.normpath(os.path.join(base_dir, source))
+
+
+def load_cameras(path):
+    with open(path) as f:
+        raw = json.load(f)
+    base_dir = os.path.dirname(os.path.abspath(path))
+    fields = {field.name for field in dataclasses.fields(CameraConfig)}
+
+    cameras = []
+    for entry in raw.get("cameras", []):
+        unknown = set(entry) - fields
+        if unknown:
+            raise ValueError(f"Kolom kamera tidak dikenal di {path}: {', '.join(sorted(unknown))}")
+        entry = dict(entry, source=_resolve_source(entry.get("source"), base_dir))
+        if "motion" in entry:
+            entry["motion"] = MotionConfig(**entry["motion"])
+        if "zones" in entry:
+            entry["zones"] = tuple(zones.zone_from_dict(zone) for zone in entry["zones"])
+        cameras.append(CameraConfig(**entry))
+    return cameras
+
+
+def configured_cameras():
+    path = os.environ.get(CAMERAS_ENV)
+    if not path:
+        return default_cameras()
+    return load_cameras(path)
@@ -0,0 +1,238 @@
+import datetime
+import hashlib
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+import metrics
+import profiling
+
+# Beyond these many days the daily trend is bucketed into weeks, and beyond
+# MAX_WEEKLY_DAYS into months, so the bar count stays bounded as history grows
+MAX_DAILY_DAYS = 31
+MAX_WEEKLY_DAYS = 182
+
+TREND_TITLES = {
+    "harian": "Jumlah Pelanggaran per Hari",
+    "mingguan": "Jumlah Pelanggaran per Minggu",
+    "bulanan": "Jumlah Pelanggaran per Bulan"
+}
+
+# Location charts keep the busiest cameras and fold the rest into one slice
+MAX_LOCATIONS = 12
+OTHER_LOCATIONS_LABEL = "Lainnya"
+
+# Number of figures kept in the process-wide cache
+FIGURE_CACHE_SIZE = 64
+
+# Stable fingerprint of a DataFrame plus any extra key parts (e.g. the range)
+def fingerprint(df, *extra):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode("utf-8"))
+    if not df.empty:
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    digest.update(repr(extra).encode("utf-8"))
+    return digest.hexdigest()
+
+
+# Figures are shared across reruns and sessions; only the fingerprint is hashed,
+# the builder and its data are passed through untouched
+@st.cache_resource(max_entries=FIGURE_CACHE_SIZE, show_spinner=False)
+def _cached_figure(kind, key, _builder, _data):
+    metrics.CACHE_MISSES.inc("figure")
+    return _builder(_data)
+
+
+def cached_figure(kind, data, builder, *range_key):
+    metrics.CACHE_REQUESTS.inc("figure")
+    return _cached_figure(kind, fingerprint(data, *range_key), builder, data)
+
+
+# Pick the bucket size for the daily trend based on the selected range
+def trend_granularity(start_date, end_date):
+    range_days = (end_date - start_date).days + 1
+    if range_days <= MAX_DAILY_DAYS:
+        return "harian"
+    if range_days <= MAX_WEEKLY_DAYS:
+        return "mingguan"
+    return "bulanan"
+
+
+# Aggregate the daily summary into day/week/month buckets
+def bucket_daily(daily_df, granularity):
+    if daily_df.empty:
+        return daily_df.assign(tanggal_str=pd.Series(dtype=object))
+
+    df = daily_df.sort_values("tanggal").copy()
+    if granularity == "harian":
+        df["tanggal_str"] = df["tanggal"].apply(lambda d: d.strftime("%d/%m"))
+        return df
+
+    if granularity == "mingguan":
+        df["bucket"] = df["tanggal"].apply(lambda d: d - datetime.timedelta(days=d.weekday()))
+        label = lambda d: f"Mgg {d.strftime('%d/%m')}"
+    else:
+        df["bucket"] = df["tanggal"].apply(lambda d: d.replace(day=1))
+        label = lambda d: d.strftime("%m/%Y")
+
+    # Average duration weighted by the number of violations in each day
+    df["durasi_total"] = df["durasi_rata"] * df["total"]
+    grouped = df.groupby("bucket", sort=True).agg(
+        total=("total", "sum"),
+        durasi_total=("durasi_total", "sum")
+    ).reset_index()
+    grouped["durasi_rata"] = (grouped["durasi_total"] / grouped["total"].where(grouped["total"] > 0)).fillna(0)
+    grouped = grouped.rename(columns={"bucket": "tanggal"}).drop(columns="durasi_total")
+    grouped["tanggal_str"] = grouped["tanggal"].apply(label)
+    return grouped
+
+
+# Keep the top locations by total and fold the remainder into "Lainnya"
+def limit_locations(location_df, max_locations=MAX_LOCATIONS):
+    if len(location_df) <= max_locations:
+        return location_df
+
+    ranked = location_df.sort_values("total", ascending=False)
+    top = ranked.head(max_locations - 1)
+    rest = ranked.iloc[max_locations - 1:]
+    rest_total = rest["total"].sum()
+    other = pd.DataFrame([{
+        "lokasi": OTHER_LOCATIONS_LABEL,
+        "total": rest_total,
+        "aktif": rest["aktif"].sum(),
+        "durasi_rata": (rest["durasi_rata"] * rest["total"]).sum() / rest_total if rest_total else 0
+    }])
+    return pd.concat([top, other], ignore_index=True)
+
+
+def _period_label(hour):
+    return (
+        "Pagi (5-10)" if 5 <= hour < 10 else
+        "Siang (10-14)" if 10 <= hour < 14 else
+        "Sore (14-18)" if 14 <= hour < 18 else
+        "Malam (18-22)" if 18 <= hour < 22 else
+        "Dini Hari (22-5)"
+    )
+
+
+# Add time period labels to the hourly counts
+def label_periods(hourly_df):
+    return hourly_df.assign(periode=hourly_df["jam"].apply(_period_label))
+
+
+@profiling.timed()
+def _build_daily_trend(daily_df, title):
+    fig = px.bar(
+        daily_df,
+        x="tanggal_str",
+        y="total",
+        text="total",
+        labels={"total": "Jumlah Pelanggaran", "tanggal_str": "Tanggal"},
+        title=title,
+        color="total",
+        color_continuous_scale=px.colors.sequential.Blues
+    )
+    fig.update_traces(textposition="outside")
+    fig.update_layout(height=400)
+    return fig
+
+
+@profiling.timed()
+def _build_hourly_pattern(hourly_df):
+    fig = px.line(
+        hourly_df,
+        x="jam",
+        y="jumlah",
+        markers=True,
+        labels={"jumlah": "Jumlah Pelanggaran", "jam": "Jam"},
+        title="Distribusi Pelanggaran Sepanjang Hari",
+        color="periode",
+        color_discrete_sequence=px.colors.qualitative.Bold
+    )
+    fig.update_layout(height=400)
+    return fig
+
+
+@profiling.timed()
+def _build_location_share(location_df):
+    fig = px.pie(
+        location_df,
+        values="total",
+        names="lokasi",
+        title="Proporsi Pelanggaran per Lokasi Kamera",
+        hole=0.4,
+        color_discrete_sequence=px.colors.sequential.Plasma_r
+    )
+    fig.update_traces(textposition='inside', textinfo='percent+label')
+    fig.update_layout(height=400)
+    return fig
+
+
+@profiling.timed()
+def _build_location_comparison(location_df):
+    fig = px.bar(
+        location_df,
+        x="lokasi",
+        y="total",
+        color="durasi_rata",
+        text="total",
+        labels={"total": "Jumlah Pelanggaran", "lokasi": "Lokasi", "durasi_rata": "Durasi Rata-rata (menit)"},
+        title="Perbandingan Jumlah dan Durasi Pelanggaran per Lokasi",
+        color_continuous_scale=px.colors.sequential.Viridis
+    )
+    fig.update_traces(textposition="outside")
+    fig.update_layout(height=400)
+    return fig
+
+
+@profiling.timed()
+def _build_duration_distribution(duration_df):
+    fig = px.bar(
+        x=duration_df["kategori"],
+        y=duration_df["jumlah"],
+        labels={"x": "Durasi (menit)", "y": "Jumlah Pelanggaran"},
+        title="Distribusi Durasi Pelanggaran",
+        color=duration_df["jumlah"],
+        color_continuous_scale=px.colors.sequential.Viridis
+    )
+    fig.update_layout(height=350)
+    return fig
+
+
+# Daily trend, bucketed to weeks/months for long ranges
+@profiling.timed()
+def daily_trend_figure(daily_df, start_date, end_date):
+    granularity = trend_granularity(start_date, end_date)
+    bucketed = bucket_daily(daily_df, granularity)
+    title = TREND_TITLES[granularity]
+    fig = cached_figure(
+        "daily_trend", bucketed, lambda df: _build_daily_trend(df, title),
+        start_date, end_date, granularity
+    )
+    return fig, granularity
+
+
+@profiling.timed()
+def hourly_pattern_figure(hourly_df):
+    return cached_figure("hourly_pattern", hourly_df, _build_hourly_pattern)
+
+
+@profiling.timed()
+def location_share_figure(location_df):
+    return cached_figure("location_share", limit_locations(location_df), _build_location_share)
+
+
+@profiling.timed()
+def location_comparison_figure(location_df):
+    return cached_figure("location_comparison", limit_locations(location_df), _build_location_comparison)
+
+
+# Duration histogram from the already-binned counts (bounded to six bars)
+@profiling.timed()
+def duration_distribution_figure(duration_counts):
+    duration_df = pd.DataFrame({
+        "kategori": duration_counts.index.astype(str),
+        "jumlah": duration_counts.values
+    })
+    return cached_figure("duration_distribution", duration_df, _build_duration_distribution)
@@ -0,0 +1,217 @@
+import dataclasses
+import datetime
+import hashlib
+import threading
+import time
+
+import numpy as np
+
+import config
+import postprocess
+import tracking
+
+# Distributed mode: capture workers on several nodes split the cameras
+# between them and publish over the message bus (bus.py); the dashboard
+# subscribes and merges.
+#
+# Every worker sends a heartbeat; a worker that has been silent for
+# WORKER_TIMEOUT_S is gone. Workers and dashboard compute the same camera
+# assignment from the live workers by rendezvous hashing, so when a worker
+# joins or disappears only the cameras that have to move do.
+WORKER_ID_ENV = "PARKIR_WORKER_ID"
+WORKER_TIMEOUT_ENV = "PARKIR_WORKER_TIMEOUT_S"
+LOCAL_WORKERS_ENV = "PARKIR_LOCAL_WORKERS"
+HEARTBEAT_S = 1.0
+DEFAULT_WORKER_TIMEOUT_S = 5.0
+DEFAULT_LOCAL_WORKERS = 2
+
+HEARTBEAT_TOPIC = "heartbeat"
+FRAME_TOPIC = "frame/"
+METRICS_TOPIC = "metrics/"
+
+# Frames cross the bus as thumbnails, with the candidates scaled to match;
+# candidates below the lowest selectable threshold are left out
+THUMBNAIL_SIZE = (320, 240)
+THUMBNAIL_QUALITY = 75
+
+
+def configured_timeout():
+    return config.env_number(WORKER_TIMEOUT_ENV, DEFAULT_WORKER_TIMEOUT_S)
+
+
+def configured_local_workers():
+    return max(config.env_number(LOCAL_WORKERS_ENV, DEFAULT_LOCAL_WORKERS, int), 1)
+
+
+def _weight(worker, camera):
+    return int.from_bytes(hashlib.blake2b(f"{worker}\0{camera}".encode("utf-8"), digest_size=8).digest(), "big")
+
+
+# Owner of each camera among `workers`: the worker with the highest hash
+# weight for it. Removing a worker only moves that worker's cameras.
+def assign(camera_names, workers):
+    workers = sorted(workers)
+    if not workers:
+        return {}
+    return {camera: max(workers, key=lambda worker: _weight(worker, camera)) for camera in camera_names}
+
+
+# Live workers, from their heartbeats
+class Membership:
+    def __init__(self, timeout_s=None):
+        self.timeout_s = configured_timeout() if timeout_s is None else timeout_s
+        self._seen = {}
+        self._info = {}
+        self._lock = threading.Lock()
+
+    def update(self, message):
+        worker = message.fields["worker"]
+        with self._lock:
+            if message.fields.get("leaving"):
+                # A worker shutting down cleanly hands its cameras over at once
+                self._seen.pop(worker, None)
+                self._info.pop(worker, None)
+            else:
+                self._seen[worker] = time.monotonic()
+                self._info[worker] = message.fields
+
+    def live(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return sorted(worker for worker, seen in self._seen.items() if now - seen < self.timeout_s)
+
+    # Last heartbeat fields of every live worker
+    def workers(self, now=None):
+        live = self.live(now)
+        with self._lock:
+            return {worker: self._info[worker] for worker in live}
+
+
+def heartbeat_fields(worker, cameras, leaving=False):
+    return {"worker": worker, "cameras": list(cameras), "leaving": leaving, "sent_at": time.time()}
+
+
+def _time(value):
+    return datetime.datetime.fromisoformat(value) if value else None
+
+
+# Thumbnail of a processed frame and its candidates scaled to it, as bus
+# message (fields, blob): the JPEG followed by boxes, scores and classes
+def frame_message(worker, frame):
+    import frames
+
+    height, width = frame.pixels.shape[:2]
+    thumbnail = frames.thumbnail(frame.pixels, THUMBNAIL_SIZE)
+    image = frames.encode_jpeg(thumbnail, quality=THUMBNAIL_QUALITY)
+    candidates = frame.candidates.take(frame.candidates.scores >= tracking.TRACK_CONFIDENCE)
+    scale = np.array([thumbnail.width / width, thumbnail.height / height] * 2, dtype=np.float32)
+    blob = b"".join([
+        image,
+        (candidates.boxes * scale).astype("<f4").tobytes(),
+        candidates.scores.astype("<f4").tobytes(),
+        candidates.classes.astype("<i2").tobytes()
+    ])
+    fields = {
+        "worker": worker,
+        "location": frame.location,
+        "size": [thumbnail.width, thumbnail.height],
+        "image_bytes": len(image),
+        "candidates": len(candidates),
+        "track": frame.track,
+        "track_since": frame.track_since.isoformat() if frame.track_since else None,
+        "detected_at": frame.detected_at.isoformat(),
+        "duration": frame.duration,
+        "error": frame.error,
+        "sent_at": time.time()
+    }
+    return fields, blob
+
+
+# A camera's latest frame as received from its worker. The thumbnail stays
+# encoded until a page shows it.
+@dataclasses.dataclass(frozen=True)
+class RemoteFrame:
+    location: str
+    worker: str
+    image: bytes
+    size: tuple
+    candidates: postprocess.Detections
+    track: bool
+    track_since: datetime.datetime
+    detected_at: datetime.datetime
+    duration: int
+    error: str
+    # Worker's wall clock when sent, and local monotonic time when received
+    sent_at: float
+    received_at: float
+
+    @property
+    def shape(self):
+        return self.size[1], self.size[0], 3
+
+
+def read_frame(message):
+    fields, blob = message.fields, message.blob
+    count, offset = fields["candidates"], fields["image_bytes"]
+    boxes = np.frombuffer(blob, "<f4", count * 4, offset).reshape(count, 4)
+    offset += boxes.nbytes
+    scores = np.frombuffer(blob, "<f4", count, offset)
+    offset += scores.nbytes
+    classes = np.frombuffer(blob, "<i2", count, offset)
+    return RemoteFrame(
+        location=fields["location"],
+        worker=fields["worker"],
+        image=blob[:fields["image_bytes"]],
+        size=tuple(fields["size"]),
+        candidates=postprocess.Detections(boxes=boxes, scores=scores, classes=classes),
+        track=fields["track"],
+        track_since=_time(fields["track_since"]),
+        detected_at=_time(fields["detected_at"]),
+        duration=fields["duration"],
+        error=fields["error"],
+        sent_at=fields["sent_at"],
+        received_at=time.monotonic()
+    )
+
+
+# Dashboard side: the latest frame of every camera and the latest metrics
+# of every worker. While cameras move between workers two of them may
+# briefly send the same camera; frames from the camera's owner are always
+# taken, others only when sent later (node clocks may disagree).
+class ClusterView:
+    def __init__(self, camera_names, timeout_s=None):
+        self.camera_names = list(camera_names)
+        self.membership = Membership(timeout_s)
+        self._frames = {}
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    # Store a frame message; returns the RemoteFrame, or None when it is
+    # older than what is already there
+    def update_frame(self, message):
+        remote = read_frame(message)
+        owner = self.owners().get(remote.location)
+        with self._lock:
+            current = self._frames.get(remote.location)
+            if current is not None and remote.worker != owner and current.sent_at > remote.sent_at:
+                return None
+            self._frames[remote.location] = remote
+        return remote
+
+    def update_metrics(self, message):
+        with self._lock:
+            self._metrics[message.fields["worker"]] = message.fields
+
+    def latest(self, location):
+        with self._lock:
+            return self._frames.get(location)
+
+    def owners(self, now=None):
+        return assign(self.camera_names, self.membership.live(now))
+
+    # Metrics of the live workers; a camera's rates and motion counts come
+    # from the worker that owns it now
+    def worker_metrics(self, now=None):
+        live = set(self.membership.live(now))
+        with self._lock:
+            return {worker: fields for worker, fields in self._metrics.items() if worker in live}
@@ -0,0 +1,268 @@
+import datetime
+
+import streamlit as st
+
+import profiling
+
+# Enhanced CSS for better styling
+CSS = """
+<style>
+    /* Main theme */
+    .main-header {
+        font-size: 26px;
+        font-weight: bold;
+        color: #6FA9FF;
+        padding-bottom: 8px;
+        margin-bottom: 16px;
+        border-bottom: 2px solid #e2e8f0;
+    }
+    .sub-header {
+        font-size: 18px;
+        font-weight: bold;
+        color: #2b6cb0;
+        margin-top: 16px;
+        margin-bottom: 12px;
+        padding-bottom: 4px;
+        border-bottom: 1px solid #e2e8f0;
+    }
+    
+    /* Cards and containers */
+    .metric-card {
+        background-color: #f8fafc;
+        border-radius: 8px;
+        padding: 16px;
+        border: 1px solid #e2e8f0;
+        box-shadow: 0 1px 3px rgba(0,0,0,0.05);
+    }
+    .cctv-container {
+        border: 1px solid #e2e8f0;
+        border-radius: 8px;
+        overflow: hidden;
+        background-color: #1a202c;
+    }
+    
+    /* Status indicators */
+    .status-active {
+        color: white;
+        background-color: #e53e3e;
+        padding: 4px 12px;
+        border-radius: 15px;
+        font-weight: bold;
+        text-align: center;
+        margin-bottom: 5px;
+    }
+    .status-clear {
+        color: white;
+        background-color: #38a169;
+        padding: 4px 12px;
+        border-radius: 15px;
+        font-weight: bold;
+        text-align: center;
+        margin-bottom: 5px;
+    }
+    
+    /* Violations box styling */
+    .violation-box {
+        padding: 8px;
+        border-radius: 8px;
+        margin-bottom: 8px;
+    }
+    
+    /* Notifications */
+    .notification-high {
+        background-color: rgba(229, 62, 62, 0.1);
+        border-left: 4px solid #e53e3e;
+        padding: 12px;
+        margin-bottom: 8px;
+        border-radius: 0 4px 4px 0;
+    }
+    .notification-medium {
+        background-color: rgba(237, 137, 54, 0.1);
+        border-left: 4px solid #ed8936;
+        padding: 12px;
+        margin-bottom: 8px;
+        border-radius: 0 4px 4px 0;
+    }
+    .notification-low {
+        background-color: rgba(49, 130, 206, 0.1);
+        border-left: 4px solid #3182ce;
+        padding: 12px;
+        margin-bottom: 8px;
+        border-radius: 0 4px 4px 0;
+    }
+    
+    /* Data tables */
+    .dataframe-container {
+        border-radius: 8px;
+        border: 1px solid #e2e8f0;
+        overflow: hidden;
+    }
+    
+    /* Custom Streamlit overrides */
+    div.stButton > button {
+        width: 100%;
+    }
+    .stProgress .st-eb {
+        background-color: #2b6cb0;
+    }
+    
+    /* Status area */
+    .status-container {
+        background-color: transparent;
+        border-radius: 8px;
+        padding: 12px;
+        text-align: center;
+    }
+    .status-label {
+        font-weight: 600;
+        margin-top: 4px;
+    }
+    
+    /* Alert styling */
+    .alert-badge {
+        display: inline-block;
+        padding: 2px 8px;
+        border-radius: 10px;
+        font-size: 12px;
+        font-weight: bold;
+        margin-right: 6px;
+    }
+    .alert-high {
+        background-color: #e53e3e;
+        color: white;
+    }
+    .alert-medium {
+        background-color: #ed8936;
+        color: white;
+    }
+    .alert-low {
+        background-color: #3182ce;
+        color: white;
+    }
+    
+    /* Counter badges */
+    .counter-badge {
+        background-color: #3182ce;
+        color: white;
+        padding: 0px 6px;
+        border-radius: 10px;
+        font-size: 12px;
+        margin-left: 6px;
+    }
+    
+    /* Additional formatting */
+    .timestamp {
+        color: #718096;
+        font-size: 12px;
+    }
+    .highlight {
+        font-weight: bold;
+        color: #e53e3e;
+    }
+</style>
+"""
+
+
+def inject_css():
+    st.markdown(CSS, unsafe_allow_html=True)
+
+# Function to create active violation counter with unified styling
+@profiling.timed()
+def show_violation_counter(location, count, motion_stats=None, rates=None):
+    status_html = ""
+    if count > 0:
+        status_html = f"<div class='status-active'>AKTIF: {count}</div>"
+    else:
+        status_html = "<div class='status-clear'>AMAN</div>"
+    
+    # Frames sent to the detector vs. skipped by the motion gate
+    motion_html = ""
+    if motion_stats is not None:
+        motion_html = f"""<div class='timestamp' title='Frame dikirim ke detektor / dilewati karena tidak ada gerakan'>
+            🔍 {motion_stats['inferred']} inferensi · ⏭️ {motion_stats['skipped']} dilewati
+        </div>"""
+    
+    # Effective inference rate against the scheduler's allocation
+    rate_html = ""
+    if rates is not None:
+        rate_html = f"""<div class='timestamp' title='Inferensi per detik: terukur / jatah dari penjadwal'>
+            ⚙️ {rates['effective']:.2f}/s dari jatah {rates['allocated']:.2f}/s
+        </div>"""
+        
+    st.markdown(f"""
+    <div class='status-container'>
+        {status_html}
+        <div class='status-label'>{location}</div>
+        {motion_html}
+        {rate_html}
+    </div>
+    """, unsafe_allow_html=True)
+
+# Function to render a CCTV feed with violation detection
+@profiling.timed()
+def render_cctv_feed(frame):
+    # Frames come pre-encoded from the shared backend
+    st.image(frame.image, use_container_width=True)
+    if frame.error:
+        st.caption(f"⚠️ {frame.error} — menampilkan simulasi")
+    
+    # Only people standing inside a no-parking zone count
+    if frame.violation:
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            st.error("⚠️ Terdeteksi Tukang Parkir Liar!")
+            
+        with col2:
+            st.metric("Confidence", f"{frame.confidence:.2f}")
+        
+        # Detection details
+        st.markdown(f"""
+        <div style="font-size: 0.9em">
+        ⏱️ <span class="timestamp">Terdeteksi {frame.detected_at.strftime('%H:%M:%S')}</span> | 
+        ⌛ <span class="timestamp">Durasi: {frame.duration} menit</span> | 
+        🚩 <span class="timestamp">Prioritas: {frame.priority}</span>
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        st.success("✓ Area aman - tidak ada tukang parkir terdeteksi")
+
+# Function to display notification with priority level
+@profiling.timed()
+def display_notification(notification):
+    priority = notification.get("prioritas", "Rendah")
+    priority_class = {
+        "Tinggi": "notification-high",
+        "Sedang": "notification-medium",
+        "Rendah": "notification-low"
+    }.get(priority, "notification-low")
+    
+    badge_class = {
+        "Tinggi": "alert-high",
+        "Sedang": "alert-medium",
+        "Rendah": "alert-low"
+    }.get(priority, "alert-low")
+    
+    notification_time = notification.get("waktu", datetime.datetime.now())
+    time_str = notification_time.strftime("%H:%M:%S")
+    
+    notif_sent = notification.get("notifikasi_terkirim", False)
+    notif_status = "✓ Terkirim" if notif_sent else "⏳ Pending"
+    
+    st.markdown(f"""
+    <div class="{priority_class}">
+        <div style="display: flex; justify-content: space-between;">
+            <div>
+                <span class="alert-badge {badge_class}">{priority}</span>
+                <b>{time_str}</b> Tukang parkir terdeteksi di <b>{notification.get('lokasi')}</b>
+            </div>
+            <div>
+                {notif_status}
+            </div>
+        </div>
+        <div style="margin-top: 5px; font-size: 0.9em">
+            Confidence: <b>{notification.get('confidence', 0.8):.2f}</b> | 
+            Durasi: <b>{notification.get('durasi_menit', 5)} menit</b>
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
@@ -0,0 +1,10 @@
+import os
+
+
+# Number from environment variable `name`, converted with `kind`; `default`
+# when it is unset or not a number
+def env_number(name, default, kind=float):
+    try:
+        return kind(os.environ.get(name, default))
+    except ValueError:
+        return default
@@ -0,0 +1,245 @@
+import dataclasses
+import datetime
+import os
+
+import numpy as np
+import pandas as pd
+
+import zones
+
+# Set this to a Parquet file, or an SQLite database (.db/.sqlite), to load
+# detection history instead of dummy data
+DATA_PATH_ENV = "PARKIR_DATA_PATH"
+SQLITE_SUFFIXES = (".db", ".sqlite", ".sqlite3")
+
+DETECTION_COLUMNS = [
+    "waktu", "lokasi", "confidence", "durasi_menit",
+    "status", "prioritas", "notifikasi_terkirim"
+]
+
+PRIORITY_ORDER = {"Tinggi": 0, "Sedang": 1, "Rendah": 2}
+STATUSES = ("Selesai", "Aktif")
+RECENT_ALERT_LIMIT = 10
+
+# In-memory dtypes of the detection table: categoricals for the repeated
+# strings (prioritas ordered most severe first), 4-byte confidence and
+# 2-byte durations
+STRING_COLUMNS = ["lokasi", "status", "prioritas"]
+COMPACT_DTYPES = {
+    "lokasi": "category",
+    "confidence": np.float32,
+    "durasi_menit": np.int16,
+    "status": pd.CategoricalDtype(STATUSES),
+    "prioritas": pd.CategoricalDtype(zones.PRIORITIES, ordered=True),
+    "notifikasi_terkirim": bool
+}
+
+# Right-closed duration buckets (minutes) of the statistics page; the last
+# bucket is open-ended
+DURATION_BINS = (0, 5, 10, 15, 30, 60)
+DURATION_LABELS = ("<5", "5-10", "10-15", "15-30", "30-60", ">60")
+
+
+def configured_data_path():
+    return os.environ.get(DATA_PATH_ENV) or None
+
+
+def is_sqlite(path):
+    return str(path).lower().endswith(SQLITE_SUFFIXES)
+
+
+def save_detections(detections_df, path):
+    detections_df[DETECTION_COLUMNS].to_parquet(path, index=False)
+
+
+# Strings are read straight into categoricals, without a Python object per row
+def load_detections(path):
+    return compact_detections(pd.read_parquet(path, columns=DETECTION_COLUMNS, read_dictionary=STRING_COLUMNS))
+
+
+# The compact in-memory layout, sorted by time with a DatetimeIndex over
+# waktu, so day and time-window lookups are binary searches
+def compact_detections(detections_df):
+    detections_df = detections_df[DETECTION_COLUMNS].astype(COMPACT_DTYPES)
+    detections_df["waktu"] = detections_df["waktu"].astype("datetime64[ns]")
+    detections_df = detections_df.sort_values("waktu", kind="stable")
+    detections_df.index = pd.DatetimeIndex(detections_df["waktu"])
+    detections_df.index.name = None
+    return detections_df
+
+
+# Build the daily, hourly and per-location summaries used by the pages.
+# Days, hours and cameras become small integers and every summary is a
+# bincount over them.
+def summarize_detections(detections_df, locations, now, days=7):
+    waktu = detections_df["waktu"].to_numpy()
+    day = waktu.astype("datetime64[D]")
+    days_ago = (np.datetime64(now.date(), "D") - day).astype(np.int64)
+    hour = ((waktu - day) // np.timedelta64(1, "h")).astype(np.int64)
+    duration = detections_df["durasi_menit"].to_numpy(np.float64)
+    completed = (detections_df["status"] == "Selesai").to_numpy()
+    active = (detections_df["status"] == "Aktif").to_numpy()
+
+    # Camera codes in the order of `locations`, mapped once per category;
+    # other cameras get -1
+    position = {loc: idx for idx, loc in enumerate(locations)}
+    lokasi = detections_df["lokasi"].astype("category")
+    mapping = np.append(pd.Index(locations).get_indexer(lokasi.cat.categories), -1)
+    codes = mapping[lokasi.cat.codes.to_numpy()]
+    known = codes >= 0
+    n_loc = len(position)
+
+    # Daily summary for the last `days` days
+    in_window = (days_ago >= 0) & (days_ago < days)
+    ago = days_ago[in_window]
+    day_totals = np.bincount(ago, minlength=days)
+    done = completed[in_window]
+    day_completed = np.bincount(ago[done], minlength=days)
+    day_durations = np.bincount(ago[done], weights=duration[in_window][done], minlength=days)
+    window_known = known[in_window]
+    day_locations = np.bincount(
+        ago[window_known] * n_loc + codes[in_window][window_known], minlength=days * n_loc
+    ).reshape(days, n_loc)
+
+    daily_summary = {}
+    for offset in range(days):
+        date = now.date() - datetime.timedelta(days=offset)
+        daily_summary[date] = {
+            "tanggal": date,
+            "total": int(day_totals[offset]),
+            "durasi_rata": float(day_durations[offset] / day_completed[offset]) if day_completed[offset] else 0.0,
+            "lokasi_counts": {loc: int(day_locations[offset, idx]) for loc, idx in position.items()}
+        }
+
+    # Hourly stats across the whole history
+    hour_counts = np.bincount(hour, minlength=24)
+    hourly_df = pd.DataFrame({
+        "jam": range(24),
+        "jumlah": [int(count) for count in hour_counts]
+    })
+
+    # Location summary
+    loc_totals = np.bincount(codes[known], minlength=n_loc)
+    loc_active = np.bincount(codes[known & active], minlength=n_loc)
+    loc_durations = np.bincount(codes[known], weights=duration[known], minlength=n_loc)
+
+    location_summary = {}
+    for loc, idx in position.items():
+        location_summary[loc] = {
+            "total": int(loc_totals[idx]),
+            "aktif": int(loc_active[idx]),
+            "durasi_rata": float(loc_durations[idx] / loc_totals[idx]) if loc_totals[idx] else 0.0
+        }
+
+    return daily_summary, hourly_df, location_summary
+
+
+# The "Riwayat Deteksi" filters; an empty selection means no filter
+@dataclasses.dataclass(frozen=True)
+class HistoryFilter:
+    day: datetime.date
+    statuses: tuple = ()
+    locations: tuple = ()
+    priorities: tuple = ()
+    min_confidence: float = 0.0
+    min_duration: int = 0
+    max_duration: int = None
+
+
+# Detection history held in memory as one compact DataFrame (Parquet files
+# and the dummy data). SqliteHistory in history_db answers the same queries
+# in SQL.
+class DataFrameHistory:
+    def __init__(self, detections_df):
+        self.detections_df = compact_detections(detections_df)
+
+    def __len__(self):
+        return len(self.detections_df)
+
+    # Positions of the rows with start <= waktu < end
+    def _between(self, start, end):
+        index = self.detections_df.index
+        return index.searchsorted(pd.Timestamp(start)), index.searchsorted(pd.Timestamp(end))
+
+    def _day(self, day):
+        start = pd.Timestamp(day)
+        return self._between(start, start + pd.Timedelta(days=1))
+
+    def locations(self):
+        return list(self.detections_df["lokasi"].unique())
+
+    def first_time(self):
+        return None if self.detections_df.empty else self.detections_df["waktu"].iloc[0]
+
+    def summarize(self, locations, now, days=7):
+        return summarize_detections(self.detections_df, locations, now, days)
+
+    def count_on(self, day):
+        first, last = self._day(day)
+        return int(last - first)
+
+    def filter(self, flt):
+        first, last = self._day(flt.day)
+        df = self.detections_df.iloc[first:last]
+        keep = df["confidence"].to_numpy() >= np.float32(flt.min_confidence)
+        if flt.statuses:
+            keep &= df["status"].isin(flt.statuses).to_numpy()
+        if flt.locations:
+            keep &= df["lokasi"].isin(flt.locations).to_numpy()
+        if flt.priorities:
+            keep &= df["prioritas"].isin(flt.priorities).to_numpy()
+        durations = df["durasi_menit"].to_numpy()
+        keep &= durations >= flt.min_duration
+        if flt.max_duration is not None:
+            keep &= durations <= flt.max_duration
+        # Numbered from 0 like a query result; display code needs a unique index
+        return df[keep].reset_index(drop=True)
+
+    # Detections per DURATION_LABELS bucket
+    def duration_counts(self):
+        durations = self.detections_df["durasi_menit"].to_numpy()
+        buckets = np.searchsorted(DURATION_BINS, durations[durations > DURATION_BINS[0]], side="left") - 1
+        return pd.Series(
+            np.bincount(buckets, minlength=len(DURATION_LABELS)),
+            index=pd.CategoricalIndex(DURATION_LABELS, categories=DURATION_LABELS, ordered=True),
+            name="count"
+        )
+
+    def pending_notifications(self):
+        df = self.detections_df
+        return int(((df["status"] == "Aktif") & ~df["notifikasi_terkirim"]).sum())
+
+    # Header metrics and alert lists. The frame is sorted by time, so the
+    # day counts and the last 24 hours are binary searches on the index.
+    def aggregates(self, now):
+        df = self.detections_df
+        today = pd.Timestamp(now.date())
+        today_first, today_last = self._day(today)
+        yesterday_first, yesterday_last = self._day(today - pd.Timedelta(days=1))
+        is_active = df["status"] == "Aktif"
+
+        # Active alerts by priority (High, Medium, Low) then most recent
+        active_detections = df[is_active].sort_values(by=["prioritas", "waktu"], ascending=[True, False])
+
+        # From 24 hours ago on, most recent first
+        recent_first = df.index.searchsorted(pd.Timestamp(now - datetime.timedelta(hours=24)))
+        recent_alerts = df.iloc[max(recent_first, len(df) - RECENT_ALERT_LIMIT):].iloc[::-1]
+
+        return {
+            "today_detections": int(today_last - today_first),
+            "yesterday_detections": int(yesterday_last - yesterday_first),
+            "active_count": int(is_active.sum()),
+            "mean_duration": float(df["durasi_menit"].mean()) if not df.empty else 0.0,
+            "active_detections": active_detections,
+            "recent_alerts": recent_alerts
+        }
+
+
+# History behind a configured data path: SQLite databases are queried in
+# place, Parquet files are loaded into memory
+def open_history(path):
+    if is_sqlite(path):
+        import history_db
+
+        return history_db.open_database(path)
+    return DataFrameHistory(load_detections(path))
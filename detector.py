@@ -0,0 +1,297 @@
+"""Detectors: the simulated stand-in and YOLO11 through ONNX Runtime.
+
+Export YOLO11 once with Ultralytics (``yolo export model=yolo11n.pt
+format=onnx dynamic=True``), point PARKIR_MODEL at the .onnx file and pick
+the variant with PARKIR_MODEL_VARIANT (fp32 or int8). The INT8 model is
+made from the FP32 one, calibrated on sample images:
+
+    python -m detector quantize --model yolo11n.onnx --images benchmarks/samples
+"""
+import argparse
+import os
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+import postprocess
+
+MODEL_ENV = "PARKIR_MODEL"
+MODEL_VARIANT_ENV = "PARKIR_MODEL_VARIANT"
+VARIANTS = ("fp32", "int8")
+
+# Square input sizes a camera can pick; smaller is faster and less accurate
+INPUT_SIZES = (320, 480, 640)
+DEFAULT_INPUT_SIZE = 640
+
+# Raw candidates below this never reach post-processing
+CANDIDATE_CONFIDENCE = 0.25
+MAX_CANDIDATES = 300
+
+# COCO class ids of the YOLO11 export mapped onto our classes
+COCO_CLASSES = {
+    0: postprocess.PERSON_CLASS,
+    2: postprocess.CLASS_NAMES.index("kendaraan"),
+    3: postprocess.CLASS_NAMES.index("kendaraan"),
+    5: postprocess.CLASS_NAMES.index("kendaraan"),
+    7: postprocess.CLASS_NAMES.index("kendaraan")
+}
+
+LETTERBOX_FILL = 114
+
+# Candidates the simulated head emits around each object, and how many
+# low-confidence false positives it scatters over a frame
+CANDIDATES_PER_OBJECT = 4
+MAX_FALSE_POSITIVES = 3
+
+
+# Stand-in for the YOLO model on synthetic scenes. Like a real detection
+# head it returns raw, overlapping candidates before thresholding and NMS:
+# a few jittered boxes per object in the scene plus scattered low-confidence
+# noise. Smaller input sizes jitter more. Frames without ground truth (real
+# video) yield nothing.
+class SimulatedDetector:
+    name = "simulasi"
+    variant = "fp32"
+
+    def __init__(self, seed=None):
+        self._rng = np.random.default_rng(seed)
+        self.warmup_ms = {}
+
+    def supports(self, imgsz):
+        return True
+
+    def warmup(self, sizes=(DEFAULT_INPUT_SIZE,), runs=1):
+        return self.warmup_ms
+
+    def predict(self, frame, truth=None, imgsz=DEFAULT_INPUT_SIZE):
+        if truth is None:
+            return postprocess.Detections.empty()
+        truth_boxes, truth_classes = truth
+        rng = self._rng
+        height, width = frame.shape[:2]
+
+        n = len(truth_boxes) * CANDIDATES_PER_OBJECT
+        boxes = np.repeat(truth_boxes, CANDIDATES_PER_OBJECT, axis=0)
+        boxes = boxes + rng.normal(0, 4 * DEFAULT_INPUT_SIZE / imgsz, size=boxes.shape)
+        best = np.repeat(rng.uniform(0.78, 0.96, size=len(truth_boxes)), CANDIDATES_PER_OBJECT)
+        # The first candidate of each object carries its best score
+        decay = rng.uniform(0.05, 0.4, size=n)
+        decay[::CANDIDATES_PER_OBJECT] = 0
+        scores = best - decay
+        classes = np.repeat(truth_classes, CANDIDATES_PER_OBJECT)
+
+        n_noise = int(rng.integers(0, MAX_FALSE_POSITIVES + 1))
+        corner = rng.uniform((0, 0), (width - 60, height - 110), size=(n_noise, 2))
+        noise = np.hstack([corner, corner + rng.uniform((30, 60), (60, 110), size=(n_noise, 2))])
+
+        return postprocess.Detections(
+            boxes=np.vstack([boxes, noise]).astype(np.float32),
+            scores=np.concatenate([scores, rng.uniform(0.2, 0.7, size=n_noise)]).astype(np.float32),
+            classes=np.concatenate([classes, rng.integers(0, len(postprocess.CLASS_NAMES), size=n_noise)])
+            .astype(np.int16)
+        )
+
+
+def _import_onnxruntime():
+    try:
+        import onnxruntime
+    except ImportError:
+        raise RuntimeError("onnxruntime belum terpasang") from None
+    return onnxruntime
+
+
+def variant_path(model_path, variant):
+    if variant not in VARIANTS:
+        raise ValueError(f"Varian model tidak dikenal: {variant}")
+    path = Path(model_path)
+    return path if variant == "fp32" else path.with_suffix(f".{variant}.onnx")
+
+
+# Resize `frame` (RGB) into the centre of `out`, a (1, 3, size, size)
+# float32 tensor, keeping the aspect ratio. Returns (scale, pad_x, pad_y)
+# to map boxes back to frame pixels.
+def letterbox(frame, out):
+    from PIL import Image
+
+    size = out.shape[-1]
+    height, width = frame.shape[:2]
+    scale = min(size / width, size / height)
+    new_w, new_h = round(width * scale), round(height * scale)
+    pad_x, pad_y = (size - new_w) // 2, (size - new_h) // 2
+
+    resized = np.asarray(Image.fromarray(frame).resize((new_w, new_h), Image.BILINEAR))
+    out.fill(LETTERBOX_FILL / 255.0)
+    np.multiply(
+        resized.transpose(2, 0, 1), 1 / 255.0,
+        out=out[0, :, pad_y:pad_y + new_h, pad_x:pad_x + new_w], casting="unsafe"
+    )
+    return scale, pad_x, pad_y
+
+
+# YOLO11 exported to ONNX, run on CPU through ONNX Runtime. Each input size
+# has its own preallocated input tensor; one session serves every camera.
+class YoloOnnxDetector:
+    def __init__(self, model_path, variant="fp32", threads=None):
+        ort = _import_onnxruntime()
+        path = variant_path(model_path, variant)
+        if not path.exists():
+            hint = " (buat dengan: python -m detector quantize)" if variant != "fp32" else ""
+            raise FileNotFoundError(f"Model {path} tidak ditemukan{hint}")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(str(path), options, providers=["CPUExecutionProvider"])
+        model_input = self.session.get_inputs()[0]
+        self.input_name = model_input.name
+        # A static export only accepts the size it was exported with
+        height = model_input.shape[2]
+        self.fixed_size = height if isinstance(height, int) else None
+
+        self.name = path.name
+        self.variant = variant
+        self.warmup_ms = {}
+        self._inputs = {}
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def supports(self, imgsz):
+        return self.fixed_size is None or imgsz == self.fixed_size
+
+    def _input(self, imgsz):
+        with self._guard:
+            if imgsz not in self._inputs:
+                self._inputs[imgsz] = np.empty((1, 3, imgsz, imgsz), dtype=np.float32)
+                self._locks[imgsz] = threading.Lock()
+            return self._inputs[imgsz], self._locks[imgsz]
+
+    # Run each input size a few times so the first real frame does not pay
+    # for graph optimisation and allocator growth; returns the first-run
+    # latency per size in ms
+    def warmup(self, sizes=(DEFAULT_INPUT_SIZE,), runs=2):
+        blank = np.full((DEFAULT_INPUT_SIZE, DEFAULT_INPUT_SIZE, 3), LETTERBOX_FILL, dtype=np.uint8)
+        for imgsz in sizes:
+            if not self.supports(imgsz):
+                continue
+            for run in range(runs):
+                started = time.perf_counter()
+                self.predict(blank, imgsz=imgsz)
+                if run == 0:
+                    self.warmup_ms[imgsz] = (time.perf_counter() - started) * 1000
+        return self.warmup_ms
+
+    def predict(self, frame, truth=None, imgsz=DEFAULT_INPUT_SIZE):
+        if not self.supports(imgsz):
+            imgsz = self.fixed_size
+        tensor, lock = self._input(imgsz)
+        with lock:
+            scale, pad_x, pad_y = letterbox(frame, tensor)
+            output = self.session.run(None, {self.input_name: tensor})[0]
+        return decode_yolo(output[0], scale, pad_x, pad_y, frame.shape)
+
+
+# Raw YOLO head output (4 + classes, anchors) to candidates in frame pixels
+def decode_yolo(output, scale, pad_x, pad_y, shape):
+    predictions = output.T
+    class_scores = predictions[:, 4:]
+    coco_class = class_scores.argmax(axis=1)
+    scores = class_scores[np.arange(len(class_scores)), coco_class]
+
+    mapping = np.full(class_scores.shape[1], -1, dtype=np.int16)
+    for coco_id, cls in COCO_CLASSES.items():
+        if coco_id < len(mapping):
+            mapping[coco_id] = cls
+    classes = mapping[coco_class]
+
+    keep = (scores >= CANDIDATE_CONFIDENCE) & (classes >= 0)
+    index = np.flatnonzero(keep)
+    if len(index) > MAX_CANDIDATES:
+        index = index[np.argpartition(-scores[index], MAX_CANDIDATES)[:MAX_CANDIDATES]]
+
+    cx, cy, w, h = predictions[index, :4].T
+    boxes = np.stack([cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2], axis=1)
+    boxes[:, [0, 2]] = ((boxes[:, [0, 2]] - pad_x) / scale).clip(0, shape[1])
+    boxes[:, [1, 3]] = ((boxes[:, [1, 3]] - pad_y) / scale).clip(0, shape[0])
+    return postprocess.Detections(
+        boxes=boxes.astype(np.float32),
+        scores=scores[index].astype(np.float32),
+        classes=classes[index]
+    )
+
+
+def configured_model():
+    return os.environ.get(MODEL_ENV) or None, os.environ.get(MODEL_VARIANT_ENV, "fp32")
+
+
+# YOLO11 when PARKIR_MODEL is set, otherwise the simulated detector
+def load_detector(model_path=None, variant="fp32", threads=None):
+    if model_path is None:
+        return SimulatedDetector()
+    return YoloOnnxDetector(model_path, variant, threads)
+
+
+def load_images(directory):
+    from PIL import Image
+
+    paths = sorted(p for p in Path(directory).iterdir() if p.suffix.lower() in (".jpg", ".jpeg", ".png"))
+    return [(p.name, np.asarray(Image.open(p).convert("RGB"))) for p in paths]
+
+
+# Static INT8 quantization (QDQ, per-channel weights) calibrated on `images`
+def quantize(model_path, images, out_path=None, imgsz=DEFAULT_INPUT_SIZE):
+    _import_onnxruntime()
+    from onnxruntime.quantization import CalibrationDataReader, QuantFormat, QuantType, quantize_static
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+
+    out_path = out_path or variant_path(model_path, "int8")
+    session = YoloOnnxDetector(model_path).session
+    input_name = session.get_inputs()[0].name
+    height = session.get_inputs()[0].shape[2]
+    imgsz = height if isinstance(height, int) else imgsz
+
+    class Reader(CalibrationDataReader):
+        def __init__(self):
+            self._frames = iter(images)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            tensor = np.empty((1, 3, imgsz, imgsz), dtype=np.float32)
+            letterbox(frame, tensor)
+            return {input_name: tensor}
+
+    prepared = Path(out_path).with_suffix(".pre.onnx")
+    quant_pre_process(str(model_path), str(prepared), skip_symbolic_shape=True)
+    try:
+        quantize_static(
+            str(prepared), str(out_path), Reader(),
+            quant_format=QuantFormat.QDQ,
+            per_channel=True,
+            activation_type=QuantType.QUInt8,
+            weight_type=QuantType.QInt8
+        )
+    finally:
+        prepared.unlink(missing_ok=True)
+    return out_path
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detector model tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    quant = commands.add_parser("quantize", help="build the INT8 variant of an ONNX model")
+    quant.add_argument("--model", default=os.environ.get(MODEL_ENV), required=MODEL_ENV not in os.environ)
+    quant.add_argument("--images", required=True, help="calibration images directory")
+    quant.add_argument("--out", help="defaults to <model>.int8.onnx")
+    args = parser.parse_args(argv)
+
+    images = [frame for _, frame in load_images(args.images)]
+    out = quantize(args.model, images, args.out)
+    print(f"Model INT8 ditulis ke {out} ({len(images)} gambar kalibrasi)")
+
+
+if __name__ == "__main__":
+    main()
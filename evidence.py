@@ -0,0 +1,67 @@
+import datetime
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import cameras
+
+# Set this to a directory to keep a JPEG of every violation the pipeline
+# records. Images are stored per day, so expiring a day is removing one
+# directory.
+EVIDENCE_DIR_ENV = "PARKIR_EVIDENCE_DIR"
+DAY_FORMAT = "%Y-%m-%d"
+
+
+def configured_evidence_dir():
+    return os.environ.get(EVIDENCE_DIR_ENV) or None
+
+
+# <root>/<day>/<camera>_<HHMMSS>.jpg for the violation that started at
+# `waktu`; the history keeps whole seconds, so does the file name
+def evidence_path(root, lokasi, waktu):
+    waktu = pd.Timestamp(waktu)
+    return Path(root) / waktu.strftime(DAY_FORMAT) / f"{cameras.slug(lokasi)}_{waktu:%H%M%S}.jpg"
+
+
+# Written under a temporary name and renamed, so readers never see half a file
+def save_evidence(root, lokasi, waktu, image):
+    path = evidence_path(root, lokasi, waktu)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_suffix(".part")
+    partial.write_bytes(image)
+    partial.replace(path)
+    return path
+
+
+def find_evidence(root, lokasi, waktu):
+    path = evidence_path(root, lokasi, waktu)
+    return path if path.exists() else None
+
+
+# Day directories from before `before` (a date), oldest first
+def expired_days(root, before):
+    root = Path(root)
+    if not root.is_dir():
+        return []
+    days = []
+    for path in root.iterdir():
+        try:
+            day = datetime.datetime.strptime(path.name, DAY_FORMAT).date()
+        except ValueError:
+            continue
+        if path.is_dir() and day < before:
+            days.append((day, path))
+    return [path for _, path in sorted(days)]
+
+
+# Delete one day of evidence; returns (files, bytes) removed
+def remove_day(path):
+    files, size = 0, 0
+    for item in Path(path).iterdir():
+        if item.is_file():
+            size += item.stat().st_size
+            item.unlink()
+            files += 1
+    Path(path).rmdir()
+    return files, size
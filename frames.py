@@ -0,0 +1,199 @@
+import datetime
+import functools
+import io
+import random
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+import postprocess
+import profiling
+
+JPEG_QUALITY = 85
+
+# Camera wall mosaic: canvas colour and the height of a tile's title and
+# status bars
+MOSAIC_BACKGROUND = (15, 23, 42)
+MOSAIC_BAR = 16
+
+VEHICLE_CLASS = postprocess.CLASS_NAMES.index("kendaraan")
+
+
+# Create a realistic CCTV frame. Returns the image and the scene's ground
+# truth as (xyxy boxes, class ids), which the simulated detector reports back.
+@profiling.timed()
+def create_cctv_frame(location, has_violation=False):
+    width, height = 640, 480
+    
+    # Create base image (darker for CCTV look)
+    img = Image.new('RGB', (width, height), color=(30, 30, 35))
+    draw = ImageDraw.Draw(img)
+    
+    # Draw grid lines for perspective
+    for x in range(0, width, 50):
+        # Vertical lines with perspective (closer together at the top)
+        draw.line([(x, height), (width//2 + (x - width//2)//2, height//3)], fill=(50, 50, 55), width=1)
+    
+    for y in range(height//3, height, 50):
+        # Horizontal lines
+        draw.line([(0, y), (width, y)], fill=(50, 50, 55), width=1)
+    
+    # Draw a sidewalk area
+    draw.rectangle([(50, height-100), (width-50, height)], fill=(60, 60, 65))
+    
+    # Add some background shapes (buildings, signs)
+    draw.rectangle([(50, 50), (150, 150)], fill=(70, 70, 80))
+    draw.rectangle([(400, 70), (500, 140)], fill=(65, 65, 75))
+    
+    # Add location and timestamp text
+    timestamp = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    draw.rectangle([(10, 10), (350, 30)], fill=(0, 0, 0, 150))
+    draw.text((15, 15), f"{location} | {timestamp}", fill=(240, 240, 240))
+    
+    # Add recording indicator
+    draw.ellipse([(width-25, 15), (width-15, 25)], fill=(255, 0, 0))
+    draw.text((width-15, 15), "REC", fill=(255, 255, 255))
+    
+    objects = []
+    if has_violation:
+        # Draw a person (tukang parkir)
+        person_x = random.randint(100, width-150)
+        person_y = height - 80
+        
+        # Body
+        draw.rectangle([(person_x-10, person_y-50), (person_x+10, person_y)], fill=(50, 50, 120))
+        # Head
+        draw.ellipse([(person_x-8, person_y-70), (person_x+8, person_y-54)], fill=(80, 60, 40))
+        # Arms
+        draw.line([(person_x-10, person_y-40), (person_x-25, person_y-20)], fill=(50, 50, 120), width=5)
+        draw.line([(person_x+10, person_y-40), (person_x+25, person_y-20)], fill=(50, 50, 120), width=5)
+        # Legs
+        draw.line([(person_x-5, person_y), (person_x-10, person_y+30)], fill=(30, 30, 70), width=8)
+        draw.line([(person_x+5, person_y), (person_x+10, person_y+30)], fill=(30, 30, 70), width=8)
+        
+        objects.append(((person_x-30, person_y-75, person_x+30, person_y+35), postprocess.PERSON_CLASS))
+        
+        # Add a parked vehicle nearby
+        vehicle_x = person_x + random.randint(-50, 50)
+        vehicle_y = person_y + 10
+        
+        # Simple car shape
+        draw.rectangle([(vehicle_x-40, vehicle_y), (vehicle_x+40, vehicle_y+25)], fill=(120, 120, 140))
+        draw.rectangle([(vehicle_x-30, vehicle_y-15), (vehicle_x+30, vehicle_y)], fill=(100, 100, 130))
+        # Wheels
+        draw.ellipse([(vehicle_x-30, vehicle_y+20), (vehicle_x-20, vehicle_y+30)], fill=(30, 30, 30))
+        draw.ellipse([(vehicle_x+20, vehicle_y+20), (vehicle_x+30, vehicle_y+30)], fill=(30, 30, 30))
+        objects.append(((vehicle_x-40, vehicle_y-15, vehicle_x+40, vehicle_y+30), VEHICLE_CLASS))
+    
+    # Add noise to simulate poor camera quality
+    pixels = np.array(img)
+    noise = np.random.randint(-10, 10, pixels.shape)
+    pixels = np.clip(pixels + noise, 0, 255).astype(np.uint8)
+    
+    boxes = np.array([box for box, _ in objects], dtype=np.float32).reshape(-1, 4)
+    classes = np.array([cls for _, cls in objects], dtype=np.int16)
+    return Image.fromarray(pixels), (boxes, classes)
+
+
+# Outline the no-parking zones and label each detected person: red inside a
+# zone (a violation), grey outside
+@profiling.timed()
+def draw_detections(img, detections, zone_ids, camera_zones=()):
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+    draw = ImageDraw.Draw(img)
+    width, height = img.size
+    
+    for zone in camera_zones:
+        points = [(x * (width - 1), y * (height - 1)) for x, y in zone.polygon]
+        draw.line(points + points[:1], fill=(240, 200, 60), width=1)
+    
+    for (x1, y1, x2, y2), score, zone_id in zip(detections.boxes, detections.scores, zone_ids):
+        if zone_id:
+            color, label = (255, 50, 50), f"Tukang Parkir: {score:.2f}"
+        else:
+            color, label = (160, 160, 160), f"Orang: {score:.2f}"
+        draw.rectangle([(x1, y1), (x2, y2)], outline=color, width=2)
+        draw.rectangle([(x1, y1-20), (x1+110, y1)], fill=(0, 0, 0, 180))
+        draw.text((x1+5, y1-15), label, fill=color)
+    return img
+
+
+def new_canvas(size):
+    return Image.new("RGB", size, MOSAIC_BACKGROUND)
+
+
+def clear_canvas(canvas):
+    canvas.paste(MOSAIC_BACKGROUND, (0, 0) + canvas.size)
+
+
+# Shorten `text` with "..." until it fits `width` pixels
+def _fit(draw, text, width):
+    if draw.textlength(text) <= width:
+        return text
+    while text and draw.textlength(text + "...") > width:
+        text = text[:-1]
+    return text + "..."
+
+
+# A tile's title or status bar. Titles never change and statuses repeat, so
+# each bar is rendered once; text layout costs more than the rest of a tile.
+@functools.lru_cache(maxsize=512)
+def _bar(text, width, background):
+    bar = Image.new("RGB", (width, MOSAIC_BAR + 1), background)
+    draw = ImageDraw.Draw(bar)
+    draw.text((4, 2), _fit(draw, text, width - 8), fill=(255, 255, 255))
+    return bar
+
+
+# `pixels` as an image of `size`: reduced by a whole factor when the sizes
+# allow it, which is cheaper than resampling
+def thumbnail(pixels, size):
+    height, width = pixels.shape[:2]
+    img = Image.fromarray(pixels)
+    factor = width // size[0]
+    if factor > 1 and (width, height) == (size[0] * factor, size[1] * factor):
+        return img.reduce(factor)
+    if (width, height) != tuple(size):
+        return img.resize(tuple(size), Image.BILINEAR)
+    return img
+
+
+# Draw one camera into its tile of a mosaic canvas, in place: the frame
+# reduced to the tile, zone outlines and people boxes (no labels at this
+# size), a title bar and a status bar, red with a border for a violation
+@profiling.timed()
+def draw_tile(canvas, tile, pixels, detections, zone_ids, camera_zones, title, status, alert):
+    height, width = pixels.shape[:2]
+    canvas.paste(thumbnail(pixels, (tile.width, tile.height)), (tile.x, tile.y))
+
+    draw = ImageDraw.Draw(canvas)
+    right, bottom = tile.x + tile.width - 1, tile.y + tile.height - 1
+    for zone in camera_zones:
+        points = [(tile.x + x * (tile.width - 1), tile.y + y * (tile.height - 1)) for x, y in zone.polygon]
+        draw.line(points + points[:1], fill=(240, 200, 60), width=1)
+
+    scale = np.array([tile.width / width, tile.height / height] * 2, dtype=np.float32)
+    boxes = np.clip(detections.boxes, 0, [width, height, width, height]) * scale + [tile.x, tile.y] * 2
+    for (x1, y1, x2, y2), zone_id in zip(boxes.tolist(), zone_ids):
+        color = (255, 50, 50) if zone_id else (160, 160, 160)
+        draw.rectangle([(x1, y1), (x2, y2)], outline=color, width=2 if zone_id else 1)
+
+    canvas.paste(_bar(title, tile.width, (0, 0, 0)), (tile.x, tile.y))
+    canvas.paste(_bar(status, tile.width, (153, 27, 27) if alert else (6, 95, 70)), (tile.x, bottom - MOSAIC_BAR))
+    if alert:
+        draw.rectangle([(tile.x, tile.y), (right, bottom)], outline=(239, 68, 68), width=3)
+
+
+# Encode once so every session can reuse the same bytes without re-encoding.
+# Accepts a PIL image or an RGB array from a video source.
+def encode_jpeg(img, quality=JPEG_QUALITY):
+    if isinstance(img, np.ndarray):
+        img = Image.fromarray(img)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def decode_jpeg(data):
+    return np.asarray(Image.open(io.BytesIO(data)).convert("RGB"))
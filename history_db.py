@@ -0,0 +1,616 @@
+"""Detection history in SQLite.
+
+Point PARKIR_DATA_PATH at a .db/.sqlite file to use it. Pages query the
+database in place (indexed filters, GROUP BY summaries) instead of loading
+the whole history, and the pipeline appends its violations through
+HistoryWriter. Seed or migrate a database with:
+
+    python -m workload --cameras 50 --days 30 --out data/detections.db
+    python -m history_db import data/detections.parquet data/detections.db
+
+Old detections are rolled up into hourly totals by the retention job (see
+retention.py); a database from before that can be rebuilt once, offline,
+so freed pages are returned to the file system as they come free:
+
+    python -m history_db vacuum data/detections.db
+"""
+import argparse
+import atexit
+import contextlib
+import datetime
+import functools
+import itertools
+import operator
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+import metrics
+
+from data_store import (
+    COMPACT_DTYPES, DETECTION_COLUMNS, DURATION_BINS, DURATION_LABELS, PRIORITY_ORDER, RECENT_ALERT_LIMIT
+)
+
+# Number of detections per DURATION_BINS bucket, as SQL expressions over
+# durasi_menit
+DURATION_BUCKETS = [
+    f"durasi_menit > {lower}" + (f" AND durasi_menit <= {upper}" if upper is not None else "")
+    for lower, upper in zip(DURATION_BINS, DURATION_BINS[1:] + (None,))
+]
+BUCKET_COLUMNS = [f"jumlah_durasi_{index}" for index in range(len(DURATION_BUCKETS))]
+
+# waktu is naive local time in whole seconds since 1970-01-01, so a row's
+# day is waktu / 86400 and its hour (waktu % 86400) / 3600. The camera index
+# also covers status and duration, so per-camera summaries never touch the
+# table itself. deteksi_rollup holds the totals per day, hour and camera of
+# detections past the retention window.
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS deteksi (
+    id INTEGER PRIMARY KEY,
+    waktu INTEGER NOT NULL,
+    lokasi TEXT NOT NULL,
+    confidence REAL NOT NULL,
+    durasi_menit INTEGER NOT NULL,
+    status TEXT NOT NULL,
+    prioritas TEXT NOT NULL,
+    notifikasi_terkirim INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deteksi_waktu ON deteksi (waktu);
+CREATE INDEX IF NOT EXISTS deteksi_lokasi_waktu ON deteksi (lokasi, waktu, status, durasi_menit);
+CREATE INDEX IF NOT EXISTS deteksi_status ON deteksi (status);
+CREATE TABLE IF NOT EXISTS deteksi_rollup (
+    hari INTEGER NOT NULL,
+    jam INTEGER NOT NULL,
+    lokasi TEXT NOT NULL,
+    jumlah INTEGER NOT NULL,
+    aktif INTEGER NOT NULL,
+    selesai INTEGER NOT NULL,
+    durasi INTEGER NOT NULL,
+    durasi_selesai INTEGER NOT NULL,
+    {", ".join(f"{column} INTEGER NOT NULL" for column in BUCKET_COLUMNS)},
+    PRIMARY KEY (hari, jam, lokasi)
+) WITHOUT ROWID;
+"""
+
+SECONDS_PER_DAY = 86400
+EPOCH = datetime.datetime(1970, 1, 1)
+BUSY_TIMEOUT_MS = 5000
+MMAP_SIZE = 256 * 1024 * 1024
+
+SELECT_COLUMNS = ", ".join(DETECTION_COLUMNS)
+INSERT_SQL = f"INSERT INTO deteksi ({SELECT_COLUMNS}) VALUES ({', '.join('?' * len(DETECTION_COLUMNS))})"
+FINISH_SQL = (
+    "UPDATE deteksi SET status = 'Selesai', durasi_menit = ? "
+    "WHERE lokasi = ? AND waktu = ? AND status = 'Aktif'"
+)
+
+# Distinct cameras by hopping along the (lokasi, waktu) index: one seek per
+# camera instead of a scan over every row. Cameras that only have rolled-up
+# history come from the much smaller rollup table.
+LOCATIONS_SQL = """
+WITH RECURSIVE loc(lokasi) AS (
+    SELECT MIN(lokasi) FROM deteksi
+    UNION ALL
+    SELECT (SELECT MIN(lokasi) FROM deteksi WHERE lokasi > loc.lokasi) FROM loc WHERE loc.lokasi IS NOT NULL
+)
+SELECT lokasi FROM loc WHERE lokasi IS NOT NULL
+UNION
+SELECT DISTINCT lokasi FROM deteksi_rollup
+"""
+
+PRIORITY_SQL = "CASE prioritas " + " ".join(
+    f"WHEN '{priority}' THEN {value}" for priority, value in PRIORITY_ORDER.items()
+) + " END"
+
+# One conditional sum per duration bucket: a single pass with no GROUP BY
+DURATION_SQL = ", ".join(f"SUM({bucket})" for bucket in DURATION_BUCKETS)
+ROLLUP_DURATION_SQL = ", ".join(f"SUM({column})" for column in BUCKET_COLUMNS)
+
+# The summaries, each grouped in SQL down to the shape it is shown in, over
+# the detail rows and the rolled-up hours. Days and hours are counted from
+# 1970-01-01 on the naive local seconds in waktu, so hour of day is plain
+# arithmetic rather than strftime.
+#
+# Per day and camera from a first day on: count, completed count and their
+# duration. The cameras are found by skipping through the camera index one
+# key at a time, then each camera's window is one range of that covering
+# index, so neither the older rows nor the table itself are read.
+DAILY_SQL = (
+    "WITH RECURSIVE kamera(lokasi) AS ("
+    "SELECT MIN(lokasi) FROM deteksi UNION ALL "
+    "SELECT (SELECT MIN(lokasi) FROM deteksi WHERE lokasi > kamera.lokasi) FROM kamera WHERE lokasi IS NOT NULL) "
+    "SELECT hari, lokasi, SUM(jumlah), SUM(selesai), SUM(durasi_selesai) FROM ("
+    "SELECT waktu / 86400 AS hari, lokasi, COUNT(*) AS jumlah, SUM(status = 'Selesai') AS selesai, "
+    "SUM(CASE WHEN status = 'Selesai' THEN durasi_menit ELSE 0 END) AS durasi_selesai "
+    "FROM deteksi WHERE lokasi IN (SELECT lokasi FROM kamera) AND waktu >= ? GROUP BY lokasi, hari "
+    "UNION ALL "
+    "SELECT hari, lokasi, jumlah, selesai, durasi_selesai FROM deteksi_rollup WHERE hari >= ?"
+    ") GROUP BY 1, 2"
+)
+
+# Detections per hour of day over the whole history
+HOURLY_SQL = (
+    "SELECT jam, SUM(jumlah) FROM ("
+    "SELECT waktu % 86400 / 3600 AS jam, COUNT(*) AS jumlah FROM deteksi GROUP BY 1 "
+    "UNION ALL "
+    "SELECT jam, SUM(jumlah) FROM deteksi_rollup GROUP BY 1"
+    ") GROUP BY 1"
+)
+
+# Per camera: count, active count and duration sum, read in order from the
+# covering camera index
+LOCATION_SQL = (
+    "SELECT lokasi, SUM(jumlah), SUM(aktif), SUM(durasi) FROM ("
+    "SELECT lokasi, COUNT(*) AS jumlah, SUM(status = 'Aktif') AS aktif, SUM(durasi_menit) AS durasi "
+    "FROM deteksi GROUP BY lokasi "
+    "UNION ALL "
+    "SELECT lokasi, SUM(jumlah), SUM(aktif), SUM(durasi) FROM deteksi_rollup GROUP BY lokasi"
+    ") GROUP BY 1"
+)
+
+# Fold the detail rows before a time into deteksi_rollup. An hour already
+# there (rows rolled up in an earlier pass) is added to.
+ROLLUP_COLUMNS = ["jumlah", "aktif", "selesai", "durasi", "durasi_selesai"] + BUCKET_COLUMNS
+ROLLUP_SQL = (
+    f"INSERT INTO deteksi_rollup (hari, jam, lokasi, {', '.join(ROLLUP_COLUMNS)}) "
+    "SELECT waktu / 86400, waktu % 86400 / 3600, lokasi, COUNT(*), SUM(status = 'Aktif'), "
+    "SUM(status = 'Selesai'), SUM(durasi_menit), "
+    "SUM(CASE WHEN status = 'Selesai' THEN durasi_menit ELSE 0 END), "
+    + ", ".join(f"SUM({bucket})" for bucket in DURATION_BUCKETS)
+    + " FROM deteksi WHERE waktu < ? GROUP BY 1, 2, 3 "
+    "ON CONFLICT (hari, jam, lokasi) DO UPDATE SET "
+    + ", ".join(f"{column} = {column} + excluded.{column}" for column in ROLLUP_COLUMNS)
+)
+
+# Pipeline writes are grouped into one transaction per batch
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_FLUSH_S = 1.0
+
+# Pipeline writes held in memory while the database is busy or locked;
+# beyond that new writes are dropped and counted. A batch that hit a busy or
+# locked database is retried after RETRY_DELAY_S, doubling up to
+# MAX_RETRY_DELAY_S.
+DEFAULT_MAX_PENDING = 10_000
+RETRY_DELAY_S = 0.5
+MAX_RETRY_DELAY_S = 30.0
+
+
+def to_seconds(value):
+    return int((pd.Timestamp(value) - EPOCH).total_seconds())
+
+
+def day_seconds(date):
+    return (date - EPOCH.date()).days * SECONDS_PER_DAY
+
+
+def _placeholders(values):
+    return ", ".join("?" * len(values))
+
+
+# Detection history in one SQLite file. Connections are pooled rather than
+# per thread: Streamlit runs every rerun on a fresh thread, and a new
+# connection starts with a cold page cache. WAL lets the dashboard read while
+# the pipeline writes.
+class SqliteHistory:
+    def __init__(self, path):
+        self.path = str(path)
+        self._pool = queue.LifoQueue()
+        with self._connection() as conn:
+            # Only takes effect on a new, empty database: rows deleted by
+            # retention then free pages that can be handed back a few at a time
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _open(self):
+        conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_MS / 1000, check_same_thread=False)
+        # Durable at checkpoints rather than at every commit, which is safe
+        # with WAL; reads go through the OS page cache via mmap
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    @contextlib.contextmanager
+    def _connection(self):
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            conn = self._open()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def _scalar(self, sql, params=()):
+        with self._connection() as conn:
+            return conn.execute(sql, params).fetchone()[0]
+
+    def _rows(self, sql, params=()):
+        with self._connection() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _query(self, sql, params=()):
+        with self._connection() as conn:
+            return pd.read_sql_query(sql, conn, params=params)
+
+    # Query detection rows into the same compact dtypes as a Parquet history
+    def _frame(self, sql, params=()):
+        df = self._query(sql, params)
+        df["waktu"] = pd.to_datetime(df["waktu"], unit="s")
+        return df.astype(COMPACT_DTYPES)
+
+    def __len__(self):
+        return self._scalar("SELECT COUNT(*) FROM deteksi")
+
+    def locations(self):
+        return [row[0] for row in self._rows(LOCATIONS_SQL)]
+
+    def first_time(self):
+        first = self._scalar(
+            "SELECT MIN(first) FROM (SELECT MIN(waktu) AS first FROM deteksi "
+            "UNION ALL SELECT MIN(hari * 86400 + jam * 3600) FROM deteksi_rollup)"
+        )
+        return None if first is None else pd.Timestamp(first, unit="s")
+
+    def _count_between(self, start, end):
+        return self._scalar("SELECT COUNT(*) FROM deteksi WHERE waktu >= ? AND waktu < ?", (start, end))
+
+    def count_on(self, day):
+        start = day_seconds(day)
+        return self._count_between(start, start + SECONDS_PER_DAY)
+
+    # Same output as data_store.summarize_detections
+    def summarize(self, locations, now, days=7):
+        today = now.date()
+        first_day = (today - EPOCH.date()).days - (days - 1)
+
+        by_day = {}
+        for day, loc, total, completed, completed_duration in self._rows(
+            DAILY_SQL, (first_day * SECONDS_PER_DAY, first_day)
+        ):
+            day_totals = by_day.setdefault(day, {"total": 0, "completed": 0, "duration": 0, "locations": {}})
+            day_totals["total"] += total
+            day_totals["completed"] += completed
+            day_totals["duration"] += completed_duration
+            day_totals["locations"][loc] = total
+
+        daily_summary = {}
+        for offset in range(days):
+            date = today - datetime.timedelta(days=offset)
+            day_totals = by_day.get((date - EPOCH.date()).days, {"total": 0, "completed": 0, "locations": {}})
+            daily_summary[date] = {
+                "tanggal": date,
+                "total": int(day_totals["total"]),
+                "durasi_rata": float(day_totals["duration"] / day_totals["completed"])
+                if day_totals["completed"] else 0.0,
+                "lokasi_counts": {loc: int(day_totals["locations"].get(loc, 0)) for loc in locations}
+            }
+
+        hour_counts = dict(self._rows(HOURLY_SQL))
+        hourly_df = pd.DataFrame({
+            "jam": range(24),
+            "jumlah": [int(hour_counts.get(hour, 0)) for hour in range(24)]
+        })
+
+        by_location = {loc: (total, active, duration) for loc, total, active, duration in self._rows(LOCATION_SQL)}
+        location_summary = {}
+        for loc in locations:
+            total, active, duration = by_location.get(loc, (0, 0, 0))
+            location_summary[loc] = {
+                "total": int(total),
+                "aktif": int(active),
+                "durasi_rata": float(duration / total) if total else 0.0
+            }
+
+        return daily_summary, hourly_df, location_summary
+
+    def filter(self, flt):
+        start = day_seconds(flt.day)
+        clauses = ["waktu >= ?", "waktu < ?", "confidence >= ?", "durasi_menit >= ?"]
+        params = [start, start + SECONDS_PER_DAY, flt.min_confidence, flt.min_duration]
+        if flt.max_duration is not None:
+            clauses.append("durasi_menit <= ?")
+            params.append(flt.max_duration)
+        for column, values in (("status", flt.statuses), ("lokasi", flt.locations), ("prioritas", flt.priorities)):
+            if values:
+                clauses.append(f"{column} IN ({_placeholders(values)})")
+                params.extend(values)
+        return self._frame(
+            f"SELECT {SELECT_COLUMNS} FROM deteksi WHERE {' AND '.join(clauses)} ORDER BY waktu", params
+        )
+
+    # Detections per DURATION_LABELS bucket
+    def duration_counts(self):
+        counts = self._rows(f"SELECT {DURATION_SQL} FROM deteksi")[0]
+        rolled_up = self._rows(f"SELECT {ROLLUP_DURATION_SQL} FROM deteksi_rollup")[0]
+        return pd.Series(
+            [(count or 0) + (extra or 0) for count, extra in zip(counts, rolled_up)],
+            index=pd.CategoricalIndex(DURATION_LABELS, categories=DURATION_LABELS, ordered=True),
+            name="count"
+        )
+
+    def pending_notifications(self):
+        return self._scalar("SELECT COUNT(*) FROM deteksi WHERE status = 'Aktif' AND notifikasi_terkirim = 0")
+
+    # Header metrics and alert lists, the same as DataFrameHistory.aggregates
+    def aggregates(self, now):
+        today = day_seconds(now.date())
+        active_detections = self._frame(
+            f"SELECT {SELECT_COLUMNS} FROM deteksi WHERE status = 'Aktif' ORDER BY {PRIORITY_SQL}, waktu DESC"
+        )
+        recent_alerts = self._frame(
+            f"SELECT {SELECT_COLUMNS} FROM deteksi WHERE waktu >= ? ORDER BY waktu DESC LIMIT ?",
+            (to_seconds(now - datetime.timedelta(hours=24)), RECENT_ALERT_LIMIT)
+        )
+        count, duration = self._rows(
+            "SELECT SUM(jumlah), SUM(durasi) FROM (SELECT COUNT(*) AS jumlah, SUM(durasi_menit) AS durasi "
+            "FROM deteksi UNION ALL SELECT SUM(jumlah), SUM(durasi) FROM deteksi_rollup)"
+        )[0]
+        return {
+            "today_detections": self._count_between(today, today + SECONDS_PER_DAY),
+            "yesterday_detections": self._count_between(today - SECONDS_PER_DAY, today),
+            "active_count": len(active_detections),
+            "mean_duration": float(duration / count) if count else 0.0,
+            "active_detections": active_detections,
+            "recent_alerts": recent_alerts
+        }
+
+    # Bulk insert a detections DataFrame in one transaction
+    def append(self, detections_df):
+        df = detections_df[DETECTION_COLUMNS]
+        rows = zip(
+            df["waktu"].to_numpy("datetime64[s]").astype(np.int64).tolist(),
+            df["lokasi"].astype(str).tolist(),
+            df["confidence"].astype(float).tolist(),
+            df["durasi_menit"].astype(int).tolist(),
+            df["status"].astype(str).tolist(),
+            df["prioritas"].astype(str).tolist(),
+            df["notifikasi_terkirim"].astype(bool).astype(int).tolist()
+        )
+        with self._connection() as conn:
+            with conn:
+                conn.executemany(INSERT_SQL, rows)
+            # Refresh the planner's statistics after large loads
+            conn.execute("PRAGMA optimize")
+        return len(df)
+
+    # Apply queued pipeline operations in order, in one transaction. Runs of
+    # the same kind go through a single executemany.
+    def apply(self, operations):
+        with self._connection() as conn, conn:
+            for kind, group in itertools.groupby(operations, key=operator.itemgetter(0)):
+                conn.executemany(INSERT_SQL if kind == "insert" else FINISH_SQL, [params for _, params in group])
+
+    # Replace one camera's detections from start up to end (seconds) with
+    # `rows` (INSERT_SQL parameters), in one transaction, so reprocessing the
+    # same footage gives the same history however often it runs
+    def replace(self, lokasi, start, end, rows):
+        with self._connection() as conn, conn:
+            deleted = conn.execute(
+                "DELETE FROM deteksi WHERE lokasi = ? AND waktu >= ? AND waktu < ?", (lokasi, start, end)
+            ).rowcount
+            conn.executemany(INSERT_SQL, rows)
+        return deleted
+
+    # Roll the oldest detail rows before `cutoff` (seconds, on an hour
+    # boundary) up into deteksi_rollup and delete them, in one transaction of
+    # about `batch_rows` rows cut at an hour boundary; an hour with more rows
+    # goes in whole. Returns (rows deleted, rollup rows written), (0, 0) once
+    # nothing before the cutoff is left.
+    def roll_up(self, cutoff, batch_rows):
+        with self._connection() as conn:
+            first = conn.execute("SELECT MIN(waktu) FROM deteksi").fetchone()[0]
+            if first is None or first >= cutoff:
+                return 0, 0
+            nth = conn.execute(
+                "SELECT waktu FROM deteksi WHERE waktu < ? ORDER BY waktu LIMIT 1 OFFSET ?", (cutoff, batch_rows)
+            ).fetchone()
+            end = cutoff if nth is None else min(max(nth[0] // 3600, first // 3600 + 1) * 3600, cutoff)
+            with conn:
+                hours = conn.execute(ROLLUP_SQL, (end,)).rowcount
+                rows = conn.execute("DELETE FROM deteksi WHERE waktu < ?", (end,)).rowcount
+        return rows, hours
+
+    # Size of the database file, its free pages and its WAL, in bytes
+    def storage(self):
+        with self._connection() as conn:
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+            pages = conn.execute("PRAGMA page_count").fetchone()[0]
+            free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+            incremental = conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+        wal = self.path + "-wal"
+        return {
+            "bytes": pages * page_size,
+            "free_bytes": free * page_size,
+            "wal_bytes": os.path.getsize(wal) if os.path.exists(wal) else 0,
+            "page_size": page_size,
+            "incremental": incremental
+        }
+
+    # Hand up to `pages` free pages back to the file system. Only a database
+    # created with incremental auto-vacuum can; others reuse free pages for
+    # new rows instead. executescript steps the pragma to completion, a
+    # cursor would free a single page.
+    def release_pages(self, pages):
+        with self._connection() as conn:
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+
+    # Copy the WAL into the database and truncate it, unless readers still
+    # need it (then it is retried on the next call)
+    def checkpoint(self):
+        with self._connection() as conn:
+            busy, _, _ = conn.execute("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+        return not busy
+
+    # Rebuild the whole file with incremental auto-vacuum on. Blocks writers
+    # for the duration, so it is an offline, one-off command.
+    def vacuum(self):
+        with self._connection() as conn:
+            conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+            conn.execute("VACUUM")
+        self.checkpoint()
+
+
+# One SqliteHistory per database file for the whole process
+@functools.lru_cache(maxsize=None)
+def open_database(path):
+    return SqliteHistory(path)
+
+
+# Background writer for the detection pipeline: violations are queued and
+# written in batches, one transaction per batch_size rows or flush_s
+# seconds, whichever comes first. The queue is bounded, so a database that
+# stays unavailable costs dropped writes rather than unbounded memory.
+class HistoryWriter:
+    def __init__(self, history, batch_size=DEFAULT_BATCH_SIZE, flush_s=DEFAULT_FLUSH_S,
+                 max_pending=DEFAULT_MAX_PENDING):
+        self.history = history
+        self.batch_size = batch_size
+        self.flush_s = flush_s
+        self.written = 0
+        self.dropped = 0
+        self.error = None
+        self._queue = queue.Queue(maxsize=max_pending)
+        metrics.HISTORY_BACKLOG.set_function(lambda: {(): self._queue.qsize()})
+        self._thread = threading.Thread(target=self._run, name="history-writer", daemon=True)
+        self._thread.start()
+        # Write what is still queued when the process exits
+        atexit.register(self.close)
+
+    # A violation that started at `waktu`
+    def insert(self, waktu, lokasi, confidence, prioritas, notifikasi_terkirim=False):
+        self._put(("insert", (
+            to_seconds(waktu), lokasi, round(float(confidence), 4), 0, "Aktif", prioritas, int(notifikasi_terkirim)
+        )))
+
+    # The violation that started at `waktu` has ended
+    def finish(self, waktu, lokasi, durasi_menit):
+        self._put(("finish", (int(durasi_menit), lokasi, to_seconds(waktu))))
+
+    # Never blocks the capture thread that records a violation
+    def _put(self, item):
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self._drop(1, "Antrean penulisan riwayat penuh, deteksi baru dibuang")
+
+    def _drop(self, count, error):
+        self.dropped += count
+        self.error = error
+        metrics.HISTORY_DROPPED.inc(amount=count)
+
+    def close(self, timeout=5.0):
+        atexit.unregister(self.close)
+        if not self._thread.is_alive():
+            return
+        try:
+            self._queue.put(None, timeout=timeout)
+        except queue.Full:
+            return
+        self._thread.join(timeout)
+
+    def _run(self):
+        closing = False
+        while not closing:
+            try:
+                batch, closing = self._next_batch()
+                if batch:
+                    self._write(batch)
+            except Exception as exc:
+                # Keep the writer alive whatever happens to one batch
+                self.error = str(exc)
+
+    # Up to batch_size queued writes, waiting at most flush_s after the
+    # first; closing is True once close() has been called
+    def _next_batch(self):
+        item = self._queue.get()
+        if item is None:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.flush_s
+        while len(batch) < self.batch_size:
+            try:
+                item = self._queue.get(timeout=max(deadline - time.monotonic(), 0))
+            except queue.Empty:
+                break
+            if item is None:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    # Write a batch in one transaction. While the database is busy or locked
+    # the same batch is retried with backoff, so nothing is lost or
+    # reordered. A batch that fails any other way (missing table, full disk,
+    # I/O error) is dropped: retrying it would hold up every later write.
+    def _write(self, batch):
+        delay = RETRY_DELAY_S
+        while True:
+            try:
+                self.history.apply(batch)
+            except sqlite3.OperationalError as exc:
+                if not _busy(exc):
+                    self._drop(len(batch), str(exc))
+                    return
+                self.error = f"{exc}, mencoba lagi dalam {delay:.1f} detik"
+                time.sleep(delay)
+                delay = min(delay * 2, MAX_RETRY_DELAY_S)
+                continue
+            except Exception as exc:
+                self._drop(len(batch), str(exc))
+                return
+            self.written += len(batch)
+            self.error = None
+            return
+
+
+# Another connection holds the database; anything else will not go away by
+# waiting
+def _busy(exc):
+    code = getattr(exc, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in (sqlite3.SQLITE_BUSY, sqlite3.SQLITE_LOCKED)
+    message = str(exc).lower()
+    return "locked" in message or "busy" in message
+
+
+# Copy a Parquet history into a database, `chunk_rows` rows per transaction
+def import_parquet(parquet_path, db_path, chunk_rows=100_000):
+    import pyarrow.parquet as pq
+
+    history = SqliteHistory(db_path)
+    rows = 0
+    for batch in pq.ParquetFile(parquet_path).iter_batches(batch_size=chunk_rows, columns=DETECTION_COLUMNS):
+        rows += history.append(batch.to_pandas())
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Detection history database tools")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="copy a Parquet history into a database")
+    importer.add_argument("parquet")
+    importer.add_argument("database")
+    vacuum = commands.add_parser("vacuum", help="rebuild a database with incremental auto-vacuum")
+    vacuum.add_argument("database")
+    args = parser.parse_args(argv)
+
+    started = time.perf_counter()
+    if args.command == "vacuum":
+        history = SqliteHistory(args.database)
+        before = history.storage()["bytes"]
+        history.vacuum()
+        after = history.storage()["bytes"]
+        print(f"{args.database}: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB "
+              f"dalam {time.perf_counter() - started:.1f} detik")
+        return
+    rows = import_parquet(args.parquet, args.database)
+    print(f"{rows} deteksi diimpor ke {args.database} dalam {time.perf_counter() - started:.1f} detik")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+import bisect
+import math
+import os
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import config
+
+# Prometheus text-format metrics for the detection pipeline.
+#
+# Counters and histograms are sharded per writer thread: each thread only
+# ever touches its own dict, so updates need no lock, and a scrape sums the
+# shards from copies. Gauges are last-writer-wins assignments (atomic under
+# the GIL) or callbacks evaluated at scrape time.
+
+METRICS_PORT_ENV = "PARKIR_METRICS_PORT"
+METRICS_ADDR_ENV = "PARKIR_METRICS_ADDR"
+DEFAULT_METRICS_PORT = 9108
+# Loopback only by default; set PARKIR_METRICS_ADDR (e.g. 0.0.0.0) for a
+# Prometheus on another host
+DEFAULT_METRICS_ADDR = "127.0.0.1"
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=()):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    pairs.extend(f'{name}="{_escape(value)}"' for name, value in extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == math.inf:
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=(), registry=None):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        (registry if registry is not None else REGISTRY).register(self)
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {labels}")
+        return tuple(str(value) for value in labels)
+
+    def header(self):
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}"
+        ]
+
+
+class _ShardedMetric(_Metric):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._shards = {}
+
+    # The calling thread's private shard; setdefault is atomic under the GIL
+    def _shard(self):
+        ident = threading.get_ident()
+        shard = self._shards.get(ident)
+        if shard is None:
+            shard = self._shards.setdefault(ident, {})
+        return shard
+
+    def _snapshots(self):
+        return [shard.copy() for shard in list(self._shards.values())]
+
+
+class Counter(_ShardedMetric):
+    kind = "counter"
+
+    def inc(self, *labels, amount=1):
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+
+    def values(self):
+        totals = {}
+        for snapshot in self._snapshots():
+            for key, value in snapshot.items():
+                totals[key] = totals.get(key, 0) + value
+        return totals
+
+    def value(self, *labels):
+        return self.values().get(self._key(labels), 0)
+
+    def collect(self):
+        lines = self.header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Histogram(_ShardedMetric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_LATENCY_BUCKETS, registry=None):
+        super().__init__(name, documentation, labelnames, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value):
+        key = self._key(labels)
+        shard = self._shard()
+        state = shard.get(key)
+        if state is None:
+            # Per-bucket counts (last slot is +Inf), then sum
+            state = shard[key] = [[0] * (len(self.buckets) + 1), 0.0]
+        state[0][bisect.bisect_left(self.buckets, value)] += 1
+        state[1] += value
+
+    def collect(self):
+        merged = {}
+        for snapshot in self._snapshots():
+            for key, (counts, total) in snapshot.items():
+                counts = list(counts)
+                if key in merged:
+                    merged_counts, merged_total = merged[key]
+                    merged[key] = ([a + b for a, b in zip(merged_counts, counts)], merged_total + total)
+                else:
+                    merged[key] = (counts, total)
+
+        lines = self.header()
+        for key, (counts, total) in sorted(merged.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(float(bound)))])
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._values = {}
+        self._function = None
+
+    def set(self, *labels, value):
+        self._values[self._key(labels)] = value
+
+    def remove(self, *labels):
+        self._values.pop(self._key(labels), None)
+
+    # Evaluate `function` at scrape time; it returns {label tuple: value}
+    def set_function(self, function):
+        self._function = function
+
+    def values(self):
+        if self._function is not None:
+            return {self._key(tuple(key)): value for key, value in self._function().items()}
+        return self._values.copy()
+
+    def collect(self):
+        lines = self.header()
+        for key, value in sorted(self.values().items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Metric {metric.name} already registered")
+            self._metrics[metric.name] = metric
+
+    def exposition(self):
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+# Pipeline metrics
+FRAMES_CAPTURED = Counter(
+    "parkir_frames_captured_total", "Frames taken into the pipeline per camera", ["camera"]
+)
+FRAMES_DROPPED = Counter(
+    "parkir_frames_dropped_total", "Frames dropped or skipped before inference per camera", ["camera"]
+)
+INFERENCE_LATENCY = Histogram(
+    "parkir_inference_latency_seconds", "Detector inference latency per camera", ["camera"]
+)
+MOTION_GATE = Counter(
+    "parkir_motion_gate_frames_total", "Frames per camera sent to the detector or skipped as static",
+    ["camera", "decision"]
+)
+DETECTIONS = Counter(
+    "parkir_detections_total", "Detections per camera and class", ["camera", "class"]
+)
+ACTIVE_VIOLATIONS = Gauge(
+    "parkir_active_violations", "Currently active violations per camera", ["camera"]
+)
+INFERENCE_RATE = Gauge(
+    "parkir_inference_rate", "Inferences per second per camera, allocated by the scheduler or measured",
+    ["camera", "kind"]
+)
+NOTIFICATION_QUEUE_DEPTH = Gauge(
+    "parkir_notification_queue_depth", "Active violations whose notification is still pending"
+)
+CACHE_REQUESTS = Counter(
+    "parkir_cache_requests_total", "Cache lookups per cache", ["cache"]
+)
+CACHE_MISSES = Counter(
+    "parkir_cache_misses_total", "Cache misses per cache; hit ratio is 1 - misses/requests", ["cache"]
+)
+RETENTION_ROWS = Counter(
+    "parkir_retention_rows_total", "Detection rows rolled up and deleted by retention"
+)
+RETENTION_RECLAIMED = Counter(
+    "parkir_retention_reclaimed_bytes_total", "Database and evidence bytes freed on disk by retention"
+)
+HISTORY_BACKLOG = Gauge(
+    "parkir_history_backlog", "Pipeline writes queued for the history database"
+)
+HISTORY_DROPPED = Counter(
+    "parkir_history_dropped_total", "Pipeline writes dropped because the queue was full or the database rejected them"
+)
+CLUSTER_CAMERAS = Gauge(
+    "parkir_cluster_cameras", "Cameras assigned to each live capture worker in distributed mode", ["worker"]
+)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    registry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+            self.send_error(404)
+            return
+        body = self.registry.exposition().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    # Keep scrapes out of the Streamlit log
+    def log_message(self, format, *args):
+        pass
+
+
+# Serve /metrics from a daemon thread; returns the server
+def start_http_server(port, addr=DEFAULT_METRICS_ADDR, registry=REGISTRY):
+    handler = type("MetricsHandler", (_MetricsHandler,), {"registry": registry})
+    server = ThreadingHTTPServer((addr, port), handler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, name="parkir-metrics", daemon=True)
+    thread.start()
+    return server
+
+
+# Port from PARKIR_METRICS_PORT; "0" or "off" disables the endpoint, and so
+# does a value that is not a port number, with a warning
+def configured_port():
+    value = os.environ.get(METRICS_PORT_ENV)
+    if value is None:
+        return DEFAULT_METRICS_PORT
+    if value.strip().lower() in ("", "0", "off", "false"):
+        return None
+    port = config.env_number(METRICS_PORT_ENV, None, int)
+    if port is None or not 0 < port < 65536:
+        print(f"{METRICS_PORT_ENV}={value!r} bukan nomor port, endpoint metrik tidak aktif", file=sys.stderr)
+        return None
+    return port
+
+
+def configured_addr():
+    return os.environ.get(METRICS_ADDR_ENV, "").strip() or DEFAULT_METRICS_ADDR
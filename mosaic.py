@@ -0,0 +1,99 @@
+import base64
+import dataclasses
+import math
+
+import profiling
+
+# Camera wall mosaic: every camera reduced to a tile of one canvas, which is
+# encoded and sent as a single image
+TILE_SIZE = (320, 240)
+MAX_COLUMNS = 4
+GAP = 4
+
+# Invisible click targets per tile (columns x rows), so a click anywhere on
+# a camera lands near one
+CLICK_TARGETS = (4, 3)
+
+
+@dataclasses.dataclass(frozen=True)
+class Tile:
+    location: str
+    x: int
+    y: int
+    width: int
+    height: int
+
+
+# Tiles for `locations`, row by row in a grid as close to square as
+# MAX_COLUMNS allows, and the (width, height) of the canvas holding them
+def layout(locations, tile_size=TILE_SIZE, columns=None):
+    columns = columns or min(max(math.ceil(math.sqrt(len(locations))), 1), MAX_COLUMNS)
+    rows = max(math.ceil(len(locations) / columns), 1)
+    width, height = tile_size
+    tiles = tuple(
+        Tile(
+            location=location,
+            x=GAP + (index % columns) * (width + GAP),
+            y=GAP + (index // columns) * (height + GAP),
+            width=width,
+            height=height
+        )
+        for index, location in enumerate(locations)
+    )
+    return (GAP + columns * (width + GAP), GAP + rows * (height + GAP)), tiles
+
+
+# The encoded mosaic and where each camera sits in it
+@dataclasses.dataclass(frozen=True)
+class MosaicView:
+    image: bytes
+    size: tuple
+    tiles: tuple
+    # Cameras with someone in a no-parking zone
+    violations: int
+    # Plotly figure, built on first use
+    figures: dict = dataclasses.field(default_factory=dict, compare=False, repr=False)
+
+
+# The camera wall mosaic as the background image of an empty plot. A
+# lattice of invisible markers over each tile carries the camera name, so
+# clicking a camera selects it. The backend shares one MosaicView per set
+# of frames, so the figure is built once for every session showing it.
+def mosaic_figure(mosaic_view):
+    figure = mosaic_view.figures.get("figure")
+    if figure is None:
+        figure = mosaic_view.figures.setdefault("figure", _build_figure(mosaic_view))
+    return figure
+
+
+@profiling.timed("mosaic_figure")
+def _build_figure(mosaic_view):
+    import plotly.graph_objects as go
+
+    width, height = mosaic_view.size
+    columns, rows = CLICK_TARGETS
+    xs, ys, names = [], [], []
+    for tile in mosaic_view.tiles:
+        for row in range(rows):
+            for column in range(columns):
+                xs.append(tile.x + (column + 0.5) * tile.width / columns)
+                ys.append(tile.y + (row + 0.5) * tile.height / rows)
+                names.append(tile.location)
+
+    fig = go.Figure(go.Scatter(
+        x=xs, y=ys, customdata=names, mode="markers",
+        marker=dict(size=40, symbol="square", opacity=0),
+        hovertemplate="%{customdata}<extra></extra>"
+    ))
+    fig.add_layout_image(
+        source="data:image/jpeg;base64," + base64.b64encode(mosaic_view.image).decode("ascii"),
+        xref="x", yref="y", x=0, y=0, sizex=width, sizey=height,
+        sizing="stretch", layer="below"
+    )
+    fig.update_xaxes(visible=False, range=[0, width], fixedrange=True)
+    fig.update_yaxes(visible=False, range=[height, 0], scaleanchor="x", fixedrange=True)
+    fig.update_layout(
+        height=round(720 * height / width), margin=dict(l=0, r=0, t=0, b=0),
+        plot_bgcolor="rgba(0,0,0,0)", dragmode=False, showlegend=False
+    )
+    return fig
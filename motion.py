@@ -0,0 +1,83 @@
+import dataclasses
+import threading
+import time
+
+import numpy as np
+
+import metrics
+
+
+@dataclasses.dataclass(frozen=True)
+class MotionConfig:
+    # Block size for the downscaled grey image the gate works on
+    scale: int = 8
+    # Grey-level difference for a block to count as changed
+    threshold: float = 12.0
+    # Fraction of changed blocks that counts as motion
+    min_area: float = 0.005
+    # Background learning rate; 1.0 is plain frame differencing
+    alpha: float = 0.05
+    # Run inference at least this often even in a static scene (0 = never);
+    # matches the scheduler's default min_revisit_s
+    max_skip_s: float = 10.0
+    enabled: bool = True
+
+
+# Mean of each scale x scale block over all channels, as float32
+def downscale(frame, scale):
+    height, width = frame.shape[:2]
+    height, width = height - height % scale, width - width % scale
+    channels = frame.shape[2] if frame.ndim == 3 else 1
+    blocks = frame[:height, :width].reshape(height // scale, scale, width // scale, scale, channels)
+    return blocks.mean(axis=(1, 3, 4), dtype=np.float32)
+
+
+# Decides per frame whether a camera needs the detector: only when the scene
+# moved against a running-average background, a track is still active, or
+# the last inference is older than max_skip_s
+class MotionGate:
+    def __init__(self, camera, config=None):
+        self.camera = camera
+        self.config = config or MotionConfig()
+        self.inferred = 0
+        self.skipped = 0
+        self.last_changed = 0.0
+        self._background = None
+        self._diff = None
+        self._last_inference = None
+        self._lock = threading.Lock()
+
+    def _changed_fraction(self, small):
+        if self._background is None or self._background.shape != small.shape:
+            self._background = small
+            self._diff = np.empty_like(small)
+            return 1.0
+        np.subtract(small, self._background, out=self._diff)
+        np.abs(self._diff, out=self._diff)
+        changed = float(np.count_nonzero(self._diff > self.config.threshold)) / self._diff.size
+        # Slowly absorb lighting changes and newly parked cars into the background
+        self._background += self.config.alpha * (small - self._background)
+        return changed
+
+    def should_infer(self, frame, track_active=False, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            if not self.config.enabled:
+                infer = True
+            else:
+                self.last_changed = self._changed_fraction(downscale(frame, self.config.scale))
+                stale = self._last_inference is None or (
+                    self.config.max_skip_s > 0 and now - self._last_inference >= self.config.max_skip_s
+                )
+                infer = track_active or stale or self.last_changed >= self.config.min_area
+
+            if infer:
+                self.inferred += 1
+                self._last_inference = now
+            else:
+                self.skipped += 1
+        metrics.MOTION_GATE.inc(self.camera, "inferred" if infer else "skipped")
+        return infer
+
+    def stats(self):
+        return {"inferred": self.inferred, "skipped": self.skipped, "changed": self.last_changed}
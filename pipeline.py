@@ -0,0 +1,248 @@
+import dataclasses
+import datetime
+import threading
+import time
+
+import numpy as np
+
+import config
+import detector
+import evidence
+import metrics
+import motion
+import postprocess
+import profiling
+import scheduler
+import tracking
+import zones
+
+# Per-camera capture pipeline: video source (or synthetic scene), motion
+# gate, inference scheduler, detector, zone tracking and the history
+# writer. The dashboard runs it in process (shared_state.SharedBackend);
+# in distributed mode every capture worker runs its own (worker.py).
+FRAME_INTERVAL_ENV = "PARKIR_FRAME_INTERVAL_S"
+DEFAULT_FRAME_INTERVAL_S = 1.0
+
+
+def configured_frame_interval():
+    return config.env_number(FRAME_INTERVAL_ENV, DEFAULT_FRAME_INTERVAL_S)
+
+
+# Frames per second taken from each camera when captured every `interval_s`;
+# None when capture is not paced
+def capture_rate(interval_s):
+    return 1.0 / interval_s if 0 < interval_s < float("inf") else None
+
+
+# Samples of the inference rate gauge from {camera: {kind: rate}}
+def rate_samples(camera_rates):
+    return {(name, kind): value for name, rates in camera_rates.items() for kind, value in rates.items()}
+
+
+# One processed frame of a camera, shared by every session: the pixels and
+# the detector's raw candidates, before any confidence threshold
+@dataclasses.dataclass(frozen=True)
+class CameraFrame:
+    location: str
+    pixels: np.ndarray
+    candidates: postprocess.Detections
+    # Someone in a no-parking zone at the lowest selectable threshold
+    track: bool
+    detected_at: datetime.datetime
+    duration: int
+    captured_at: float
+    # Why the synthetic scene is shown instead of the camera's video source
+    error: str = None
+    # When the current track started, None without one
+    track_since: datetime.datetime = None
+    # (detections, zone ids, priority) and rendered CameraViews by confidence
+    # threshold
+    results: dict = dataclasses.field(default_factory=dict, compare=False, repr=False)
+    views: dict = dataclasses.field(default_factory=dict, compare=False, repr=False)
+
+
+class CapturePipeline:
+    def __init__(self, sources, model=None, frame_interval_s=None, history_writer=None, evidence_dir=None):
+        self.frame_interval_s = configured_frame_interval() if frame_interval_s is None else frame_interval_s
+
+        # Decoders for cameras with a real video source
+        self.sources = sources
+
+        self._frames_guard = threading.Lock()
+        self._frame_locks = {}
+        self._frames = {}
+
+        # Per-camera motion gates in front of detection
+        self._gates = {}
+        self.detector = model if model is not None else detector.SimulatedDetector()
+
+        # Splits the inference budget across cameras, up to one inference
+        # per captured frame
+        self.scheduler = scheduler.InferenceScheduler(sources.cameras, capture_rate=capture_rate(self.frame_interval_s))
+        self._revisit_thread = None
+        self._stop = threading.Event()
+
+        # Violations seen by the pipeline go to the history database in
+        # batches, with a snapshot of the frame they started on
+        self.history_writer = history_writer
+        self.evidence_dir = evidence_dir
+
+    # Latest processed frame for a camera, re-captured at most once per frame
+    # interval. has_violation=None follows the camera's configured simulation;
+    # only those frames record violations in the history database.
+    def camera_frame(self, location, has_violation=None):
+        record = has_violation is None
+        if has_violation is None:
+            camera = self.sources.camera(location)
+            has_violation = camera is not None and camera.simulate_violation
+        key = (location, has_violation)
+        with self._frames_guard:
+            lock = self._frame_locks.setdefault(key, threading.Lock())
+        with lock:
+            frame = self._frames.get(key)
+            if frame is None or time.monotonic() - frame.captured_at >= self.frame_interval_s:
+                frame = self._capture(location, has_violation, frame, record)
+                self._frames[key] = frame
+            return frame
+
+    # Allocated and measured inference rate per configured camera
+    def inference_rates(self):
+        return self.scheduler.rates()
+
+    def motion_gate(self, location):
+        with self._frames_guard:
+            gate = self._gates.get(location)
+            if gate is None:
+                camera = self.sources.camera(location)
+                gate = self._gates[location] = motion.MotionGate(
+                    location, camera.motion if camera is not None else None
+                )
+            return gate
+
+    # Inferred vs. skipped frame counts, or None before the camera's first frame
+    def motion_stats(self, location):
+        with self._frames_guard:
+            gate = self._gates.get(location)
+        return gate.stats() if gate is not None else None
+
+    # Forget a camera this process no longer processes: its frames, motion
+    # gate and video source
+    def release(self, location):
+        with self._frames_guard:
+            for key in [key for key in self._frames if key[0] == location]:
+                del self._frames[key]
+            self._gates.pop(location, None)
+        self.sources.release(location)
+
+    # Keep processing cameras nobody is watching, at least once per
+    # min_revisit_s, so their violations are still picked up
+    def start_revisits(self, poll_s=1.0):
+        if self._revisit_thread is None:
+            self._revisit_thread = threading.Thread(
+                target=self._revisit_loop, args=(poll_s,), name="parkir-revisit", daemon=True
+            )
+            self._revisit_thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._revisit_thread is not None:
+            self._revisit_thread.join()
+
+    def _revisit_loop(self, poll_s):
+        while not self._stop.wait(poll_s):
+            for name in self.scheduler.overdue():
+                self.camera_frame(name)
+
+    @profiling.timed("pipeline.capture")
+    def _capture(self, location, has_violation, previous, record=False):
+        # PIL is only needed once a page actually shows a camera
+        import frames
+
+        pixels, truth, error = None, None, None
+        source = self.sources.get(location)
+        if source is not None:
+            pixels, _ = source.read()
+            if pixels is None:
+                error = source.error or "Menunggu frame pertama dari sumber video"
+        if pixels is None:
+            img, truth = frames.create_cctv_frame(location, has_violation)
+            pixels = np.asarray(img)
+        metrics.FRAMES_CAPTURED.inc(location)
+        camera = self.sources.camera(location)
+
+        # Infer only in the camera's scheduler slot, and then only when the
+        # scene moved or a track is active; otherwise keep the previous candidates
+        now = time.monotonic()
+        gate = self.motion_gate(location)
+        track_active = previous is not None and previous.track
+        due = self.scheduler.due(location, now)
+        infer = due and gate.should_infer(pixels, track_active=track_active, now=now)
+        if infer or previous is None:
+            candidates = self._infer(location, camera, pixels, truth)
+        else:
+            candidates = previous.candidates
+
+        track_detections, track_zones = tracking.people_in_zones(camera, candidates, pixels.shape)
+        track = len(track_detections) > 0
+        self.scheduler.record(
+            location,
+            inferred=infer or previous is None,
+            violation=track,
+            motion=due and gate.last_changed >= gate.config.min_area,
+            now=now
+        )
+
+        # A violation starts and ends with the track
+        seen_at = datetime.datetime.now()
+        track_since = previous.track_since if previous is not None and previous.track else None
+        if record and self.history_writer is not None:
+            if track and track_since is None:
+                confidence, priority = tracking.violation_start(camera, track_detections, track_zones, pixels.shape)
+                self.history_writer.insert(seen_at, location, confidence=confidence, prioritas=priority)
+                if self.evidence_dir is not None:
+                    img = frames.draw_detections(pixels, track_detections, track_zones, camera.zones)
+                    evidence.save_evidence(self.evidence_dir, location, seen_at, frames.encode_jpeg(img))
+            elif not track and track_since is not None:
+                minutes = tracking.duration_minutes((seen_at - track_since).total_seconds())
+                self.history_writer.finish(track_since, location, minutes)
+
+        # Shown with the violation: when its track started and how long it
+        # has lasted as of this frame
+        if track:
+            track_since = track_since or seen_at
+            detected_at = track_since
+            duration = tracking.duration_minutes((seen_at - track_since).total_seconds())
+        else:
+            track_since, detected_at, duration = None, seen_at, 0
+        return CameraFrame(
+            location=location,
+            pixels=pixels,
+            candidates=candidates,
+            track=track,
+            detected_at=detected_at,
+            duration=duration,
+            captured_at=time.monotonic(),
+            error=error,
+            track_since=track_since
+        )
+
+    @profiling.timed("pipeline.infer")
+    def _infer(self, location, camera, pixels, truth):
+        started = time.perf_counter()
+        imgsz = camera.imgsz if camera is not None else detector.DEFAULT_INPUT_SIZE
+        candidates = self.detector.predict(pixels, truth, imgsz=imgsz)
+        metrics.INFERENCE_LATENCY.observe(location, value=time.perf_counter() - started)
+
+        # Count what the lowest selectable threshold would show
+        detections = postprocess.postprocess([candidates], tracking.TRACK_CONFIDENCE)[0]
+        in_zone = tracking.zone_ids(camera, detections, pixels.shape) != zones.NO_ZONE
+        is_person = detections.classes == postprocess.PERSON_CLASS
+        counts = {
+            "tukang_parkir": int((is_person & in_zone).sum()),
+            "orang": int((is_person & ~in_zone).sum()),
+            "kendaraan": int((~is_person).sum())
+        }
+        for cls, count in counts.items():
+            if count:
+                metrics.DETECTIONS.inc(location, cls, amount=count)
+        return candidates
@@ -0,0 +1,104 @@
+import dataclasses
+
+import numpy as np
+
+# Detector classes; only people can be parking attendants
+CLASS_NAMES = ("orang", "kendaraan")
+PERSON_CLASS = 0
+
+DEFAULT_IOU_THRESHOLD = 0.45
+DEFAULT_MAX_DETECTIONS = 100
+
+
+# Boxes are xyxy in frame pixels. Used both for a detector's raw candidates
+# and for the final detections after post-processing.
+@dataclasses.dataclass(frozen=True)
+class Detections:
+    boxes: np.ndarray
+    scores: np.ndarray
+    classes: np.ndarray
+
+    def __len__(self):
+        return len(self.scores)
+
+    @classmethod
+    def empty(cls):
+        return cls(
+            boxes=np.empty((0, 4), dtype=np.float32),
+            scores=np.empty(0, dtype=np.float32),
+            classes=np.empty(0, dtype=np.int16)
+        )
+
+    def take(self, index):
+        return Detections(boxes=self.boxes[index], scores=self.scores[index], classes=self.classes[index])
+
+
+# Elementwise IoU of two equally long arrays of xyxy boxes
+def paired_iou(a, b):
+    width = (np.minimum(a[:, 2], b[:, 2]) - np.maximum(a[:, 0], b[:, 0])).clip(0)
+    height = (np.minimum(a[:, 3], b[:, 3]) - np.maximum(a[:, 1], b[:, 1])).clip(0)
+    inter = width * height
+    area_a = (a[:, 2] - a[:, 0]).clip(0) * (a[:, 3] - a[:, 1]).clip(0)
+    area_b = (b[:, 2] - b[:, 0]).clip(0) * (b[:, 3] - b[:, 1]).clip(0)
+    return inter / np.maximum(area_a + area_b - inter, 1e-9)
+
+
+# Greedy non-maximum suppression within each group (e.g. frame x class);
+# returns kept indices, best score first.
+#
+# Every round keeps the best remaining box of all groups at once and drops
+# the boxes overlapping their own group's pick, so the number of rounds is
+# the most boxes kept in any one group, not the total over the batch.
+def nms(boxes, scores, iou_threshold=DEFAULT_IOU_THRESHOLD, groups=None):
+    if groups is None:
+        groups = np.zeros(len(scores), dtype=np.intp)
+    # Sorted by group, best first within a group; filtering keeps that order
+    order = np.lexsort((-scores, groups))
+    keep = []
+    while order.size:
+        ordered_groups = groups[order]
+        is_leader = np.ones(order.size, dtype=bool)
+        is_leader[1:] = ordered_groups[1:] != ordered_groups[:-1]
+        leaders = order[is_leader]
+        keep.append(leaders)
+
+        leader_of = leaders[np.cumsum(is_leader) - 1]
+        rest = order[~is_leader]
+        iou = paired_iou(boxes[rest], boxes[leader_of[~is_leader]])
+        order = rest[iou <= iou_threshold]
+    keep = np.concatenate(keep) if keep else np.empty(0, dtype=np.intp)
+    return keep[np.argsort(-scores[keep], kind="stable")]
+
+
+# Confidence threshold, class filter and NMS for a batch of frames at once.
+# All candidates are concatenated and suppressed per (frame, class) group in
+# one batched NMS. Returns one Detections per input frame, best score first.
+def postprocess(batch, conf_threshold, classes=None, iou_threshold=DEFAULT_IOU_THRESHOLD,
+                max_detections=DEFAULT_MAX_DETECTIONS):
+    counts = [len(candidates) for candidates in batch]
+    if sum(counts) == 0:
+        return [Detections.empty() for _ in batch]
+
+    boxes = np.concatenate([candidates.boxes for candidates in batch])
+    scores = np.concatenate([candidates.scores for candidates in batch])
+    labels = np.concatenate([candidates.classes for candidates in batch])
+    frame_ids = np.repeat(np.arange(len(batch)), counts)
+
+    keep = scores >= conf_threshold
+    if classes is not None:
+        keep &= np.isin(labels, classes)
+    boxes, scores, labels, frame_ids = boxes[keep], scores[keep], labels[keep], frame_ids[keep]
+    if len(scores) == 0:
+        return [Detections.empty() for _ in batch]
+
+    groups = frame_ids * (int(labels.max()) + 1) + labels
+    kept = nms(boxes, scores, iou_threshold, groups=groups)
+
+    # Regroup by frame, keeping the score order within each frame
+    kept = kept[np.argsort(frame_ids[kept], kind="stable")]
+    bounds = np.searchsorted(frame_ids[kept], np.arange(len(batch) + 1))
+    results = []
+    for idx in range(len(batch)):
+        index = kept[bounds[idx]:bounds[idx + 1]][:max_detections]
+        results.append(Detections(boxes=boxes[index], scores=scores[index], classes=labels[index]))
+    return results
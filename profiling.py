@@ -0,0 +1,284 @@
+import contextlib
+import cProfile
+import datetime
+import functools
+import json
+import os
+import threading
+import time
+
+import config
+
+# Opt-in instrumentation, enabled by setting PARKIR_PROFILE. Modes:
+#   1 / timing    timing breakdown at the bottom of the page
+#   trace         + a Chrome trace-event file per rerun
+#   cprofile      + trace + cProfile stats (.prof) per rerun
+#   pyinstrument  + trace + pyinstrument HTML per rerun (if installed)
+# While it is set, a viewer can pick another mode with ?profile=<mode>, but
+# only one that writes no more than PARKIR_PROFILE does, or turn it off.
+PROFILE_ENV = "PARKIR_PROFILE"
+PROFILE_QUERY_PARAM = "profile"
+PROFILE_DIR_ENV = "PARKIR_PROFILE_DIR"
+DEFAULT_PROFILE_DIR = "profiles"
+
+MODES = ("timing", "trace", "cprofile", "pyinstrument")
+
+# Modes the query parameter may pick under each PARKIR_PROFILE mode
+QUERY_MODES = {
+    "timing": ("timing",),
+    "trace": ("timing", "trace"),
+    "cprofile": ("timing", "trace", "cprofile"),
+    "pyinstrument": ("timing", "trace", "pyinstrument")
+}
+
+# Files kept in the profile directory; the oldest reruns' files go first
+MAX_FILES_ENV = "PARKIR_PROFILE_MAX_FILES"
+DEFAULT_MAX_FILES = 200
+
+# Each Streamlit session reruns the script on its own thread
+_local = threading.local()
+
+
+class RerunProfile:
+    def __init__(self, mode):
+        self.mode = mode
+        self.started = time.perf_counter()
+        self.wall_started = datetime.datetime.now()
+        self.thread_id = threading.get_ident()
+        self.events = []
+        self.stack = []
+        self.files = []
+        self.warnings = []
+        self._section = None
+        self._profiler = None
+
+    # `path` is the chain of enclosing span names ending with this one
+    def record(self, path, start, end):
+        self.events.append((path, start - self.started, end - start))
+
+    def open_section(self, name):
+        self.close_section()
+        self._section = (name, time.perf_counter())
+        self.stack = [name]
+
+    def close_section(self):
+        if self._section is not None:
+            name, start = self._section
+            self.record((name,), start, time.perf_counter())
+            self._section = None
+            self.stack = []
+
+    def start_profiler(self):
+        if self.mode == "cprofile":
+            self._profiler = cProfile.Profile()
+            try:
+                self._profiler.enable()
+            except ValueError:
+                # Another session's profiler is already active
+                self._profiler = None
+                self.warnings.append("cProfile sedang dipakai sesi lain, dilewati.")
+        elif self.mode == "pyinstrument":
+            try:
+                from pyinstrument import Profiler
+            except ImportError:
+                self.warnings.append("pyinstrument tidak terpasang, hanya timing yang dicatat.")
+                return
+            self._profiler = Profiler()
+            self._profiler.start()
+
+    def stop_profiler(self):
+        if self._profiler is None:
+            return
+        if self.mode == "cprofile":
+            self._profiler.disable()
+        else:
+            self._profiler.stop()
+
+    def dump(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        stem = os.path.join(
+            directory,
+            f"rerun-{self.wall_started.strftime('%Y%m%d-%H%M%S-%f')}-{self.thread_id}"
+        )
+
+        trace_path = f"{stem}.trace.json"
+        with open(trace_path, "w") as f:
+            json.dump(self.trace_events(), f)
+        self.files.append(trace_path)
+
+        if self._profiler is not None:
+            if self.mode == "cprofile":
+                self._profiler.dump_stats(f"{stem}.prof")
+                self.files.append(f"{stem}.prof")
+            else:
+                with open(f"{stem}.html", "w") as f:
+                    f.write(self._profiler.output_html())
+                self.files.append(f"{stem}.html")
+        _prune(directory, config.env_number(MAX_FILES_ENV, DEFAULT_MAX_FILES, int))
+
+    # Chrome trace-event format, loadable in chrome://tracing or Perfetto
+    def trace_events(self):
+        return {
+            "traceEvents": [
+                {
+                    "name": path[-1],
+                    "ph": "X",
+                    "ts": round(offset * 1e6, 1),
+                    "dur": round(duration * 1e6, 1),
+                    "pid": os.getpid(),
+                    "tid": self.thread_id
+                }
+                for path, offset, duration in self.events
+            ],
+            "displayTimeUnit": "ms"
+        }
+
+    # Aggregate spans by their path, in the order they started
+    def breakdown(self):
+        rows = {}
+        for path, _, duration in sorted(self.events, key=lambda event: event[1]):
+            row = rows.setdefault(path, {"depth": len(path) - 1, "name": path[-1], "calls": 0, "total_s": 0.0})
+            row["calls"] += 1
+            row["total_s"] += duration
+        return list(rows.values())
+
+
+# Streamlit is imported only where a page uses it, so timed() stays free to
+# use in the capture pipeline of a worker process
+def _requested_mode():
+    import streamlit as st
+
+    allowed = _parse_mode(os.environ.get(PROFILE_ENV, ""))
+    if allowed is None:
+        return None
+    try:
+        requested = st.query_params.get(PROFILE_QUERY_PARAM)
+    except Exception:
+        # Outside a Streamlit script run there are no query params
+        requested = None
+    if requested is None:
+        return allowed
+    mode = _parse_mode(requested)
+    return mode if mode is None or mode in QUERY_MODES[allowed] else allowed
+
+
+def _parse_mode(value):
+    mode = (value or "").strip().lower()
+    if mode in ("", "0", "false", "off"):
+        return None
+    if mode in ("1", "true", "on"):
+        return "timing"
+    return mode if mode in MODES else "timing"
+
+
+# Delete the oldest rerun files beyond `keep`. Names start with the rerun's
+# start time, so they sort oldest first.
+def _prune(directory, keep):
+    names = sorted(name for name in os.listdir(directory) if name.startswith("rerun-"))
+    for name in names[:max(len(names) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, name))
+        except OSError:
+            # Another session pruned it first
+            pass
+
+
+def current():
+    return getattr(_local, "profile", None)
+
+
+# Call once at the top of the script; returns None when profiling is off
+def start_rerun():
+    # A profile still set here is from a rerun that raised before
+    # finish_rerun; its profiler would otherwise stay enabled on this thread
+    stale = current()
+    if stale is not None:
+        _local.profile = None
+        stale.stop_profiler()
+
+    mode = _requested_mode()
+    if mode is None:
+        _local.profile = None
+        return None
+    profile = RerunProfile(mode)
+    _local.profile = profile
+    profile.start_profiler()
+    return profile
+
+
+# Mark the start of a top-level page section; it runs until the next one
+def section(name):
+    profile = current()
+    if profile is not None:
+        profile.open_section(name)
+
+
+@contextlib.contextmanager
+def span(name):
+    profile = current()
+    if profile is None:
+        yield
+        return
+    parent = profile.stack
+    profile.stack = parent + [name]
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.stack = parent
+        profile.record(tuple(parent) + (name,), start, time.perf_counter())
+
+
+# Decorator form of span(); free when profiling is off
+def timed(name=None):
+    def decorator(func):
+        label = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if current() is None:
+                return func(*args, **kwargs)
+            with span(label):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Call once at the bottom of the script to render the timing breakdown
+def finish_rerun():
+    import streamlit as st
+
+    profile = current()
+    if profile is None:
+        return
+    _local.profile = None
+
+    profile.close_section()
+    total_s = time.perf_counter() - profile.started
+    profile.stop_profiler()
+    if profile.mode != "timing":
+        profile.dump(os.environ.get(PROFILE_DIR_ENV, DEFAULT_PROFILE_DIR))
+
+    rows = [
+        {
+            "Bagian": ("    " * row["depth"]) + row["name"],
+            "Panggilan": row["calls"],
+            "Total (ms)": row["total_s"] * 1000,
+            "% Rerun": row["total_s"] / total_s * 100 if total_s else 0
+        }
+        for row in profile.breakdown()
+    ]
+
+    with st.expander(f"⏱️ Waktu Render: {total_s * 1000:.0f} ms"):
+        for warning in profile.warnings:
+            st.warning(warning)
+        st.dataframe(
+            rows,
+            use_container_width=True,
+            column_config={
+                "Total (ms)": st.column_config.NumberColumn(format="%.1f"),
+                "% Rerun": st.column_config.NumberColumn(format="%.1f")
+            }
+        )
+        for path in profile.files:
+            st.caption(f"Disimpan: `{path}`")
@@ -0,0 +1,197 @@
+"""Retention for the SQLite detection history.
+
+Detections from the last PARKIR_RETENTION_DAYS days are kept in full, with
+their evidence images. Older ones are rolled up into totals per day, hour
+and camera, which the statistics keep using, and their rows and images are
+deleted. The work is paced (rows, files and pages per second) so the
+dashboard keeps reading while it runs, and freed pages are returned to the
+file system a few at a time. The dashboard runs it as a background job
+every PARKIR_RETENTION_INTERVAL_S seconds; run it once by hand with:
+
+    python -m retention data/detections.db --days 90 --evidence data/bukti
+"""
+import argparse
+import dataclasses
+import datetime
+import sqlite3
+import threading
+import time
+
+import config
+import evidence
+import history_db
+import metrics
+
+RETENTION_DAYS_ENV = "PARKIR_RETENTION_DAYS"
+RETENTION_INTERVAL_ENV = "PARKIR_RETENTION_INTERVAL_S"
+DEFAULT_RETENTION_DAYS = 90
+DEFAULT_INTERVAL_S = 3600.0
+
+# The live pages need today and yesterday in full
+MIN_RETENTION_DAYS = 2
+
+
+@dataclasses.dataclass(frozen=True)
+class RetentionConfig:
+    # Full detail for this many days before today; 0 keeps everything
+    days: int = DEFAULT_RETENTION_DAYS
+    interval_s: float = DEFAULT_INTERVAL_S
+    # I/O budget: detail rows per transaction, and rows, evidence files and
+    # freed pages handled per second
+    batch_rows: int = 2000
+    rows_per_s: float = 20000.0
+    files_per_s: float = 500.0
+    pages_per_s: float = 2048.0
+
+    @property
+    def enabled(self):
+        return self.days > 0
+
+    def cutoff(self, now):
+        return now.date() - datetime.timedelta(days=max(self.days, MIN_RETENTION_DAYS))
+
+
+def configured_retention():
+    return RetentionConfig(
+        days=config.env_number(RETENTION_DAYS_ENV, DEFAULT_RETENTION_DAYS, int),
+        interval_s=config.env_number(RETENTION_INTERVAL_ENV, DEFAULT_INTERVAL_S)
+    )
+
+
+@dataclasses.dataclass
+class RetentionReport:
+    cutoff: datetime.date
+    rows: int = 0
+    rollup_rows: int = 0
+    evidence_files: int = 0
+    evidence_bytes: int = 0
+    db_bytes_before: int = 0
+    db_bytes_after: int = 0
+    # Freed inside the database file but not returned to the file system
+    # (databases without incremental auto-vacuum reuse them for new rows)
+    free_bytes: int = 0
+    elapsed_s: float = 0.0
+    finished_at: datetime.datetime = None
+
+    @property
+    def reclaimed_bytes(self):
+        return max(self.db_bytes_before - self.db_bytes_after, 0) + self.evidence_bytes
+
+    def describe(self):
+        return (
+            f"{self.rows} deteksi sebelum {self.cutoff:%d/%m/%Y} diringkas menjadi {self.rollup_rows} baris per jam, "
+            f"{self.evidence_files} bukti dihapus, {self.reclaimed_bytes / 1e6:.1f} MB dibebaskan"
+            + (f" ({self.free_bytes / 1e6:.1f} MB bebas di dalam database)" if self.free_bytes else "")
+        )
+
+
+def _db_bytes(storage):
+    return storage["bytes"] + storage["wal_bytes"]
+
+
+# Sleep long enough to keep `amount` of work within `rate` per second;
+# returns True when asked to stop
+def _pace(stop, amount, rate):
+    seconds = amount / rate if rate > 0 else 0
+    if stop is not None:
+        return stop.wait(seconds)
+    time.sleep(seconds)
+    return False
+
+
+# One retention pass: roll up and delete detail rows past the window, expire
+# their evidence, then compact. Stops early, with a partial report, once
+# `stop` (a threading.Event) is set.
+def run_retention(history, config, evidence_dir=None, now=None, stop=None):
+    started = time.monotonic()
+    cutoff = config.cutoff(now or datetime.datetime.now())
+    report = RetentionReport(cutoff=cutoff)
+    report.db_bytes_before = _db_bytes(history.storage())
+
+    stopped = False
+    while not stopped:
+        rows, rollup_rows = history.roll_up(history_db.day_seconds(cutoff), config.batch_rows)
+        if not rows:
+            break
+        report.rows += rows
+        report.rollup_rows += rollup_rows
+        metrics.RETENTION_ROWS.inc(amount=rows)
+        stopped = _pace(stop, rows, config.rows_per_s)
+
+    if evidence_dir is not None:
+        for day in evidence.expired_days(evidence_dir, cutoff):
+            if stopped:
+                break
+            files, size = evidence.remove_day(day)
+            report.evidence_files += files
+            report.evidence_bytes += size
+            stopped = _pace(stop, files, config.files_per_s)
+
+    # Hand freed pages back a second's budget at a time
+    storage = history.storage()
+    step = max(int(config.pages_per_s), 1)
+    while storage["incremental"] and storage["free_bytes"] and not stopped:
+        history.release_pages(step)
+        storage = history.storage()
+        stopped = _pace(stop, step, config.pages_per_s)
+    history.checkpoint()
+
+    storage = history.storage()
+    report.db_bytes_after = _db_bytes(storage)
+    report.free_bytes = storage["free_bytes"]
+    report.elapsed_s = time.monotonic() - started
+    report.finished_at = datetime.datetime.now()
+    metrics.RETENTION_RECLAIMED.inc(amount=report.reclaimed_bytes)
+    return report
+
+
+# Runs retention in the background every interval_s seconds, starting
+# right away. A failed pass is kept in `error` and retried on the next one.
+class RetentionJob:
+    def __init__(self, history, config=None, evidence_dir=None):
+        self.history = history
+        self.config = config or configured_retention()
+        self.evidence_dir = evidence_dir
+        self.last_report = None
+        self.error = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="parkir-retention", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout=5.0):
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.last_report = run_retention(self.history, self.config, self.evidence_dir, stop=self._stop)
+                self.error = None
+            except (sqlite3.Error, OSError) as exc:
+                self.error = str(exc)
+            if self._stop.wait(self.config.interval_s):
+                break
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Roll up and delete detections past the retention window")
+    parser.add_argument("database")
+    parser.add_argument("--days", type=int, default=configured_retention().days)
+    parser.add_argument("--evidence", default=evidence.configured_evidence_dir(), help="evidence directory")
+    parser.add_argument("--rows-per-s", type=float, default=RetentionConfig.rows_per_s)
+    parser.add_argument("--pages-per-s", type=float, default=RetentionConfig.pages_per_s)
+    args = parser.parse_args(argv)
+
+    config = RetentionConfig(days=args.days, rows_per_s=args.rows_per_s, pages_per_s=args.pages_per_s)
+    if not config.enabled:
+        print("Retensi nonaktif (--days 0)")
+        return None
+    history = history_db.SqliteHistory(args.database)
+    report = run_retention(history, config, args.evidence)
+    print(f"{report.describe()} dalam {report.elapsed_s:.1f} detik")
+    print(f"Database: {report.db_bytes_before / 1e6:.1f} MB -> {report.db_bytes_after / 1e6:.1f} MB")
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+import collections
+import threading
+import time
+
+import numpy as np
+
+import config
+
+# Total detector runs per second across all cameras, and the longest a
+# camera may go without being offered an inference slot. In a slot the
+# camera's motion gate may still skip a static scene, for up to its
+# max_skip_s (motion.MotionConfig, also 10 s by default), so a static camera
+# runs the detector every max(min_revisit_s, max_skip_s).
+INFERENCE_BUDGET_ENV = "PARKIR_INFERENCE_BUDGET"
+MIN_REVISIT_ENV = "PARKIR_MIN_REVISIT_S"
+DEFAULT_INFERENCE_BUDGET = 6.0
+DEFAULT_MIN_REVISIT_S = 10.0
+
+# A camera's share of the budget is proportional to its weight:
+# 1 + violation + recent motion + zone priority
+VIOLATION_WEIGHT = 4.0
+MOTION_WEIGHT = 2.0
+PRIORITY_WEIGHT = {"Tinggi": 2.0, "Sedang": 1.0, "Rendah": 0.0}
+# Motion counts as recent for this long
+MOTION_MEMORY_S = 30.0
+
+# Window for measuring each camera's effective rate
+RATE_WINDOW_S = 30.0
+
+
+class _CameraState:
+    def __init__(self, camera):
+        self.camera = camera
+        self.priority = camera.base_priority()
+        self.violation = False
+        self.last_motion = None
+        self.last_inference = None
+        self.inferences = collections.deque()
+        self.rate = 0.0
+
+    def moving(self, now):
+        return self.last_motion is not None and now - self.last_motion < MOTION_MEMORY_S
+
+    def prune(self, now):
+        while self.inferences and now - self.inferences[0] > RATE_WINDOW_S:
+            self.inferences.popleft()
+
+
+# Splits an inferences-per-second budget across cameras by weight, capped at
+# each camera's configured rate and at the capture rate (frames per second
+# the pipeline takes from each camera; None when not limited). Every camera
+# keeps at least one slot per min_revisit_s, even when that exceeds the
+# budget.
+class InferenceScheduler:
+    def __init__(self, cameras, budget=None, min_revisit_s=None, capture_rate=None):
+        self.budget = config.env_number(INFERENCE_BUDGET_ENV, DEFAULT_INFERENCE_BUDGET) if budget is None else budget
+        self.min_revisit_s = config.env_number(MIN_REVISIT_ENV, DEFAULT_MIN_REVISIT_S) \
+            if min_revisit_s is None else min_revisit_s
+        self.capture_rate = capture_rate
+        self._states = {camera.name: _CameraState(camera) for camera in cameras}
+        self._lock = threading.Lock()
+        with self._lock:
+            self._allocate(time.monotonic())
+
+    # Schedule `cameras` from now on, keeping what is known about those
+    # already scheduled; a worker's share of cameras changes as other workers
+    # come and go
+    def set_cameras(self, cameras):
+        with self._lock:
+            self._states = {camera.name: self._states.get(camera.name) or _CameraState(camera) for camera in cameras}
+            self._allocate(time.monotonic())
+
+    def set_capture_rate(self, capture_rate):
+        with self._lock:
+            self.capture_rate = capture_rate
+            self._allocate(time.monotonic())
+
+    def _weights(self, states, now):
+        return np.array([
+            1.0
+            + VIOLATION_WEIGHT * state.violation
+            + MOTION_WEIGHT * state.moving(now)
+            + PRIORITY_WEIGHT[state.priority]
+            for state in states
+        ])
+
+    # Water-filling: everyone gets the revisit floor, the rest of the budget
+    # is shared by weight, and whatever a capped camera cannot use goes back
+    # to the others. A camera never gets more slots than frames it is
+    # captured at.
+    def _allocate(self, now):
+        states = list(self._states.values())
+        if not states:
+            return
+        weights = self._weights(states, now)
+        max_rates = np.array([max(state.camera.fps, 0.0) for state in states])
+        if self.capture_rate is not None:
+            max_rates = np.minimum(max_rates, self.capture_rate)
+        rates = np.minimum(1.0 / self.min_revisit_s if self.min_revisit_s > 0 else 0.0, max_rates)
+        remaining = self.budget - rates.sum()
+        open_ = rates < max_rates
+        while remaining > 1e-9 and open_.any():
+            share = remaining * weights * open_ / (weights * open_).sum()
+            updated = np.minimum(rates + share, max_rates)
+            remaining -= (updated - rates).sum()
+            rates = updated
+            open_ = rates < max_rates - 1e-9
+        for state, rate in zip(states, rates):
+            state.rate = float(rate)
+
+    # Whether the camera's next inference slot has come
+    def due(self, name, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._states.get(name)
+            if state is None or state.last_inference is None:
+                return True
+            return state.rate > 0 and now - state.last_inference >= 1.0 / state.rate
+
+    # Cameras that nobody has looked at for longer than the revisit interval
+    def overdue(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return [
+                name for name, state in self._states.items()
+                if state.last_inference is None or now - state.last_inference >= self.min_revisit_s
+            ]
+
+    # Record the outcome of a capture; re-balances the budget when a camera's
+    # activity changes
+    def record(self, name, inferred, violation, motion, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            state = self._states.get(name)
+            if state is None:
+                return
+            before = (state.violation, state.moving(now))
+            if inferred:
+                state.last_inference = now
+                state.inferences.append(now)
+                state.prune(now)
+            state.violation = violation
+            if motion:
+                state.last_motion = now
+            after = (state.violation, state.moving(now))
+            if before != after:
+                self._allocate(now)
+
+    # Allocated and measured inferences per second for every camera
+    def rates(self, now=None):
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            # Motion memory expires without any event, so re-balance here too
+            self._allocate(now)
+            result = {}
+            for name, state in self._states.items():
+                state.prune(now)
+                span = now - state.inferences[0] if len(state.inferences) > 1 else 0.0
+                effective = (len(state.inferences) - 1) / span if span > 0 else 0.0
+                result[name] = {"allocated": state.rate, "effective": effective}
+            return result
@@ -0,0 +1,563 @@
+import dataclasses
+import datetime
+import os
+import random
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+import bus
+import cameras
+import cluster
+import config
+import data_store
+import detector
+import evidence
+import metrics
+import mosaic
+import postprocess
+import pipeline
+import profiling
+import tracking
+import video_source
+import workload
+import zones
+
+# Streamlit runs the script once per browser session. Everything expensive
+# (detection history, summaries, camera frames) lives in one process-wide
+# backend; sessions only keep their own widget/view state.
+SHARED_STATE_ENV = "PARKIR_SHARED_STATE"
+DATA_REFRESH_ENV = "PARKIR_DATA_REFRESH_S"
+DEFAULT_DATA_REFRESH_S = 30.0
+
+# Encoded mosaics kept, one per camera set and confidence threshold
+MOSAIC_CACHE_SIZE = 32
+
+
+@dataclasses.dataclass(frozen=True)
+class DetectionSnapshot:
+    # data_store.DataFrameHistory or history_db.SqliteHistory
+    history: object
+    daily_summary: dict
+    hourly_df: pd.DataFrame
+    location_summary: dict
+    # Detections per data_store.DURATION_LABELS bucket
+    duration_counts: pd.Series
+    fps: float
+    latency: float
+    gpu_usage: float
+    aggregates: dict
+    created_at: datetime.datetime
+
+
+# A pipeline.CameraFrame post-processed at one confidence threshold and encoded
+@dataclasses.dataclass(frozen=True)
+class CameraView:
+    image: bytes
+    detections: postprocess.Detections
+    # No-parking zone under each detection's feet (zones.NO_ZONE outside)
+    zone_ids: np.ndarray
+    # Most severe zone priority among the violations
+    priority: str
+    detected_at: datetime.datetime
+    duration: int
+    error: str = None
+
+    @property
+    def violation(self):
+        return bool(self.zone_ids.any())
+
+    # Best score among the violations
+    @property
+    def confidence(self):
+        in_zone = self.zone_ids != zones.NO_ZONE
+        return float(self.detections.scores[in_zone].max()) if in_zone.any() else 0.0
+
+
+# Generate realistic dummy data
+@profiling.timed()
+def generate_dummy_data():
+    now = datetime.datetime.now()
+
+    # Create common locations with descriptive names
+    locations = workload.DEFAULT_LOCATIONS
+
+    # Create detection history with realistic patterns: more detections
+    # during peak hours (morning, lunch time, evening), today included
+    workload_config = workload.WorkloadConfig(
+        cameras=len(locations),
+        days=6,
+        events_per_hour=0.25,
+        peak_multiplier=3.5,
+        seed=None,
+        end=now,
+        camera_configs=tuple(cameras.configured_cameras())
+    )
+    history = data_store.DataFrameHistory(workload.generate_detections(workload_config))
+
+    # Daily, hourly and per-location summaries
+    daily_summary, hourly_df, location_summary = history.summarize(locations, now)
+
+    # System metrics
+    fps = random.uniform(21.5, 28.5)
+    latency = random.uniform(35, 95)
+    gpu_usage = random.uniform(60, 85)
+
+    return history, daily_summary, hourly_df, location_summary, fps, latency, gpu_usage
+
+
+# Load detection history from the data store at `data_path`, or fall back to
+# dummy data. Databases are summarized in SQL rather than loaded. The
+# summaries cover every camera in `camera_names`, so a new, empty database
+# still lists the configured cameras.
+@profiling.timed()
+def load_detection_data(data_path=None, camera_names=()):
+    if data_path is None:
+        return generate_dummy_data()
+
+    now = datetime.datetime.now()
+    history = data_store.open_history(data_path)
+    locations = sorted(set(history.locations()) | set(camera_names))
+
+    # Cover the whole stored history, but never less than a week
+    history_days = 7
+    first_time = history.first_time()
+    if first_time is not None:
+        history_days = max(history_days, (now.date() - first_time.date()).days + 1)
+    daily_summary, hourly_df, location_summary = history.summarize(locations, now, days=history_days)
+
+    # System metrics
+    fps = random.uniform(21.5, 28.5)
+    latency = random.uniform(35, 95)
+    gpu_usage = random.uniform(60, 85)
+
+    return history, daily_summary, hourly_df, location_summary, fps, latency, gpu_usage
+
+
+# Header metrics and alert lists, computed once per snapshot instead of per session
+@profiling.timed()
+def compute_aggregates(history, now):
+    return history.aggregates(now)
+
+
+# Publish per-camera violation gauges from the current detection history
+def publish_detection_metrics(history, location_summary):
+    for loc, data in location_summary.items():
+        metrics.ACTIVE_VIOLATIONS.set(loc, value=data["aktif"])
+    metrics.NOTIFICATION_QUEUE_DEPTH.set(value=history.pending_notifications())
+
+
+class SharedBackend:
+    def __init__(self, data_refresh_s=None, frame_interval_s=None, sources=None, model=None, data_path=None,
+                 history_writer=None, evidence_dir=None, retention=None, message_bus=None, workers=()):
+        self.data_path = data_path
+        self.data_refresh_s = config.env_number(DATA_REFRESH_ENV, DEFAULT_DATA_REFRESH_S) \
+            if data_refresh_s is None else data_refresh_s
+
+        # Single-flight locks: one session refreshes while the others wait and
+        # then reuse the result
+        self._snapshot_lock = threading.Lock()
+        self._snapshot = None
+        self._snapshot_at = 0.0
+
+        # Mosaic canvases by size, drawn over in place, and the last encoded
+        # mosaic per camera set and threshold
+        self._mosaic_lock = threading.Lock()
+        self._mosaic_canvases = {}
+        self._mosaics = {}
+
+        # Capture, motion gate, scheduling, detection and tracking per camera
+        self.pipeline = pipeline.CapturePipeline(
+            sources if sources is not None else video_source.SourcePool(cameras.configured_cameras()),
+            model, frame_interval_s, history_writer, evidence_dir
+        )
+        self.sources = self.pipeline.sources
+        self.detector = self.pipeline.detector
+        self.scheduler = self.pipeline.scheduler
+        self.history_writer = history_writer
+        self.evidence_dir = evidence_dir
+        metrics.INFERENCE_RATE.set_function(self._rate_metrics)
+
+        # Background RetentionJob for the history database, if any
+        self.retention = retention
+
+        # Distributed mode: frames come from capture workers over the bus
+        # instead of being captured here. Violations are recorded from the
+        # track state the workers report, with the start of each one still
+        # open per camera.
+        self.bus = message_bus
+        self.workers = list(workers)
+        self.cluster = None
+        self._remote_guard = threading.Lock()
+        self._open_tracks = {}
+        self._remote_frames = {}
+        if message_bus is not None:
+            self.cluster = cluster.ClusterView(self.camera_names())
+            metrics.CLUSTER_CAMERAS.set_function(self._cluster_metrics)
+            message_bus.subscribe(cluster.HEARTBEAT_TOPIC, self.cluster.membership.update)
+            message_bus.subscribe(cluster.METRICS_TOPIC, self.cluster.update_metrics)
+            message_bus.subscribe(cluster.FRAME_TOPIC, self._on_remote_frame)
+
+    def camera_names(self):
+        return self.sources.names()
+
+    def snapshot(self):
+        with self._snapshot_lock:
+            if self._snapshot is None or time.monotonic() - self._snapshot_at >= self.data_refresh_s:
+                self._snapshot = self._load_snapshot()
+                self._snapshot_at = time.monotonic()
+            return self._snapshot
+
+    @profiling.timed("backend.load_snapshot")
+    def _load_snapshot(self):
+        now = datetime.datetime.now()
+        history, daily_summary, hourly_df, location_summary, fps, latency, gpu_usage = \
+            load_detection_data(self.data_path, self.camera_names())
+        publish_detection_metrics(history, location_summary)
+        return DetectionSnapshot(
+            history=history,
+            daily_summary=daily_summary,
+            hourly_df=hourly_df,
+            location_summary=location_summary,
+            duration_counts=history.duration_counts(),
+            fps=fps,
+            latency=latency,
+            gpu_usage=gpu_usage,
+            aggregates=compute_aggregates(history, now),
+            created_at=now
+        )
+
+    # Latest processed frame for a camera (see CapturePipeline.camera_frame);
+    # in distributed mode the one its worker sent last
+    def camera_frame(self, location, has_violation=None):
+        if self.cluster is not None and has_violation is None:
+            return self._remote_frame(location)
+        return self.pipeline.camera_frame(location, has_violation)
+
+    # Detections of each frame at a confidence threshold, with the zone under
+    # each and the most severe zone priority. Raw candidates are cached per
+    # frame, so a new slider value only re-runs post-processing, batched over
+    # every frame that lacks that threshold.
+    def _results(self, frames, threshold):
+        missing = list({id(frame): frame for frame in frames if threshold not in frame.results}.values())
+        if missing:
+            batch = postprocess.postprocess(
+                [frame.candidates for frame in missing], threshold, classes=(postprocess.PERSON_CLASS,)
+            )
+            for frame, detections in zip(missing, batch):
+                camera = self.sources.camera(frame.location)
+                camera_zones = camera.zones if camera is not None else ()
+                height, width = frame.pixels.shape[:2]
+                zone_ids = tracking.zone_ids(camera, detections, frame.pixels.shape)
+                priority = zones.zone_map(camera_zones, (width, height)).priority(zone_ids) if camera_zones else None
+                frame.results.setdefault(threshold, (detections, zone_ids, priority))
+        return [frame.results[threshold] for frame in frames]
+
+    # Encoded views of several cameras at the session's confidence threshold
+    @profiling.timed("backend.camera_views")
+    def camera_views(self, locations, confidence_threshold, has_violation=None):
+        threshold = round(float(confidence_threshold), 4)
+        frames = [self.camera_frame(location, has_violation) for location in locations]
+        for frame, result in zip(frames, self._results(frames, threshold)):
+            if threshold not in frame.views:
+                frame.views.setdefault(threshold, self._render_view(frame, *result))
+        return [frame.views[threshold] for frame in frames]
+
+    def camera_view(self, location, confidence_threshold, has_violation=None):
+        return self.camera_views([location], confidence_threshold, has_violation)[0]
+
+    @profiling.timed("backend.render_view")
+    def _render_view(self, frame, detections, zone_ids, priority):
+        import frames
+
+        camera = self.sources.camera(frame.location)
+        camera_zones = camera.zones if camera is not None else ()
+        img = frames.draw_detections(frame.pixels, detections, zone_ids, camera_zones)
+        return CameraView(
+            image=frames.encode_jpeg(img),
+            detections=detections,
+            zone_ids=zone_ids,
+            priority=priority,
+            detected_at=frame.detected_at,
+            duration=frame.duration,
+            error=frame.error
+        )
+
+    # Every camera in `locations` as one image: each tile is drawn into a
+    # canvas allocated once per layout, and the canvas is encoded once per
+    # new set of frames and shared by every session
+    @profiling.timed("backend.camera_mosaic")
+    def camera_mosaic(self, locations, confidence_threshold):
+        import frames
+
+        threshold = round(float(confidence_threshold), 4)
+        camera_frames = [self.camera_frame(location) for location in locations]
+        key = (tuple(locations), threshold)
+        stamp = tuple((id(frame), frame.captured_at) for frame in camera_frames)
+        with self._mosaic_lock:
+            cached = self._mosaics.get(key)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+
+            size, tiles = mosaic.layout(locations)
+            canvas = self._mosaic_canvases.get(size)
+            if canvas is None:
+                canvas = self._mosaic_canvases[size] = frames.new_canvas(size)
+            else:
+                frames.clear_canvas(canvas)
+
+            violations = 0
+            for tile, frame, (detections, zone_ids, priority) in zip(
+                tiles, camera_frames, self._results(camera_frames, threshold)
+            ):
+                camera = self.sources.camera(frame.location)
+                alert = bool(zone_ids.any())
+                if alert:
+                    violations += 1
+                    score = float(detections.scores[zone_ids != zones.NO_ZONE].max())
+                    status = f"PELANGGARAN {score:.2f}" + (f" | {priority}" if priority else "")
+                else:
+                    status = "Aman"
+                if frame.error:
+                    status += " | simulasi"
+                frames.draw_tile(
+                    canvas, tile, frame.pixels, detections, zone_ids,
+                    camera.zones if camera is not None else (), frame.location, status, alert
+                )
+
+            view = mosaic.MosaicView(
+                image=frames.encode_jpeg(canvas), size=size, tiles=tiles, violations=violations
+            )
+            if len(self._mosaics) >= MOSAIC_CACHE_SIZE:
+                self._mosaics.clear()
+            self._mosaics[key] = (stamp, view)
+            return view
+
+    # Allocated and measured inference rate per configured camera; in
+    # distributed mode as last reported by the camera's worker
+    def inference_rates(self):
+        if self.cluster is None:
+            return self.pipeline.inference_rates()
+        return {name: rates for name, rates in self._owner_metrics("rates").items() if rates is not None}
+
+    # Inferences per second available across all cameras
+    def inference_budget(self):
+        if self.cluster is None:
+            return self.scheduler.budget
+        return sum(fields["budget"] for fields in self.cluster.worker_metrics().values())
+
+    def _rate_metrics(self):
+        return pipeline.rate_samples(self.inference_rates())
+
+    # Every camera's entry in a per-camera field ("rates", "motion") of the
+    # latest metrics from the worker that owns it
+    def _owner_metrics(self, key):
+        worker_metrics = self.cluster.worker_metrics()
+        return {
+            name: worker_metrics[worker][key].get(name)
+            for name, worker in self.cluster.owners().items()
+            if worker in worker_metrics
+        }
+
+    # Live capture workers and the cameras each one owns
+    def cluster_workers(self):
+        workers = {worker: [] for worker in self.cluster.membership.live()}
+        for name, worker in self.cluster.owners().items():
+            workers[worker].append(name)
+        return workers
+
+    def _cluster_metrics(self):
+        return {(worker,): len(names) for worker, names in self.cluster_workers().items()}
+
+    # Keep processing cameras nobody is watching (CapturePipeline.start_revisits).
+    # Workers do that for their own cameras in distributed mode.
+    def start_revisits(self, poll_s=1.0):
+        if self.cluster is None:
+            self.pipeline.start_revisits(poll_s)
+
+    def stop(self):
+        self.pipeline.stop()
+        if self.retention is not None:
+            self.retention.stop()
+        for worker in self.workers:
+            worker.stop()
+        if self.bus is not None:
+            self.bus.close()
+        if self.history_writer is not None:
+            self.history_writer.close()
+
+    # Inferred vs. skipped frame counts, or None before the camera's first frame
+    def motion_stats(self, location):
+        if self.cluster is not None:
+            return self._owner_metrics("motion").get(location)
+        return self.pipeline.motion_stats(location)
+
+    # People standing in a no-parking zone in the camera's latest frame, as
+    # the tracker counts them
+    def active_violations(self, location):
+        frame = self.camera_frame(location)
+        detections, _ = tracking.people_in_zones(self.sources.camera(location), frame.candidates, frame.pixels.shape)
+        return len(detections)
+
+    # The latest frame a worker sent for the camera, decoded once per frame.
+    # Until the first one arrives, or once the camera's worker has been
+    # silent past the heartbeat timeout, the synthetic scene is shown.
+    def _remote_frame(self, location):
+        import frames
+
+        remote = self.cluster.latest(location)
+        stale = remote is None or time.monotonic() - remote.received_at >= self.cluster.membership.timeout_s
+        stamp = (remote.worker, remote.sent_at, stale) if remote is not None else None
+        with self._remote_guard:
+            cached = self._remote_frames.get(location)
+            if cached is not None and cached[0] == stamp:
+                return cached[1]
+            if stale:
+                if remote is None:
+                    error = "Menunggu frame pertama dari worker"
+                else:
+                    error = f"Worker {remote.worker} tidak mengirim frame, menunggu pengalihan kamera"
+                img, _ = frames.create_cctv_frame(location)
+                frame = pipeline.CameraFrame(
+                    location=location,
+                    pixels=np.asarray(img),
+                    candidates=postprocess.Detections.empty(),
+                    track=False,
+                    detected_at=datetime.datetime.now(),
+                    duration=0,
+                    captured_at=time.monotonic(),
+                    error=error
+                )
+            else:
+                frame = pipeline.CameraFrame(
+                    location=location,
+                    pixels=frames.decode_jpeg(remote.image),
+                    candidates=remote.candidates,
+                    track=remote.track,
+                    detected_at=remote.detected_at,
+                    duration=remote.duration,
+                    captured_at=remote.received_at,
+                    error=remote.error,
+                    track_since=remote.track_since
+                )
+            self._remote_frames[location] = (stamp, frame)
+            return frame
+
+    # Bus callback for every frame a worker sends. A violation that is still
+    # going when its camera moves to another worker carries on as the same
+    # violation.
+    def _on_remote_frame(self, message):
+        remote = self.cluster.update_frame(message)
+        if remote is None or self.history_writer is None:
+            return
+        with self._remote_guard:
+            since = self._open_tracks.get(remote.location)
+            if remote.track and since is None:
+                camera = self.sources.camera(remote.location)
+                track_detections, track_zones = tracking.people_in_zones(camera, remote.candidates, remote.shape)
+                if not len(track_detections):
+                    return
+                since = remote.track_since or datetime.datetime.fromtimestamp(remote.sent_at)
+                self._open_tracks[remote.location] = since
+            elif not remote.track and since is not None:
+                del self._open_tracks[remote.location]
+            else:
+                return
+
+        if remote.track:
+            confidence, priority = tracking.violation_start(camera, track_detections, track_zones, remote.shape)
+            self.history_writer.insert(since, remote.location, confidence=confidence, prioritas=priority)
+            if self.evidence_dir is not None:
+                import frames
+
+                img = frames.draw_detections(
+                    frames.decode_jpeg(remote.image), track_detections, track_zones, camera.zones
+                )
+                evidence.save_evidence(self.evidence_dir, remote.location, since, frames.encode_jpeg(img))
+        else:
+            seen_at = datetime.datetime.fromtimestamp(remote.sent_at)
+            minutes = tracking.duration_minutes((seen_at - since).total_seconds())
+            self.history_writer.finish(since, remote.location, minutes)
+
+
+def sharing_enabled():
+    return os.environ.get(SHARED_STATE_ENV, "1").strip().lower() not in ("0", "false", "off")
+
+
+# Video decoders are per camera, never per session
+@st.cache_resource(show_spinner=False)
+def _source_pool(cameras_path):
+    return video_source.SourcePool(cameras.configured_cameras())
+
+
+# Load the detector once per process and warm it up at every input size the
+# cameras use, so no viewer waits on the first inference
+@st.cache_resource(show_spinner="Memuat model deteksi...")
+def load_detector(model_path, variant, cameras_path):
+    model = detector.load_detector(model_path, variant)
+    model.warmup(sorted({camera.imgsz for camera in _source_pool(cameras_path).cameras}))
+    return model
+
+
+# One backend per data source for the whole process. A history database
+# also gets the pipeline's writer and the retention job. With a message bus
+# the frames come from capture workers; the "local" bus runs them in this
+# process.
+@st.cache_resource(show_spinner=False)
+def _shared_backend(data_path, cameras_path, model_path, variant, evidence_dir, bus_spec):
+    history_writer, retention_job = None, None
+    if data_path is not None and data_store.is_sqlite(data_path):
+        import history_db
+        import retention
+
+        history = history_db.open_database(data_path)
+        history_writer = history_db.HistoryWriter(history)
+        retention_config = retention.configured_retention()
+        if retention_config.enabled:
+            retention_job = retention.RetentionJob(history, retention_config, evidence_dir)
+    message_bus, workers = None, []
+    if bus_spec is not None:
+        message_bus = bus.connect(bus_spec)
+        if bus_spec == bus.LOCAL:
+            import worker
+
+            model = load_detector(model_path, variant, cameras_path)
+            workers = [
+                worker.Worker(message_bus, f"lokal-{index + 1}", _source_pool(cameras_path).cameras, model).start()
+                for index in range(cluster.configured_local_workers())
+            ]
+    backend = SharedBackend(
+        sources=_source_pool(cameras_path),
+        model=load_detector(model_path, variant, cameras_path),
+        data_path=data_path,
+        history_writer=history_writer,
+        evidence_dir=evidence_dir,
+        retention=retention_job,
+        message_bus=message_bus,
+        workers=workers
+    )
+    backend.start_revisits()
+    return backend
+
+
+# PARKIR_SHARED_STATE=0 gives every rerun its own backend (the old per-session
+# behaviour), which is mainly useful for comparing in load tests; it always
+# captures locally
+def get_backend():
+    cameras_path = os.environ.get(cameras.CAMERAS_ENV)
+    model_path, variant = detector.configured_model()
+    if not sharing_enabled():
+        return SharedBackend(
+            data_refresh_s=0, frame_interval_s=0,
+            sources=_source_pool(cameras_path),
+            model=load_detector(model_path, variant, cameras_path),
+            data_path=data_store.configured_data_path(),
+            evidence_dir=evidence.configured_evidence_dir()
+        )
+    return _shared_backend(
+        data_store.configured_data_path(), cameras_path, model_path, variant, evidence.configured_evidence_dir(),
+        bus.configured_bus_spec()
+    )
@@ -0,0 +1,37 @@
+import math
+
+import numpy as np
+
+import postprocess
+import zones
+
+# Lowest value of the sidebar's confidence slider; keeps tracks alive and
+# feeds the detection counters independently of any session's setting
+TRACK_CONFIDENCE = 0.5
+
+
+# No-parking zone under each detection, all NO_ZONE for cameras without zones
+def zone_ids(camera, detections, shape):
+    if camera is None or not camera.zones:
+        return np.zeros(len(detections), dtype=np.uint8)
+    return camera.zone_map((shape[1], shape[0])).lookup(detections.boxes)
+
+
+# People in a no-parking zone at the lowest selectable threshold, and the
+# zone under each. A violation lasts as long as this is not empty.
+def people_in_zones(camera, candidates, shape):
+    detections = postprocess.postprocess([candidates], TRACK_CONFIDENCE, classes=(postprocess.PERSON_CLASS,))[0]
+    ids = zone_ids(camera, detections, shape)
+    in_zone = ids != zones.NO_ZONE
+    return detections.take(in_zone), ids[in_zone]
+
+
+# Confidence and priority a violation is recorded with, taken from the frame
+# it starts on
+def violation_start(camera, detections, ids, shape):
+    return float(detections.scores.max()), camera.zone_map((shape[1], shape[0])).priority(ids)
+
+
+# Recorded duration of a violation: whole minutes, rounded up
+def duration_minutes(seconds):
+    return math.ceil(seconds / 60)
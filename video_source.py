@@ -0,0 +1,307 @@
+import dataclasses
+import math
+import threading
+import time
+
+import numpy as np
+
+import metrics
+
+# Every source is resized to this (width, height) once, on the decode thread
+FRAME_SIZE = (640, 480)
+
+# Backoff before reopening a stream that dropped
+RECONNECT_DELAY_S = 5.0
+
+
+@dataclasses.dataclass(frozen=True)
+class FrameInfo:
+    index: int
+    # Wall-clock time the frame was published
+    timestamp: float
+    # Position in the video file, None for live streams
+    position_s: float
+
+
+# OpenCV is only needed when a camera has a real video source
+def _import_cv2():
+    try:
+        import cv2
+    except ImportError:
+        raise RuntimeError("opencv-python-headless belum terpasang") from None
+    return cv2
+
+
+# Resize a BGR frame into `target` (size) and convert it to RGB in place
+def _resizer(cv2, size):
+    def resize(frame, target):
+        if frame.shape[1::-1] == size:
+            np.copyto(target, frame)
+        else:
+            cv2.resize(frame, size, dst=target, interpolation=cv2.INTER_AREA)
+        cv2.cvtColor(target, cv2.COLOR_BGR2RGB, dst=target)
+    return resize
+
+
+# Latest frame of one camera's video file or network stream, decoded through
+# OpenCV on a dedicated daemon thread.
+#
+# The decode thread resizes into the back half of a pair of preallocated
+# buffers and swaps them under a lock, so readers never see a half-written
+# frame and no per-frame allocation happens after start-up.
+#
+# Only one frame per inference interval is converted and resized; the others
+# are grab()bed, which advances the decoder without the colour conversion and
+# copy of retrieve(). Files play at their own frame rate, and live streams
+# are drained continuously so the picture never lags behind the camera.
+class VideoSource:
+    def __init__(self, name, url, fps, loop=True, size=FRAME_SIZE, realtime=True):
+        self.name = name
+        self.url = url
+        self.fps = fps
+        self.loop = loop
+        # False decodes files as fast as possible (benchmarks, backfill)
+        self.realtime = realtime
+        self.is_stream = "://" in url
+        self.size = size
+        width, height = size
+        self._buffers = [np.zeros((height, width, 3), dtype=np.uint8) for _ in range(2)]
+        self._front = 0
+        self._info = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self.error = None
+        self.decoded = 0
+        self.skipped = 0
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"source-{self.name}", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    @property
+    def running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        try:
+            self._decode_loop()
+        except Exception as exc:
+            self.error = str(exc)
+
+    # Write `frame` into the back buffer, through `resize` when the source needs
+    # scaling or colour conversion, and make it the current frame
+    def _publish(self, frame, position_s=None, resize=None):
+        back = 1 - self._front
+        target = self._buffers[back]
+        if resize is not None:
+            resize(frame, target)
+        else:
+            np.copyto(target, frame)
+        with self._lock:
+            self._front = back
+            index = self._info.index + 1 if self._info is not None else 0
+            self._info = FrameInfo(index=index, timestamp=time.time(), position_s=position_s)
+        self.decoded += 1
+
+    def _skip(self, count=1):
+        self.skipped += count
+        metrics.FRAMES_DROPPED.inc(self.name, amount=count)
+
+    # Copy the current frame into `out` (allocated if None). Returns
+    # (array, FrameInfo), or (None, None) before the first frame.
+    def read(self, out=None):
+        with self._lock:
+            if self._info is None:
+                return None, None
+            if out is None:
+                out = self._buffers[self._front].copy()
+            else:
+                np.copyto(out, self._buffers[self._front])
+            return out, self._info
+
+    def info(self):
+        with self._lock:
+            return self._info
+
+    def _open(self, cv2):
+        capture = cv2.VideoCapture(self.url)
+        if not capture.isOpened():
+            capture.release()
+            raise IOError(f"Tidak bisa membuka sumber video {self.url}")
+        return capture
+
+    def _decode_loop(self):
+        cv2 = _import_cv2()
+        resize = _resizer(cv2, self.size)
+        while not self._stop.is_set():
+            try:
+                capture = self._open(cv2)
+            except IOError as exc:
+                if not self.is_stream:
+                    raise
+                self.error = f"{exc}, mencoba lagi..."
+                self._stop.wait(RECONNECT_DELAY_S)
+                continue
+            try:
+                self.error = None
+                decoded = self.decoded
+                if self.is_stream:
+                    self._read_stream(capture, resize)
+                else:
+                    self._read_file(cv2, capture, resize)
+            finally:
+                capture.release()
+            if not self.is_stream and (not self.loop or self.decoded == decoded):
+                # Done, or a file without a single readable frame
+                return
+            if self.is_stream and not self._stop.is_set():
+                self.error = "Stream terputus, menyambung ulang..."
+                self._stop.wait(RECONNECT_DELAY_S)
+
+    def _read_file(self, cv2, capture, resize):
+        native_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        # Source frames per inference frame; fractional ratios are spread evenly
+        stride = max(native_fps / self.fps, 1.0) if self.fps > 0 else 1.0
+        next_kept = 0.0
+        frame_no = 0
+        started = time.monotonic()
+        while not self._stop.is_set():
+            if not capture.grab():
+                return
+            if frame_no >= next_kept:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    return
+                self._publish(frame, position_s=frame_no / native_fps, resize=resize)
+                next_kept += stride
+            else:
+                self._skip()
+            frame_no += 1
+
+            if self.realtime:
+                # Keep file playback at the recording's own speed
+                delay = started + frame_no / native_fps - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+
+    def _read_stream(self, capture, resize):
+        interval = 1.0 / self.fps if self.fps > 0 else 0.0
+        next_due = time.monotonic()
+        while not self._stop.is_set():
+            if not capture.grab():
+                return
+            now = time.monotonic()
+            if now < next_due:
+                self._skip()
+                continue
+            ok, frame = capture.retrieve()
+            if not ok:
+                return
+            self._publish(frame, resize=resize)
+            next_due = max(next_due + interval, now)
+
+
+def _open_file(cv2, path):
+    capture = cv2.VideoCapture(str(path))
+    if not capture.isOpened():
+        capture.release()
+        raise IOError(f"Tidak bisa membuka rekaman {path}")
+    return capture
+
+
+# Length in seconds and frame rate of a video file
+def probe(path):
+    cv2 = _import_cv2()
+    capture = _open_file(cv2, path)
+    try:
+        native_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        return capture.get(cv2.CAP_PROP_FRAME_COUNT) / native_fps, native_fps
+    finally:
+        capture.release()
+
+
+# Frames of a video file from start_s (the nearest frame the decoder can
+# seek to) up to end_s, `fps` per second of video, for offline processing.
+# Yields (position_s, frame) with the frame resized to RGB `size` in one
+# reused buffer, so it is only valid until the next one; frames in between
+# are only grab()bed.
+def read_frames(path, fps, start_s=0.0, end_s=None, size=FRAME_SIZE):
+    cv2 = _import_cv2()
+    resize = _resizer(cv2, size)
+    width, height = size
+    buffer = np.empty((height, width, 3), dtype=np.uint8)
+    capture = _open_file(cv2, path)
+    try:
+        native_fps = capture.get(cv2.CAP_PROP_FPS) or 25.0
+        stride = max(native_fps / fps, 1.0) if fps > 0 else 1.0
+        frame_no = round(start_s * native_fps)
+        if frame_no:
+            capture.set(cv2.CAP_PROP_POS_FRAMES, frame_no)
+        last = math.inf if end_s is None else end_s * native_fps
+        # Kept frames fall on the same grid whatever the chunk start
+        next_kept = math.ceil(frame_no / stride) * stride
+        while frame_no < last and capture.grab():
+            if frame_no >= next_kept:
+                ok, frame = capture.retrieve()
+                if not ok:
+                    return
+                resize(frame, buffer)
+                yield frame_no / native_fps, buffer
+                next_kept += stride
+            frame_no += 1
+    finally:
+        capture.release()
+
+
+# Build and start the source for a camera config, or None for synthetic cameras
+def open_source(camera, size=FRAME_SIZE):
+    if not camera.source:
+        return None
+    return VideoSource(camera.name, camera.source, camera.fps, loop=camera.loop, size=size).start()
+
+
+# One source per configured camera, opened on first use and kept for the life
+# of the process; synthetic cameras have none
+class SourcePool:
+    def __init__(self, cameras):
+        self.cameras = list(cameras)
+        self._by_name = {camera.name: camera for camera in self.cameras}
+        self._sources = {}
+        self._lock = threading.Lock()
+
+    def names(self):
+        return [camera.name for camera in self.cameras]
+
+    def camera(self, name):
+        return self._by_name.get(name)
+
+    def get(self, name):
+        camera = self._by_name.get(name)
+        if camera is None or not camera.source:
+            return None
+        with self._lock:
+            source = self._sources.get(name)
+            if source is None:
+                source = self._sources[name] = open_source(camera)
+            return source
+
+    # Stop a camera's source, e.g. once another worker has taken it over
+    def release(self, name):
+        with self._lock:
+            source = self._sources.pop(name, None)
+        if source is not None:
+            source.stop()
+
+    def stop(self):
+        with self._lock:
+            for source in self._sources.values():
+                source.stop()
+            self._sources.clear()
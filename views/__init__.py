@@ -0,0 +1,25 @@
+import dataclasses
+import importlib
+
+# Page modules are imported on first use, so each page only pays for its own
+# dependencies (plotly.express only by the statistics page; the monitoring
+# page loads plotly.graph_objects for the mosaic view alone)
+PAGES = {
+    "Monitoring Real-time": "views.monitoring",
+    "Statistik Pelanggaran": "views.statistics",
+    "Riwayat Deteksi": "views.history"
+}
+
+
+# Everything a page needs from the sidebar and the shared backend
+@dataclasses.dataclass(frozen=True)
+class PageContext:
+    backend: object
+    snapshot: object
+    active_cameras: int
+    detection_active: bool
+    confidence_threshold: float
+
+
+def render_page(menu, ctx):
+    importlib.import_module(PAGES[menu]).render(ctx)
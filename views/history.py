@@ -0,0 +1,259 @@
+import datetime
+
+import streamlit as st
+
+import data_store
+import evidence
+import profiling
+
+
+def render(ctx):
+    backend = ctx.backend
+    history = ctx.snapshot.history
+    
+    profiling.section("Riwayat: filter")
+    
+    st.markdown("<div class='main-header'>Riwayat Deteksi Tukang Parkir Liar</div>", unsafe_allow_html=True)
+    
+    # Advanced filters
+    with st.expander("Filter Lanjutan"):
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            # Date filter
+            date_filter = st.date_input("Pilih Tanggal", datetime.datetime.now().date())
+            
+            # Status filter
+            status_filter = st.multiselect(
+                "Status",
+                options=["Aktif", "Selesai"],
+                default=["Aktif", "Selesai"]
+            )
+        
+        with col2:
+            # Location filter
+            locations = history.locations()
+            location_filter = st.multiselect(
+                "Lokasi",
+                options=locations,
+                default=locations
+            )
+            
+            # Priority filter
+            priority_filter = st.multiselect(
+                "Prioritas",
+                options=["Tinggi", "Sedang", "Rendah"],
+                default=["Tinggi", "Sedang", "Rendah"]
+            )
+        
+        with col3:
+            # Confidence threshold
+            confidence_filter = st.slider(
+                "Confidence Minimum",
+                min_value=0.5,
+                max_value=1.0,
+                value=0.5,
+                step=0.05
+            )
+            
+            # Duration filter
+            min_duration, max_duration = st.slider(
+                "Rentang Durasi (menit)",
+                min_value=0,
+                max_value=60,
+                value=(0, 60)
+            )
+        
+        # Apply button for filters
+        filter_button = st.button("Terapkan Filter", use_container_width=True)
+    
+    # Apply filters in the data store (SQL for a database), so only the
+    # matching rows are loaded
+    filtered_df = history.filter(data_store.HistoryFilter(
+        day=date_filter,
+        statuses=tuple(status_filter),
+        locations=tuple(location_filter),
+        priorities=tuple(priority_filter),
+        min_confidence=confidence_filter,
+        min_duration=min_duration,
+        max_duration=max_duration
+    ))
+    
+    # Display data overview
+    profiling.section("Riwayat: tabel")
+    st.markdown("<div class='sub-header'>Data Deteksi</div>", unsafe_allow_html=True)
+    
+    # Display summary count
+    st.info(f"Menampilkan {len(filtered_df)} dari {history.count_on(date_filter)} deteksi pada tanggal {date_filter.strftime('%d/%m/%Y')}")
+    
+    # Days past the retention window only have hourly totals left
+    if backend.retention is not None and date_filter < backend.retention.config.cutoff(datetime.datetime.now()):
+        st.caption(f"Rincian deteksi lebih dari {backend.retention.config.days} hari lalu sudah diringkas "
+                   "per jam; jumlahnya tetap tampil di halaman Statistik.")
+    
+    # Data table with formatting
+    if not filtered_df.empty:
+        # Format the dataframe for display
+        display_df = filtered_df.copy()
+        display_df["waktu"] = display_df["waktu"].dt.strftime("%H:%M:%S")
+        display_df = display_df.rename(columns={
+            "waktu": "Waktu",
+            "lokasi": "Lokasi",
+            "confidence": "Confidence",
+            "durasi_menit": "Durasi (menit)",
+            "status": "Status",
+            "prioritas": "Prioritas"
+        })
+        
+        # Keep only the columns we want to display
+        display_cols = ["Waktu", "Lokasi", "Confidence", "Durasi (menit)", "Status", "Prioritas"]
+        display_df = display_df[display_cols]
+        
+        # Apply styling based on status
+        def style_status(val):
+            if val == "Aktif":
+                return "background-color: #FEE2E2; color: #991B1B"
+            return "background-color: #D1FAE5; color: #065F46"
+        
+        # Apply styling based on priority
+        def style_priority(val):
+            colors = {
+                "Tinggi": "background-color: #FEE2E2; color: #991B1B",
+                "Sedang": "background-color: #FFEDD5; color: #92400E",
+                "Rendah": "background-color: #DBEAFE; color: #1E40AF"
+            }
+            return colors.get(val, "")
+        
+        # Apply styles
+        styled_df = display_df.style.format({
+            "Confidence": "{:.2f}"
+        }).applymap(style_status, subset=["Status"]).applymap(style_priority, subset=["Prioritas"])
+        
+        # Show the styled dataframe
+        st.dataframe(styled_df, use_container_width=True, height=300)
+        
+        # Export options
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button(
+                "📥 Export CSV",
+                data=filtered_df.to_csv(index=False).encode("utf-8"),
+                file_name=f"deteksi_parkir_{date_filter}.csv",
+                mime="text/csv",
+                use_container_width=True
+            )
+        with col2:
+            st.download_button(
+                "📊 Export Excel",
+                data=filtered_df.to_csv(index=False).encode("utf-8"),
+                file_name=f"deteksi_parkir_{date_filter}.xlsx",
+                mime="application/vnd.ms-excel",
+                use_container_width=True
+            )
+    else:
+        st.warning("Tidak ada data yang sesuai dengan filter")
+    
+    # Detail view for selected detection
+    profiling.section("Riwayat: detail")
+    st.markdown("<div class='sub-header'>Detail Deteksi</div>", unsafe_allow_html=True)
+    
+    if not filtered_df.empty:
+        # Create options for select box with timestamps
+        detection_options = [f"{i}: {row['waktu'].strftime('%H:%M:%S')} - {row['lokasi']}" 
+                            for i, row in filtered_df.reset_index().iterrows()]
+        
+        selected_detection = st.selectbox(
+            "Pilih deteksi untuk melihat detail:",
+            options=detection_options
+        )
+        
+        if selected_detection:
+            # Extract index from selection
+            selected_idx = int(selected_detection.split(":")[0])
+            detection = filtered_df.iloc[selected_idx]
+            
+            # Display detection details
+            col1, col2 = st.columns([1, 2])
+            
+            with col1:
+                # Show the frame saved when the violation started, or the
+                # camera's current frame when there is none
+                saved = None
+                if backend.evidence_dir is not None:
+                    saved = evidence.find_evidence(backend.evidence_dir, detection["lokasi"], detection["waktu"])
+                if saved is not None:
+                    st.image(str(saved), use_container_width=True, caption="Bukti Deteksi")
+                else:
+                    frame = backend.camera_view(detection["lokasi"], ctx.confidence_threshold, has_violation=True)
+                    st.image(frame.image, use_container_width=True, caption="Screenshot Deteksi")
+            
+            with col2:
+                # Use Streamlit components for detail card instead of HTML table
+                st.subheader(f"Deteksi #{selected_idx}")
+                
+                # Create a clean card-like container
+                with st.container():
+                    # Add some padding and styling
+                    st.markdown('<div style="padding: 1px; background-color: #f8fafc; border-radius: 8px; border: 1px solid #e2e8f0;">', unsafe_allow_html=True)
+                    
+                    # Use columns for label-value pairs
+                    detail_items = [
+                        ("Waktu", detection["waktu"].strftime("%d/%m/%Y %H:%M:%S")),
+                        ("Lokasi", detection["lokasi"]),
+                        ("Confidence", f"{detection['confidence']:.2f}"),
+                        ("Durasi", f"{detection['durasi_menit']} menit"),
+                        ("Status", detection["status"]),
+                        ("Prioritas", detection["prioritas"]),
+                        ("Notifikasi", "Terkirim" if detection["notifikasi_terkirim"] else "Belum terkirim")
+                    ]
+                    
+                    # Style status and priority differently
+                    for label, value in detail_items:
+                        col_label, col_value = st.columns([1, 2])
+                        
+                        with col_label:
+                            st.markdown(f"**{label}:**")
+                        
+                        with col_value:
+                            if label == "Status":
+                                color = "#ef4444" if value == "Aktif" else "#10b981"
+                                st.markdown(f'<span style="color: {color}; font-weight: 500;">{value}</span>', unsafe_allow_html=True)
+                            elif label == "Prioritas":
+                                colors = {
+                                    "Tinggi": "#991B1B",
+                                    "Sedang": "#92400E", 
+                                    "Rendah": "#1E40AF"
+                                }
+                                bg_colors = {
+                                    "Tinggi": "#FEE2E2",
+                                    "Sedang": "#FFEDD5", 
+                                    "Rendah": "#DBEAFE"
+                                }
+                                color = colors.get(value, "#1E40AF")
+                                bg_color = bg_colors.get(value, "#DBEAFE")
+                                st.markdown(
+                                    f'<span style="background-color: {bg_color}; color: {color}; padding: 2px 8px; '
+                                    f'border-radius: 12px; font-size: 0.9em; font-weight: 500;">{value}</span>',
+                                    unsafe_allow_html=True
+                                )
+                            else:
+                                st.write(value)
+                    
+                    st.markdown('</div>', unsafe_allow_html=True)
+                
+                # Action buttons
+                st.markdown("<br>", unsafe_allow_html=True)  # Add some spacing
+                col1, col2 = st.columns(2)
+                with col1:
+                    if detection["status"] == "Aktif":
+                        st.button("✅ Tandai Selesai", key=f"mark_{selected_idx}", use_container_width=True)
+                    else:
+                        st.button("🔄 Buka Kembali", key=f"reopen_{selected_idx}", use_container_width=True)
+                        
+                with col2:
+                    if not detection["notifikasi_terkirim"]:
+                        st.button("📩 Kirim Notifikasi", key=f"notify_{selected_idx}", use_container_width=True)
+                    else:
+                        st.button("📲 Kirim Ulang Notifikasi", key=f"renotify_{selected_idx}", use_container_width=True)
+    else:
+        st.warning("Pilih deteksi terlebih dahulu untuk melihat detailnya")
@@ -0,0 +1,164 @@
+import datetime
+
+import streamlit as st
+
+import mosaic
+import profiling
+from components import display_notification, render_cctv_feed, show_violation_counter
+
+GRID_VIEW = "Grid (Semua Kamera)"
+MOSAIC_VIEW = "Mosaik (Dinding Kamera)"
+FOCUS_VIEW = "Fokus (Satu Kamera)"
+
+
+# A click on a mosaic tile opens that camera in the focus view. Runs as the
+# chart's callback, before the widgets below are created again.
+def _focus_clicked_camera():
+    points = st.session_state["monitoring_mosaic"]["selection"]["points"]
+    if points:
+        camera = points[0]["customdata"]
+        st.session_state["monitoring_view"] = FOCUS_VIEW
+        st.session_state["focus_camera"] = camera[0] if isinstance(camera, list) else camera
+
+
+def render(ctx):
+    backend = ctx.backend
+    aggregates = ctx.snapshot.aggregates
+    active_cameras = ctx.active_cameras
+    
+    profiling.section("Monitoring: header")
+    
+    # Header with current time
+    now = datetime.datetime.now()
+    date_str = now.strftime("%A, %d %B %Y")
+    time_str = now.strftime("%H:%M:%S")
+    
+    st.markdown(f"""
+    <div style="display: flex; justify-content: space-between; margin-bottom: 10px;">
+        <div>{date_str}</div>
+        <div>{time_str}</div>
+    </div>
+    """, unsafe_allow_html=True)
+    
+    st.markdown("<div class='main-header'>Monitoring Real-time Tukang Parkir Liar</div>", unsafe_allow_html=True)
+    
+    # Key metrics row
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        today_detections = aggregates["today_detections"]
+        delta = today_detections - aggregates["yesterday_detections"]
+        delta_str = f"{delta:+d}" if delta else None
+        st.metric("Total Deteksi Hari Ini", today_detections, delta=delta_str)
+    
+    with col2:
+        st.metric("Pelanggaran Aktif Saat Ini", aggregates["active_count"])
+        
+    with col3:
+        st.metric("Kamera Aktif", f"{active_cameras}/{len(backend.camera_names())}")
+        
+    with col4:
+        st.metric("Durasi Rata-rata", f"{aggregates['mean_duration']:.1f} menit")
+    
+    # CCTV Feed section
+    profiling.section("Monitoring: CCTV")
+    st.markdown("<div class='sub-header'>Tampilan CCTV</div>", unsafe_allow_html=True)
+    
+    # Select between grid view, the one-image mosaic and single camera focus
+    view_type = st.radio("Tampilan:", [GRID_VIEW, MOSAIC_VIEW, FOCUS_VIEW], horizontal=True, key="monitoring_view")
+    
+    camera_names = backend.camera_names()
+    
+    if view_type == GRID_VIEW:
+        # Post-process every camera at the sidebar's threshold in one batch
+        frames = backend.camera_views(camera_names, ctx.confidence_threshold)
+        
+        # Grid of CCTV feeds, two per row
+        for row_start in range(0, len(camera_names), 2):
+            cols = st.columns(2)
+            for col, frame in zip(cols, frames[row_start:row_start + 2]):
+                with col:
+                    render_cctv_feed(frame)
+    elif view_type == MOSAIC_VIEW:
+        # Every camera composed into one image, encoded once per refresh for
+        # all sessions
+        mosaic_view = backend.camera_mosaic(camera_names, ctx.confidence_threshold)
+        st.plotly_chart(
+            mosaic.mosaic_figure(mosaic_view), use_container_width=True, key="monitoring_mosaic",
+            on_select=_focus_clicked_camera, selection_mode="points", config={"displayModeBar": False}
+        )
+        st.caption(
+            f"{mosaic_view.violations} dari {len(mosaic_view.tiles)} kamera mendeteksi tukang parkir · "
+            "klik kamera untuk membuka tampilan fokus"
+        )
+    else:
+        # Single camera view with larger display
+        selected_camera = st.selectbox("Pilih Kamera:", camera_names, key="focus_camera")
+        
+        render_cctv_feed(backend.camera_view(selected_camera, ctx.confidence_threshold))
+        
+        # Add additional controls for focused view
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            st.button("📸 Ambil Screenshot")
+        with col2:
+            st.button("👮‍♂️ Panggil Petugas")
+        with col3:
+            st.button("⏺️ Rekam Bukti")
+    
+    # Status area section
+    profiling.section("Monitoring: status area")
+    st.markdown("<div class='sub-header'>Status Area</div>", unsafe_allow_html=True)
+    
+    # Status indicators for each camera, four per row
+    rates = backend.inference_rates()
+    for row_start in range(0, len(camera_names), 4):
+        cols = st.columns(4)
+        for col, location in zip(cols, camera_names[row_start:row_start + 4]):
+            with col:
+                show_violation_counter(
+                    location, backend.active_violations(location),
+                    backend.motion_stats(location), rates.get(location)
+                )
+    
+    # Scheduler budget usage across all cameras
+    used = sum(rate["effective"] for rate in rates.values())
+    st.caption(
+        f"⚙️ Anggaran inferensi: {used:.1f} dari {backend.inference_budget():.1f} inferensi/detik terpakai · "
+        f"setiap kamera diperiksa minimal tiap {backend.scheduler.min_revisit_s:.0f} detik"
+    )
+    
+    # Distributed mode: which worker processes which cameras
+    if backend.cluster is not None:
+        workers = backend.cluster_workers()
+        if workers:
+            st.caption(f"🖧 {len(workers)} worker aktif · " + " · ".join(
+                f"{worker}: {len(names)} kamera" for worker, names in sorted(workers.items())
+            ))
+        else:
+            st.warning("Tidak ada worker aktif di bus pesan — kamera ditampilkan sebagai simulasi")
+    
+    # Alert panel
+    profiling.section("Monitoring: alerts")
+    st.markdown("<div class='sub-header'>Panel Alert Real-time</div>", unsafe_allow_html=True)
+    
+    # Active detections, already sorted by priority then most recent
+    active_detections = aggregates["active_detections"]
+    
+    # If no active detections, show a message
+    if len(active_detections) == 0:
+        st.success("Tidak ada pelanggaran aktif saat ini.")
+    else:
+        # Display notifications
+        for idx, alert in active_detections.iterrows():
+            display_notification(alert)
+    
+    # Recent alerts toggle
+    with st.expander("Riwayat Alert (24 Jam Terakhir)"):
+        # Alerts from past 24 hours, most recent first
+        recent_alerts = aggregates["recent_alerts"]
+        
+        if len(recent_alerts) == 0:
+            st.info("Tidak ada riwayat alert dalam 24 jam terakhir.")
+        else:
+            for idx, alert in recent_alerts.iterrows():
+                display_notification(alert)
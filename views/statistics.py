@@ -0,0 +1,148 @@
+import datetime
+
+import pandas as pd
+import streamlit as st
+
+import charts
+import profiling
+
+
+def render(ctx):
+    daily_summary = ctx.snapshot.daily_summary
+    hourly_df = ctx.snapshot.hourly_df
+    location_summary = ctx.snapshot.location_summary
+    
+    profiling.section("Statistik: ringkasan")
+    
+    st.markdown("<div class='main-header'>Statistik dan Analitik Pelanggaran</div>", unsafe_allow_html=True)
+    
+    # Date range selector
+    col1, col2 = st.columns(2)
+    with col1:
+        start_date = st.date_input(
+            "Dari Tanggal",
+            value=datetime.datetime.now().date() - datetime.timedelta(days=6)
+        )
+    with col2:
+        end_date = st.date_input(
+            "Sampai Tanggal",
+            value=datetime.datetime.now().date()
+        )
+    
+    # Summary metrics
+    st.markdown("<div class='sub-header'>Ringkasan Pelanggaran</div>", unsafe_allow_html=True)
+    
+    # Convert daily summary to DataFrame for the selected date range
+    daily_df = pd.DataFrame([
+        {
+            "tanggal": date,
+            "total": data["total"],
+            "durasi_rata": data["durasi_rata"]
+        }
+        for date, data in daily_summary.items()
+        if start_date <= date <= end_date
+    ])
+    
+    # Calculate summary metrics
+    total_violations = daily_df["total"].sum()
+    avg_duration = daily_df["durasi_rata"].mean()
+    max_day = daily_df.loc[daily_df["total"].idxmax()]
+    
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric("Total Pelanggaran", f"{total_violations}")
+    with col2:
+        st.metric("Durasi Rata-rata", f"{avg_duration:.1f} menit")
+    with col3:
+        st.metric("Hari Terpadat", max_day["tanggal"].strftime("%d/%m/%Y"))
+    with col4:
+        st.metric("Jumlah di Hari Terpadat", max_day["total"])
+    
+    # Daily trend chart
+    profiling.section("Statistik: grafik")
+    st.markdown("<div class='sub-header'>Tren Pelanggaran Harian</div>", unsafe_allow_html=True)
+    
+    # Long ranges are bucketed into weeks/months to keep the figure small
+    fig, granularity = charts.daily_trend_figure(daily_df, start_date, end_date)
+    if granularity != "harian":
+        st.caption(f"Rentang panjang ditampilkan per {'minggu' if granularity == 'mingguan' else 'bulan'}.")
+    st.plotly_chart(fig, use_container_width=True)
+    
+    # Hourly pattern and location distribution
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.markdown("<div class='sub-header'>Pola Pelanggaran per Jam</div>", unsafe_allow_html=True)
+        
+        # Add time period labels
+        hourly_df = charts.label_periods(hourly_df)
+        
+        fig = charts.hourly_pattern_figure(hourly_df)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Find peak hours
+        peak_hour = hourly_df.loc[hourly_df["jumlah"].idxmax()]
+        st.info(f"""
+        **Jam Puncak:** {peak_hour['jam']}:00 - {(peak_hour['jam']+1) % 24}:00 dengan {peak_hour['jumlah']} pelanggaran
+        
+        Sebagian besar pelanggaran terjadi pada periode **{hourly_df.groupby('periode')['jumlah'].sum().idxmax()}**
+        """)
+    
+    with col2:
+        st.markdown("<div class='sub-header'>Distribusi per Lokasi</div>", unsafe_allow_html=True)
+        
+        # Convert location summary to a DataFrame for plotting
+        location_df = pd.DataFrame([
+            {
+                "lokasi": loc,
+                "total": data["total"],
+                "aktif": data["aktif"],
+                "durasi_rata": data["durasi_rata"]
+            }
+            for loc, data in location_summary.items()
+        ])
+        
+        # No cameras configured and nothing recorded yet: nothing to chart
+        if location_df.empty:
+            st.info("Belum ada lokasi dengan data deteksi.")
+        else:
+            fig = charts.location_share_figure(location_df)
+            st.plotly_chart(fig, use_container_width=True)
+    
+    # Location details
+    st.markdown("<div class='sub-header'>Detail per Lokasi</div>", unsafe_allow_html=True)
+    
+    if location_df.empty:
+        st.info("Belum ada lokasi dengan data deteksi.")
+    else:
+        # Create a bar chart comparing locations
+        fig = charts.location_comparison_figure(location_df)
+        st.plotly_chart(fig, use_container_width=True)
+        
+        # Location comparison table
+        st.dataframe(
+            location_df[["lokasi", "total", "aktif", "durasi_rata"]].rename(columns={
+                "lokasi": "Lokasi", 
+                "total": "Total Pelanggaran",
+                "aktif": "Pelanggaran Aktif",
+                "durasi_rata": "Durasi Rata-rata (menit)"
+            }).set_index("Lokasi").style.format({
+                "Durasi Rata-rata (menit)": "{:.1f}"
+            }),
+            use_container_width=True
+        )
+    
+    # Perbaikan untuk distribusi durasi
+    st.markdown("<div class='sub-header'>Distribusi Durasi Pelanggaran</div>", unsafe_allow_html=True)
+
+    # Counted per bucket once per data refresh (one GROUP BY for a database)
+    duration_counts = ctx.snapshot.duration_counts
+    
+    fig = charts.duration_distribution_figure(duration_counts)
+    st.plotly_chart(fig, use_container_width=True)
+
+    # Last pass of the history database's retention job
+    retention = ctx.backend.retention
+    if retention is not None and retention.last_report is not None:
+        report = retention.last_report
+        st.caption(f"Retensi data ({report.finished_at:%d/%m/%Y %H:%M}): {report.describe()}.")
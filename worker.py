@@ -0,0 +1,186 @@
+"""Capture and detection worker for distributed mode.
+
+When one host cannot keep up with every camera, run a worker on each of
+several nodes. Every worker runs the capture pipeline the dashboard uses
+(pipeline.py: video source, motion gate, inference scheduler, detector,
+zone tracking) for its share of the cameras and publishes each processed
+frame as a thumbnail with its detections on the message bus, along with
+heartbeats and metrics. The dashboard subscribes and merges them
+(PARKIR_BUS on the dashboard).
+
+All nodes use the same camera config (PARKIR_CAMERAS). Cameras are divided
+among the workers that are alive; when a worker stops sending heartbeats,
+the others take its cameras over. Each worker's inference budget
+(PARKIR_INFERENCE_BUDGET) covers only its own cameras.
+
+    python -m bus --port 7070                                   # one node
+    python -m worker --bus 10.0.0.2:7070 --id node-a            # every worker node
+    PARKIR_BUS=10.0.0.2:7070 streamlit run app.py               # dashboard
+"""
+import argparse
+import os
+import socket
+import threading
+import time
+
+import bus
+import cameras
+import cluster
+import detector
+import metrics
+import pipeline
+import video_source
+
+
+# Runs the pipeline for the cameras assigned to `worker_id` on a background
+# thread, every frame_interval_s
+class Worker:
+    def __init__(self, message_bus, worker_id, camera_list, model=None, frame_interval_s=None, timeout_s=None,
+                 heartbeat_s=cluster.HEARTBEAT_S):
+        self.id = worker_id
+        self.bus = message_bus
+        self.camera_names = [camera.name for camera in camera_list]
+        self.heartbeat_s = heartbeat_s
+        self.frame_interval_s = pipeline.configured_frame_interval() if frame_interval_s is None else frame_interval_s
+
+        # Captures whenever asked; the worker's loop sets the pace
+        self.pipeline = pipeline.CapturePipeline(video_source.SourcePool(camera_list), model, frame_interval_s=0)
+        self.pipeline.scheduler.set_capture_rate(pipeline.capture_rate(self.frame_interval_s))
+        self.pipeline.scheduler.set_cameras([])
+        metrics.INFERENCE_RATE.set_function(lambda: pipeline.rate_samples(self.pipeline.inference_rates()))
+        self.membership = cluster.Membership(timeout_s)
+        message_bus.subscribe(cluster.HEARTBEAT_TOPIC, self.membership.update)
+
+        self.owned = ()
+        self.rebalances = 0
+        self.published = 0
+        self.error = None
+        self._sent = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=f"parkir-worker-{self.id}", daemon=True)
+            self._thread.start()
+        return self
+
+    # Tell the others to take over now rather than after the heartbeat timeout
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.bus.publish(cluster.HEARTBEAT_TOPIC, cluster.heartbeat_fields(self.id, (), leaving=True))
+        self.pipeline.stop()
+        self.pipeline.sources.stop()
+
+    def _run(self):
+        started = time.monotonic()
+        last_heartbeat = None
+        while not self._stop.is_set():
+            tick = time.monotonic()
+            try:
+                if last_heartbeat is None or tick - last_heartbeat >= self.heartbeat_s:
+                    self._heartbeat()
+                    last_heartbeat = tick
+                # A new worker first listens for a round of heartbeats, so it
+                # does not claim every camera before it knows the others
+                if tick - started >= 2 * self.heartbeat_s:
+                    self._rebalance()
+                for name in self.owned:
+                    self._process(name)
+                self.error = None
+            except Exception as exc:
+                self.error = str(exc)
+            self._stop.wait(max(self.frame_interval_s - (time.monotonic() - tick), 0.0))
+
+    def _heartbeat(self):
+        self.bus.publish(cluster.HEARTBEAT_TOPIC, cluster.heartbeat_fields(self.id, self.owned))
+        self.bus.publish(cluster.METRICS_TOPIC + self.id, {
+            "worker": self.id,
+            "budget": self.pipeline.scheduler.budget,
+            "min_revisit_s": self.pipeline.scheduler.min_revisit_s,
+            "rates": self.pipeline.inference_rates(),
+            "motion": {name: self.pipeline.motion_stats(name) for name in self.owned},
+            "error": self.error
+        })
+
+    # Take on the cameras assigned to this worker and let go of the others
+    def _rebalance(self):
+        owners = cluster.assign(self.camera_names, set(self.membership.live()) | {self.id})
+        owned = tuple(name for name in self.camera_names if owners[name] == self.id)
+        if owned == self.owned:
+            return
+        for name in set(self.owned) - set(owned):
+            self.pipeline.release(name)
+            self._sent.pop(name, None)
+        self.pipeline.scheduler.set_cameras([self.pipeline.sources.camera(name) for name in owned])
+        self.owned = owned
+        self.rebalances += 1
+
+    def _process(self, name):
+        frame = self.pipeline.camera_frame(name)
+        if self._sent.get(name) == frame.captured_at:
+            return
+        fields, blob = cluster.frame_message(self.id, frame)
+        self.bus.publish(cluster.FRAME_TOPIC + cameras.slug(name), fields, blob)
+        self._sent[name] = frame.captured_at
+        self.published += 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run detection for a share of the cameras and publish it on the bus")
+    parser.add_argument("--bus", default=bus.configured_bus_spec(), help="broker address, host:port")
+    parser.add_argument("--id", default=os.environ.get(cluster.WORKER_ID_ENV) or socket.gethostname(),
+                        help="worker name, unique in the cluster")
+    parser.add_argument("--model", default=os.environ.get(detector.MODEL_ENV), help="YOLO11 ONNX model")
+    parser.add_argument("--variant", default=os.environ.get(detector.MODEL_VARIANT_ENV, "fp32"),
+                        choices=detector.VARIANTS)
+    parser.add_argument("--cameras", default=os.environ.get(cameras.CAMERAS_ENV), help="camera config JSON")
+    parser.add_argument("--interval", type=float, help="seconds between frames per camera")
+    args = parser.parse_args(argv)
+
+    if not args.bus or args.bus == bus.LOCAL:
+        parser.error(f"--bus (atau {bus.BUS_ENV}) harus berupa alamat broker host:port")
+
+    camera_list = cameras.load_cameras(args.cameras) if args.cameras else cameras.default_cameras()
+    model = detector.load_detector(args.model, args.variant)
+    model.warmup(sorted({camera.imgsz for camera in camera_list}))
+
+    # Every worker serves its own pipeline metrics for Prometheus
+    port = metrics.configured_port()
+    if port is not None:
+        try:
+            metrics.start_http_server(port, metrics.configured_addr())
+        except OSError as exc:
+            print(f"Endpoint metrik tidak aktif: {exc}")
+
+    message_bus = bus.connect(args.bus)
+    worker = Worker(message_bus, args.id, camera_list, model, frame_interval_s=args.interval).start()
+    print(f"Worker {args.id}: {len(camera_list)} kamera dikonfigurasi, broker {args.bus}")
+
+    owned, bus_error, error = None, None, None
+    try:
+        while True:
+            time.sleep(1.0)
+            if worker.owned != owned:
+                owned = worker.owned
+                print(f"Worker {args.id}: {len(owned)} kamera dipegang"
+                      + (f" ({', '.join(owned)})" if owned else ""), flush=True)
+            if message_bus.error != bus_error:
+                bus_error = message_bus.error
+                print(f"Bus: {bus_error or 'terhubung'}", flush=True)
+            if worker.error != error:
+                error = worker.error
+                if error:
+                    print(f"Galat: {error}", flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        worker.stop()
+        message_bus.close()
+    print(f"Worker {args.id} berhenti setelah {worker.published} frame terkirim")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""Deterministic synthetic detection workload.
+
+Generates detection history with the same schema and peak-hour profile as
+the dashboard's dummy data, but seedable and scalable to millions of rows.
+
+    python -m workload --cameras 100 --days 30 --events-per-hour 2 \\
+        --seed 42 --out data/detections.parquet
+"""
+import argparse
+import dataclasses
+import datetime
+
+import numpy as np
+import pandas as pd
+
+import cameras
+import data_store
+import zones
+from cameras import DEFAULT_LOCATIONS
+from data_store import DETECTION_COLUMNS
+
+# More detections during peak hours (morning, lunch time, evening)
+DEFAULT_PEAK_HOURS = (8, 9, 12, 13, 17, 18)
+
+
+@dataclasses.dataclass
+class WorkloadConfig:
+    cameras: int = 4
+    days: int = 5
+    # Mean violations per camera per off-peak hour; peak hours get the multiplier
+    events_per_hour: float = 0.5
+    peak_multiplier: float = 3.0
+    peak_hours: tuple = DEFAULT_PEAK_HOURS
+    # Active hours, [start, end)
+    first_hour: int = 7
+    last_hour: int = 22
+    # None draws fresh entropy, like the dashboard's demo data
+    seed: int = 0
+    # Reference "now"; defaults to the current time when generating
+    end: datetime.datetime = None
+    # Camera configs the base priorities come from; None uses the built-in
+    # cameras, so a seed gives the same rows whatever PARKIR_CAMERAS says
+    camera_configs: tuple = None
+
+    def locations(self):
+        names = DEFAULT_LOCATIONS[:self.cameras]
+        for idx in range(len(names), self.cameras):
+            names.append(f"Kamera-{idx + 1:02d}: Area {idx + 1:02d}")
+        return names
+
+    def hourly_rate(self, hour):
+        if not self.first_hour <= hour < self.last_hour:
+            return 0.0
+        if hour in self.peak_hours:
+            return self.events_per_hour * self.peak_multiplier
+        return self.events_per_hour
+
+    def expected_rows(self):
+        per_day = sum(self.hourly_rate(hour) for hour in range(24))
+        return int(per_day * self.cameras * self.days)
+
+    # Same profile, with events_per_hour scaled to land near `rows`
+    def scaled_to(self, rows):
+        per_unit = sum(self.hourly_rate(hour) for hour in range(24)) / self.events_per_hour
+        rate = rows / (per_unit * self.cameras * self.days)
+        return dataclasses.replace(self, events_per_hour=rate)
+
+
+PRIORITY_LEVELS = np.array(zones.PRIORITIES, dtype=object)
+STATUS_LEVELS = np.array(["Selesai", "Aktif"], dtype=object)
+
+
+# Per-camera duration range and base priority, evaluated once per camera
+# rather than once per record. The base priority is the most severe no-parking
+# zone of the camera in `camera_configs`; unknown cameras get the lowest level.
+def _location_rules(locations, camera_configs):
+    configured = {camera.name: camera for camera in camera_configs}
+    dur_low = np.empty(len(locations), dtype=np.int64)
+    dur_high = np.empty(len(locations), dtype=np.int64)
+    base_priority = np.empty(len(locations), dtype=np.int8)
+    for idx, location in enumerate(locations):
+        # Shorter at drop-off areas, longer at entrances
+        if "Drop-off" in location:
+            dur_low[idx], dur_high[idx] = 2, 12
+        elif "Pintu" in location:
+            dur_low[idx], dur_high[idx] = 10, 40
+        else:
+            dur_low[idx], dur_high[idx] = 5, 30
+
+        camera = configured.get(location)
+        priority = camera.base_priority() if camera is not None else zones.PRIORITIES[-1]
+        base_priority[idx] = zones.PRIORITY_RANK[priority]
+    return dur_low, dur_high, base_priority
+
+
+def _empty_detections():
+    return pd.DataFrame({column: pd.Series(dtype=object) for column in DETECTION_COLUMNS})
+
+
+# Generate `n_days` days of history starting `first_day` days before `now`.
+# Counts are Poisson per (day, hour, camera) cell; every per-record rule is an
+# array operation over all rows at once.
+def _generate_days(config, rng, now, locations, rules, first_day, n_days):
+    dur_low, dur_high, base_priority = rules
+    rates = np.array([config.hourly_rate(hour) for hour in range(24)])
+
+    # Cells are laid out (day, hour, camera)
+    lam = np.broadcast_to(rates[None, :, None], (n_days, 24, len(locations)))
+    counts = rng.poisson(lam).ravel()
+    total = int(counts.sum())
+    if total == 0:
+        return _empty_detections()
+
+    cells = np.repeat(np.arange(counts.size), counts)
+    day_idx, rem = np.divmod(cells, 24 * len(locations))
+    hour, cam = np.divmod(rem, len(locations))
+
+    today = np.datetime64(now.date(), "s")
+    day_start = today - (first_day - day_idx).astype("timedelta64[D]")
+    offsets = hour * 3600 + rng.integers(0, 3600, size=total)
+    waktu = day_start + offsets.astype("timedelta64[s]")
+
+    # Nothing from the future
+    now64 = np.datetime64(now.replace(microsecond=0), "s")
+    keep = waktu <= now64
+    waktu, cam = waktu[keep], cam[keep]
+    total = int(keep.sum())
+    if total == 0:
+        return _empty_detections()
+
+    order = np.argsort(waktu, kind="stable")
+    waktu, cam = waktu[order], cam[order]
+
+    duration = rng.integers(dur_low[cam], dur_high[cam] + 1)
+    confidence = np.round(rng.uniform(0.75, 0.98, size=total), 2)
+
+    # For recent detections, some might still be active
+    age_s = (now64 - waktu).astype(np.int64)
+    is_active = age_s < duration * 60
+
+    # Priority from the camera's base level, escalated by long durations
+    duration_priority = np.where(duration > 30, 0, np.where(duration > 15, 1, 2))
+    priority = np.minimum(base_priority[cam], duration_priority)
+
+    notif_sent = ~is_active | (rng.random(total) < 0.8)
+
+    return pd.DataFrame({
+        "waktu": waktu.astype("datetime64[ns]"),
+        "lokasi": np.asarray(locations, dtype=object)[cam],
+        "confidence": confidence,
+        "durasi_menit": duration,
+        "status": STATUS_LEVELS[is_active.astype(np.int8)],
+        "prioritas": PRIORITY_LEVELS[priority],
+        "notifikasi_terkirim": notif_sent
+    }, columns=DETECTION_COLUMNS)
+
+
+# Yield DataFrames of `days_per_batch` days, oldest first, so huge workloads
+# stream to disk
+def iter_detection_batches(config, days_per_batch=7):
+    rng = np.random.default_rng(config.seed)
+    now = config.end or datetime.datetime.now()
+    locations = config.locations()
+    camera_configs = cameras.default_cameras() if config.camera_configs is None else config.camera_configs
+    rules = _location_rules(locations, camera_configs)
+
+    first_day = config.days - 1
+    while first_day >= 0:
+        n_days = min(days_per_batch, first_day + 1)
+        batch = _generate_days(config, rng, now, locations, rules, first_day, n_days)
+        if not batch.empty:
+            yield batch
+        first_day -= n_days
+
+
+def generate_detections(config):
+    batches = list(iter_detection_batches(config))
+    if not batches:
+        return _empty_detections()
+    return pd.concat(batches, ignore_index=True)
+
+
+# Stream the workload into a Parquet file, one row group per batch, or into
+# an SQLite database (.db/.sqlite), one transaction per batch
+def write_workload(config, path):
+    if data_store.is_sqlite(path):
+        import history_db
+
+        history = history_db.SqliteHistory(path)
+        return sum(history.append(batch) for batch in iter_detection_batches(config))
+
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer = None
+    rows = 0
+    try:
+        for batch in iter_detection_batches(config):
+            table = pa.Table.from_pandas(batch, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(batch)
+    finally:
+        if writer is not None:
+            writer.close()
+    if writer is None:
+        _empty_detections().to_parquet(path, index=False)
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic detection workload")
+    parser.add_argument("--cameras", type=int, default=4)
+    parser.add_argument("--days", type=int, default=5)
+    parser.add_argument("--events-per-hour", type=float, default=0.5,
+                        help="mean violations per camera per off-peak hour")
+    parser.add_argument("--peak-multiplier", type=float, default=3.0)
+    parser.add_argument("--rows", type=int, help="scale events-per-hour to about this many rows")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--camera-config", help="camera config JSON for zone priorities (default: built-in cameras)")
+    parser.add_argument("--end", type=datetime.datetime.fromisoformat,
+                        help="reference time (ISO format), defaults to now")
+    parser.add_argument("--out", required=True, help="output Parquet file or SQLite database (.db)")
+    args = parser.parse_args(argv)
+
+    config = WorkloadConfig(
+        cameras=args.cameras,
+        days=args.days,
+        events_per_hour=args.events_per_hour,
+        peak_multiplier=args.peak_multiplier,
+        seed=args.seed,
+        end=args.end,
+        camera_configs=tuple(cameras.load_cameras(args.camera_config)) if args.camera_config else None
+    )
+    if args.rows:
+        config = config.scaled_to(args.rows)
+    rows = write_workload(config, args.out)
+    print(f"{rows} deteksi ditulis ke {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+import dataclasses
+import functools
+
+import numpy as np
+
+# Most severe first; a zone's rank is its index here
+PRIORITIES = ("Tinggi", "Sedang", "Rendah")
+PRIORITY_RANK = {priority: rank for rank, priority in enumerate(PRIORITIES)}
+
+# Label of pixels outside every zone
+NO_ZONE = 0
+
+
+@dataclasses.dataclass(frozen=True)
+class Zone:
+    name: str
+    # ((x, y), ...) in 0..1 image coordinates, so one polygon fits every
+    # inference resolution
+    polygon: tuple
+    priority: str = "Sedang"
+
+    def __post_init__(self):
+        if self.priority not in PRIORITY_RANK:
+            raise ValueError(f"Prioritas zona {self.name} tidak dikenal: {self.priority}")
+        if len(self.polygon) < 3:
+            raise ValueError(f"Zona {self.name} butuh minimal 3 titik")
+        object.__setattr__(self, "polygon", tuple((float(x), float(y)) for x, y in self.polygon))
+
+
+def zone_from_dict(raw):
+    return Zone(name=raw["name"], polygon=raw["polygon"], priority=raw.get("priority", "Sedang"))
+
+
+# A camera's zones rasterized into one label image at the inference
+# resolution: each pixel holds 1 + the index of the zone covering it, or
+# NO_ZONE. Where zones overlap the most severe one wins. Checking any number
+# of boxes is then a single fancy-indexing lookup.
+class ZoneMap:
+    def __init__(self, zones, size):
+        from PIL import Image, ImageDraw
+
+        if len(zones) > 255:
+            raise ValueError("Maksimal 255 zona per kamera")
+        self.zones = tuple(zones)
+        self.size = size
+        width, height = size
+
+        canvas = Image.new("L", size, NO_ZONE)
+        draw = ImageDraw.Draw(canvas)
+        order = sorted(range(len(self.zones)), key=lambda idx: PRIORITY_RANK[self.zones[idx].priority], reverse=True)
+        for idx in order:
+            points = [(x * (width - 1), y * (height - 1)) for x, y in self.zones[idx].polygon]
+            draw.polygon(points, fill=idx + 1)
+        self.labels = np.asarray(canvas)
+        self.mask = self.labels != NO_ZONE
+
+        # Priority rank per label; NO_ZONE maps past the least severe level
+        self.label_rank = np.array(
+            [len(PRIORITIES)] + [PRIORITY_RANK[zone.priority] for zone in self.zones], dtype=np.int8
+        )
+
+    # Zone label under the foot point (bottom centre) of each xyxy box, given
+    # in pixels at this map's size
+    def lookup(self, boxes):
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 4)
+        width, height = self.size
+        foot_x = np.clip(((boxes[:, 0] + boxes[:, 2]) * 0.5).astype(np.intp), 0, width - 1)
+        foot_y = np.clip(boxes[:, 3].astype(np.intp), 0, height - 1)
+        return self.labels[foot_y, foot_x]
+
+    # Most severe priority among `labels`, or None when none is in a zone
+    def priority(self, labels):
+        if len(labels) == 0:
+            return None
+        rank = int(self.label_rank[labels].min())
+        return PRIORITIES[rank] if rank < len(PRIORITIES) else None
+
+    def zone_names(self, labels):
+        return [self.zones[label - 1].name if label != NO_ZONE else None for label in labels]
+
+
+@functools.lru_cache(maxsize=256)
+def zone_map(zones, size):
+    return ZoneMap(zones, size)